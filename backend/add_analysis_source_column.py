@@ -0,0 +1,13 @@
+"""Add analysis_source column to news ("ai" = Gemini phân tích tin này, "cluster" = kế thừa từ cluster lead)"""
+import asyncio
+from app.db.session import engine
+from sqlalchemy import text
+
+async def add_analysis_source_column():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE news ADD COLUMN IF NOT EXISTS analysis_source VARCHAR(16)"))
+        # Không backfill: tin cũ không phân biệt được phân tích trực tiếp / kế thừa -> không dùng làm nhãn
+        print("✅ analysis_source column added")
+
+if __name__ == "__main__":
+    asyncio.run(add_analysis_source_column())
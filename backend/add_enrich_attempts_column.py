@@ -0,0 +1,12 @@
+"""Add enrich_attempts column to news (giới hạn số lần requeue enrichment)"""
+import asyncio
+from app.db.session import engine
+from sqlalchemy import text
+
+async def add_enrich_attempts_column():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE news ADD COLUMN IF NOT EXISTS enrich_attempts INTEGER DEFAULT 0"))
+        print("✅ enrich_attempts column added")
+
+if __name__ == "__main__":
+    asyncio.run(add_enrich_attempts_column())
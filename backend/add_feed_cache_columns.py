@@ -0,0 +1,14 @@
+"""Add conditional GET validator columns to sources (RSS feed cache)"""
+import asyncio
+from app.db.session import engine
+from sqlalchemy import text
+
+async def add_feed_cache_columns():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE sources ADD COLUMN IF NOT EXISTS feed_etag VARCHAR"))
+        await conn.execute(text("ALTER TABLE sources ADD COLUMN IF NOT EXISTS feed_last_modified VARCHAR"))
+        await conn.execute(text("ALTER TABLE sources ADD COLUMN IF NOT EXISTS feed_content_hash VARCHAR(64)"))
+        print("✅ Feed cache columns added")
+
+if __name__ == "__main__":
+    asyncio.run(add_feed_cache_columns())
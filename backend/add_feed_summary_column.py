@@ -0,0 +1,17 @@
+"""Add feed_summary column to news (content RSS lúc crawl, đầu vào pre-classifier - Task 2.3d)"""
+import asyncio
+from app.db.session import engine
+from sqlalchemy import text
+
+async def add_feed_summary_column():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE news ADD COLUMN IF NOT EXISTS feed_summary TEXT"))
+        # Backfill: tin chưa enrich thì raw_content vẫn là bản RSS
+        result = await conn.execute(text(
+            "UPDATE news SET feed_summary = raw_content "
+            "WHERE feed_summary IS NULL AND is_full_content IS NOT TRUE"
+        ))
+        print(f"✅ feed_summary column added ({result.rowcount} rows backfilled)")
+
+if __name__ == "__main__":
+    asyncio.run(add_feed_summary_column())
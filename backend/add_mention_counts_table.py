@@ -0,0 +1,35 @@
+"""Create mention_counts_hourly rollup table and backfill it from news (trend detection)"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.db.session import engine, AsyncSessionLocal
+from app.services.mention_counter import MentionCounter
+from sqlalchemy import text
+
+async def add_mention_counts_table(days: int):
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS mention_counts_hourly (
+                kind VARCHAR(8) NOT NULL,
+                key VARCHAR NOT NULL,
+                bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (kind, key, bucket_start)
+            )
+        """))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_mention_counts_hourly_kind_bucket "
+            "ON mention_counts_hourly (kind, bucket_start)"
+        ))
+        print("✅ mention_counts_hourly table created")
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    async with AsyncSessionLocal() as db:
+        buckets = await MentionCounter.rebuild(db, since)
+        print(f"✅ Backfilled {buckets} hourly buckets (last {days} days)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=8, help="Backfill window (days)")
+    args = parser.parse_args()
+    asyncio.run(add_mention_counts_table(args.days))
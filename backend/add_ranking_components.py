@@ -0,0 +1,18 @@
+"""Add ranking component columns (base_score, vote_count) and backfill them from sources + votes"""
+import asyncio
+from app.db.session import engine, AsyncSessionLocal
+from app.services.ranking import HotnessRanking
+from sqlalchemy import text
+
+async def add_ranking_components():
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE news ADD COLUMN IF NOT EXISTS base_score FLOAT DEFAULT 0.0"))
+        await conn.execute(text("ALTER TABLE news ADD COLUMN IF NOT EXISTS vote_count INTEGER DEFAULT 0"))
+        print("✅ Ranking component columns added")
+
+    async with AsyncSessionLocal() as db:
+        count = await HotnessRanking.refresh_components(db, time_window_hours=None)
+        print(f"✅ Backfilled ranking components for {count} news")
+
+if __name__ == "__main__":
+    asyncio.run(add_ranking_components())
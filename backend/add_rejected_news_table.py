@@ -0,0 +1,31 @@
+"""Create rejected_news table (tin bị AI / pre-classifier loại, dùng làm nhãn âm cho pre-classifier)"""
+import asyncio
+from app.db.session import engine
+from sqlalchemy import text
+
+async def add_rejected_news_table():
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS rejected_news (
+                id SERIAL PRIMARY KEY,
+                source_id INTEGER REFERENCES sources(id),
+                title VARCHAR NOT NULL,
+                url VARCHAR NOT NULL,
+                raw_content TEXT,
+                reason VARCHAR(16) NOT NULL,
+                relevance_score DOUBLE PRECISION,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+            )
+        """))
+        # Mỗi URL một dòng (insert ON CONFLICT DO NOTHING); bảng đã tạo trước đó: bỏ dòng trùng, đổi sang unique index
+        await conn.execute(text("""
+            DELETE FROM rejected_news duplicate USING rejected_news kept
+            WHERE duplicate.url = kept.url AND duplicate.id > kept.id
+        """))
+        await conn.execute(text("DROP INDEX IF EXISTS ix_rejected_news_url"))
+        await conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_rejected_news_url ON rejected_news (url)"))
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_rejected_news_created_at ON rejected_news (created_at)"))
+        print("✅ rejected_news table created")
+
+if __name__ == "__main__":
+    asyncio.run(add_rejected_news_table())
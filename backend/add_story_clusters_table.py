@@ -0,0 +1,33 @@
+"""Create story_clusters table (cluster signatures) and backfill from already-clustered news"""
+import asyncio
+from datetime import datetime, timedelta
+from app.db.session import engine, AsyncSessionLocal
+from app.services.clustering import NewsClusteringService
+from sqlalchemy import text
+
+async def add_story_clusters_table():
+    async with engine.begin() as conn:
+        await conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS story_clusters (
+                id VARCHAR(36) PRIMARY KEY,
+                token_counts JSON,
+                member_count INTEGER DEFAULT 0,
+                signature TEXT,
+                last_member_at TIMESTAMP WITH TIME ZONE,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+            )
+        """))
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_story_clusters_last_member_at ON story_clusters (last_member_at)"
+        ))
+        print("✅ story_clusters table created")
+
+    # Backfill signatures cho các cluster còn trong time window
+    since = datetime.now() - timedelta(hours=NewsClusteringService.TIME_WINDOW_HOURS)
+    async with AsyncSessionLocal() as db:
+        rebuilt = await NewsClusteringService.rebuild_signatures(db, since)
+        print(f"✅ Backfilled {rebuilt} cluster signatures")
+
+if __name__ == "__main__":
+    asyncio.run(add_story_clusters_table())
@@ -19,6 +19,8 @@ from app.models.news import News
 from app.models.vote import Vote
 from app.models.transaction import Transaction
 from app.models.news_history import NewsHistory
+from app.models.story_cluster import StoryCluster
+from app.models.mention_count import MentionCountHourly
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
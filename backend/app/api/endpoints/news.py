@@ -11,6 +11,7 @@ from app.models.news import News
 from app.models.user import User
 from app.schemas.news import NewsResponse, TrustBreakdown
 from app.services.personalized_feed import PersonalizedFeedService
+from app.services.ranking_index import get_trending_page
 
 router = APIRouter()
 
@@ -69,12 +70,6 @@ async def read_news(
         )
     )
     
-    # Task 5.7: Dynamic sorting
-    if sort == "trending":
-        query = query.order_by(desc(News.ranking_score))
-    else:  # latest
-        query = query.order_by(desc(News.published_at))
-    
     if topic:
         query = query.where(News.topic_category == topic)
     
@@ -91,10 +86,20 @@ async def read_news(
         # We search for "BTC" inside the text representation.
         query = query.filter(cast(News.coins_mentioned, String).contains(f'"{coin.upper()}"'))
 
-    query = query.offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    regular_news = result.scalars().all()
+    # Task 5.7: Dynamic sorting
+    if sort == "trending" and not any([topic, sentiment, risk, coin]):
+        # Không filter -> thứ tự từ in-memory ranking index (Hot_Score với decay hiện tại)
+        regular_news = await get_trending_page(db, query, skip, limit, exclude_pinned=True)
+    else:
+        if sort == "trending":
+            query = query.order_by(desc(News.ranking_score))
+        else:  # latest
+            query = query.order_by(desc(News.published_at))
+        
+        query = query.offset(skip).limit(limit)
+        
+        result = await db.execute(query)
+        regular_news = result.scalars().all()
     
     # Process enhanced trust for all news
     all_news = list(pinned_news) + list(regular_news)
@@ -128,9 +133,7 @@ async def get_personalized_feed(
     """
     if not current_user:
         # No auth, return general trending
-        query = select(News).order_by(desc(News.ranking_score)).offset(skip).limit(limit)
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await get_trending_page(db, select(News), skip, limit)
     
     feed_service = PersonalizedFeedService(db)
     
@@ -1,35 +1,51 @@
 """
 Task 5.8: Trends API endpoints
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter
 from typing import List, Dict, Any
 
-from app.db.session import get_db
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
 from app.services.trends import TrendDetectionService
 
 router = APIRouter()
 
+async def _compute_narratives() -> List[Dict[str, Any]]:
+    # Session riêng: có thể chạy nền (stale-while-revalidate) sau khi request đã kết thúc
+    async with AsyncSessionLocal() as db:
+        return await TrendDetectionService.detect_trending_narratives(db)
+
+async def _compute_coins() -> List[Dict[str, Any]]:
+    async with AsyncSessionLocal() as db:
+        return await TrendDetectionService.detect_trending_coins(db)
+
 @router.get("/narratives", response_model=List[Dict[str, Any]])
-async def get_trending_narratives(
-    db: AsyncSession = Depends(get_db)
-):
+async def get_trending_narratives():
     """
     Lấy danh sách narratives/topics đang trending
     
     Returns:
         List of trending tags với velocity > 2.0
     """
-    return await TrendDetectionService.detect_trending_narratives(db)
+    return await response_cache.get_or_compute(
+        "trends:narratives",
+        _compute_narratives,
+        ttl=settings.TRENDS_CACHE_TTL,
+        stale_ttl=settings.TRENDS_CACHE_STALE_TTL
+    )
 
 @router.get("/coins", response_model=List[Dict[str, Any]])
-async def get_trending_coins(
-    db: AsyncSession = Depends(get_db)
-):
+async def get_trending_coins():
     """
     Lấy danh sách coins đang được mention nhiều
     
     Returns:
         List of trending coins với velocity > 2.0
     """
-    return await TrendDetectionService.detect_trending_coins(db)
+    return await response_cache.get_or_compute(
+        "trends:coins",
+        _compute_coins,
+        ttl=settings.TRENDS_CACHE_TTL,
+        stale_ttl=settings.TRENDS_CACHE_STALE_TTL
+    )
@@ -6,6 +6,8 @@ from app.models.vote import Vote  # Removed VoteOrigin import
 from app.models.user import User
 from app.models.news import News
 from app.schemas.vote import VoteCreate, VoteResponse
+from app.services.ranking import HotnessRanking
+from app.services.ranking_index import ranking_index
 from app.api.endpoints.users import get_current_user
 
 router = APIRouter()
@@ -58,12 +60,16 @@ async def vote_on_news(
     )
     db.add(new_vote)
     
+    # Cập nhật vote_count + ranking_score của tin ngay (không chờ job ranking)
+    await HotnessRanking.apply_vote(db, news_id)
+    
     # Reward user
     reward = 0.1  # Base reward for voting
     current_user.balance += reward
     
     await db.commit()
     await db.refresh(new_vote)
+    ranking_index.record_vote(news_id)
     
     return VoteResponse(
         id=new_vote.id,
@@ -0,0 +1,149 @@
+"""
+Shared response cache: local (in-process) + Redis fallback giữa các uvicorn worker
+
+- TTL: giá trị "fresh" trong ttl giây
+- Stale-while-revalidate: hết ttl nhưng chưa quá stale_ttl -> trả giá trị cũ ngay, refresh nền
+- Single-flight: mỗi key chỉ một lần compute đồng thời trong một worker
+"""
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logger import log
+
+
+class ResponseCache:
+    REDIS_RETRY_SECONDS = 30  # Redis lỗi -> chỉ dùng local cache trong khoảng này
+
+    def __init__(self, namespace: str = "response_cache"):
+        self.namespace = namespace
+        self.redis_client: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+        # key -> (value, stored_at)
+        self._local: Dict[str, Tuple[Any, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def _redis(self) -> redis.Redis:
+        if self.redis_client is None:
+            self.redis_client = redis.from_url(
+                settings.REDIS_URL,
+                encoding="utf-8",
+                decode_responses=True
+            )
+        return self.redis_client
+
+    async def close(self):
+        """Close Redis connection"""
+        for task in self._refreshing.values():
+            task.cancel()
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    def _redis_failed(self, action: str, key: str, error: Exception):
+        log.warning(f"Cache: Redis {action} failed for {key}: {error}")
+        self._redis_down_until = time.time() + self.REDIS_RETRY_SECONDS
+
+    async def _redis_get(self, key: str) -> Optional[Tuple[Any, float]]:
+        if time.time() < self._redis_down_until:
+            return None
+        try:
+            payload = await self._redis().get(f"{self.namespace}:{key}")
+        except Exception as e:
+            self._redis_failed("get", key, e)
+            return None
+        if not payload:
+            return None
+        data = json.loads(payload)
+        return data["value"], data["stored_at"]
+
+    async def _redis_set(self, key: str, value: Any, stored_at: float, stale_ttl: int):
+        if time.time() < self._redis_down_until:
+            return
+        try:
+            await self._redis().set(
+                f"{self.namespace}:{key}",
+                json.dumps({"value": value, "stored_at": stored_at}),
+                ex=stale_ttl
+            )
+        except Exception as e:
+            self._redis_failed("set", key, e)
+
+    async def _load(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int
+    ) -> Tuple[Any, float]:
+        """
+        Dưới lock của key: dùng bản Redis nếu worker khác vừa tính xong, không thì compute
+        """
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            now = time.time()
+            entry = self._local.get(key)
+            if entry and now - entry[1] < ttl:
+                return entry  # Request khác trong worker đã tính xong trong lúc chờ lock
+
+            shared = await self._redis_get(key)
+            if shared and now - shared[1] < ttl:
+                self._local[key] = shared
+                return shared
+            if shared and entry is None and now - shared[1] < stale_ttl:
+                # Worker mới khởi động: dùng bản chung (stale) ngay, caller sẽ refresh nền
+                self._local[key] = shared
+                return shared
+
+            value = await compute()
+            entry = (value, time.time())
+            self._local[key] = entry
+            await self._redis_set(key, value, entry[1], stale_ttl)
+            return entry
+
+    async def _refresh(self, key: str, compute, ttl: int, stale_ttl: int):
+        try:
+            await self._load(key, compute, ttl, stale_ttl)
+        except Exception as e:
+            log.error(f"Cache: background refresh failed for {key}: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    def _schedule_refresh(self, key: str, compute, ttl: int, stale_ttl: int):
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key, compute, ttl, stale_ttl))
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int
+    ) -> Any:
+        """
+        Args:
+            compute: coroutine function tính giá trị (JSON-serializable), không phụ thuộc request
+            ttl: giây giá trị còn fresh
+            stale_ttl: giây tối đa được trả giá trị cũ trong khi refresh nền (>= ttl)
+        """
+        entry = self._local.get(key)
+        if entry is None:
+            entry = await self._load(key, compute, ttl, stale_ttl)
+
+        age = time.time() - entry[1]
+        if age < ttl:
+            return entry[0]
+        if age < stale_ttl:
+            self._schedule_refresh(key, compute, ttl, stale_ttl)
+            return entry[0]
+
+        value, _ = await self._load(key, compute, ttl, stale_ttl)
+        return value
+
+
+# Shared instance (mỗi worker một local cache, dùng chung Redis)
+response_cache = ResponseCache()
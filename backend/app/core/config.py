@@ -39,6 +39,76 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Optional[str] = None
     
+    # Crawler scheduler
+    CRAWL_MAX_CONCURRENCY: int = 20  # Fetch đồng thời tối đa (toàn cục)
+    CRAWL_PER_HOST_LIMIT: int = 2  # Fetch đồng thời tối đa trên cùng một host
+    CRAWL_SOURCE_TIMEOUT: int = 60  # Deadline (giây) cho mỗi nguồn
+    CRAWL_PROCESS_CONCURRENCY: int = 4  # Số nguồn xử lý (dedup/AI/lưu) đồng thời, mỗi nguồn một DB session
+
+    # CPU worker pool (parse feed / extract article trong process riêng)
+    CPU_POOL_WORKERS: int = 0  # 0 -> số CPU
+    CPU_POOL_MAX_PENDING: int = 64  # Task chờ/chạy tối đa, vượt quá thì caller phải đợi
+    CPU_POOL_TASK_TIMEOUT: int = 30  # Giây, quá thì kill worker và dựng pool mới
+    CPU_POOL_RECYCLE_TASKS: int = 500  # Thay pool mới sau N task
+
+    # Enrichment queue (fetch full article nền sau khi lưu tin)
+    ENRICH_MIN_CONTENT_LENGTH: int = 500  # Content RSS ngắn hơn -> enrich
+    ENRICH_WORKERS: int = 8  # Số trang fetch/extract đồng thời
+    ENRICH_QUEUE_SIZE: int = 200  # Queue đầy -> crawler chờ
+    ENRICH_BATCH_SIZE: int = 20  # Số tin mỗi lần bulk UPDATE
+    ENRICH_REQUEUE_MINUTES: int = 60  # Lần chạy sau chỉ thử lại tin tạo trong khoảng này
+    ENRICH_MAX_ATTEMPTS: int = 3  # Số lần requeue tối đa; hết lượt thì phân tích AI trên content ngắn
+
+    # LLM batch analysis (nhiều bài / request)
+    LLM_BATCH_MAX_ITEMS: int = 8  # Số bài tối đa trong một request batch
+    LLM_BATCH_MAX_INPUT_TOKENS: int = 24000  # Input token ước lượng tối đa mỗi request batch
+    LLM_BATCH_OUTPUT_TOKENS_PER_ITEM: int = 700  # Dự trù output cho mỗi bài
+    LLM_MAX_OUTPUT_TOKENS: int = 8192  # Giới hạn output của model
+
+    # LLM analysis cache (hash title/content/prompt/model -> kết quả, local LRU + Redis)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Giữ kết quả trong Redis 7 ngày
+    LLM_CACHE_LOCAL_SIZE: int = 2000  # Số kết quả tối đa trong LRU của process
+
+    # Dùng lại phân tích của cluster lead cho tin cùng sự kiện (không gọi LLM)
+    LLM_SHARE_CLUSTER_ANALYSIS: bool = True
+    LLM_SHARE_MIN_SIMILARITY: int = 75  # Cùng ngưỡng với clustering (tin > 85% đã bị dedup bỏ)
+
+    # LLM dispatcher (concurrency + quota Gemini API)
+    LLM_CONCURRENCY: int = 4  # Số request đồng thời
+    LLM_RPM_LIMIT: int = 30  # Request / phút (0 = không giới hạn)
+    LLM_TPM_LIMIT: int = 1_000_000  # Token / phút (0 = không giới hạn)
+    LLM_MAX_RETRIES: int = 4  # Số lần retry khi bị 429
+    LLM_RETRY_BASE_SECONDS: float = 2.0  # Backoff: base * 2^attempt (có jitter)
+    LLM_RETRY_MAX_SECONDS: float = 60.0
+
+    # Pre-classifier cục bộ trước LLM (train bằng train_preclassifier.py)
+    PRECLASSIFIER_MODEL_FILE: str = "preclassifier.joblib"  # Không có file -> mọi tin đi LLM
+    PRECLASSIFIER_SKIP_BELOW: float = 0.05  # Xác suất relevant thấp hơn -> bỏ qua, không gọi LLM
+    PRECLASSIFIER_DOWNGRADE_BELOW: float = 0.3  # Thấp hơn -> lane thấp của llm_dispatcher
+    PRECLASSIFIER_CATEGORY_CONFIDENCE: float = 0.8  # Dự đoán market_move từ mức này -> lane ưu tiên
+
+    # HTTP client pool (shared aiohttp session)
+    HTTP_POOL_LIMIT: int = 100  # Tổng số connection mở tối đa
+    HTTP_POOL_LIMIT_PER_HOST: int = 10  # Connection tối đa trên mỗi host
+    HTTP_DNS_CACHE_TTL: int = 300  # Giây
+
+    # Ranking job (background_ranking.py)
+    RANKING_COMPONENTS_REFRESH_MINUTES: int = 30  # Chu kỳ tính lại base_score/vote_count từ sources + votes
+
+    # Trending index (in-memory, mỗi API worker)
+    RANKING_INDEX_WINDOW_HOURS: int = 72  # Khớp time window của job ranking
+    RANKING_INDEX_REFRESH_SECONDS: int = 15  # Reload từ DB (tin mới, cluster lead, vote từ worker khác)
+    RANKING_ORDER_RESOLUTION_SECONDS: int = 5  # Giữ nguyên thứ tự trong snapshot -> phân trang ổn định
+
+    # Response cache cho /trends (local + Redis)
+    TRENDS_CACHE_TTL: int = 60  # Giây giá trị còn fresh
+    TRENDS_CACHE_STALE_TTL: int = 600  # Giây tối đa trả bản cũ trong khi refresh nền
+
+    # Tagger taxonomy (JSON, hot reload theo mtime)
+    TAXONOMY_FILE: str = "taxonomy.json"  # Không có file -> dùng taxonomy built-in
+    TAXONOMY_RELOAD_SECONDS: int = 30  # Chu kỳ kiểm tra mtime
+
     # Feature Flags
     ENABLE_PAYWALL: bool = False  # Set to True to enable content locking
 
@@ -2,45 +2,112 @@ import asyncio
 import aiohttp
 import random
 from fake_useragent import UserAgent
-from typing import Optional, Dict
+from typing import Optional, Dict, Any
 
+from app.core.config import settings
 from app.core.logger import log
 
+# Process-wide pooled session (keep-alive, connection reuse, DNS cache)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared aiohttp session, creating it lazily on first use.
+    Connection caps and DNS cache TTL come from settings.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            use_dns_cache=True
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+    return _session
+
+
+async def close_session():
+    """Shutdown hook: close the shared session and its pooled connections."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
 class NetworkClient:
+    UA_POOL_SIZE = 20
+
     def __init__(self, timeout: int = 15, retries: int = 3):
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.retries = retries
-        self.ua = UserAgent()
+        self._ua_pool: list[str] = []
+
+    def _random_user_agent(self) -> str:
+        # UserAgent() loads its browser dataset and .random costs several ms of CPU per call
+        # (blocks the event loop): build it on first request only (not at import time, the module is
+        # imported by the API and every CPU pool worker), sample a small pool once and rotate through it.
+        if not self._ua_pool:
+            ua = UserAgent()
+            self._ua_pool = [ua.random for _ in range(self.UA_POOL_SIZE)]
+        return random.choice(self._ua_pool)
 
     async def fetch(self, url: str) -> Optional[str]:
         """
         Fetch URL content with exponential backoff and random User-Agent.
         Returns HTML content string or None if failed.
         """
+        response = await self.fetch_conditional(url)
+        return response["text"] if response else None
+
+    async def fetch_conditional(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        GET with If-None-Match / If-Modified-Since validators (same retry policy as fetch).
+        Returns {"status": 200 | 304, "text", "etag", "last_modified"} or None if failed.
+        """
         for attempt in range(self.retries):
             headers = {
-                "User-Agent": self.ua.random,
+                "User-Agent": self._random_user_agent(),
                 "Accept-Language": "en-US,en;q=0.9",
                 "Connection": "keep-alive"
             }
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
             try:
                 log.debug(f"Fetching {url} (Attempt {attempt+1})")
-                async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                    async with session.get(url, headers=headers) as response:
-                        if response.status == 200:
-                            return await response.text()
-                        elif response.status == 429: # Too Many Requests
-                            wait_time = (2 ** attempt) + random.uniform(0, 1)
-                            log.warning(f"Rate limited {url}. Waiting {wait_time:.2f}s...")
-                            await asyncio.sleep(wait_time)
-                        else:
-                             log.warning(f"Fetch failed {url}: Status {response.status}")
-                             if response.status == 404 or response.status == 403:
-                                 break # Don't retry
+                session = await get_session()
+                async with session.get(url, headers=headers, timeout=self.timeout) as response:
+                    if response.status in (200, 304):
+                        return {
+                            "status": response.status,
+                            "text": await response.text() if response.status == 200 else None,
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified")
+                        }
+                    elif response.status == 429: # Too Many Requests
+                        wait_time = (2 ** attempt) + random.uniform(0, 1)
+                        log.warning(f"Rate limited {url}. Waiting {wait_time:.2f}s...")
+                        await asyncio.sleep(wait_time)
+                    else:
+                         log.warning(f"Fetch failed {url}: Status {response.status}")
+                         if response.status == 404 or response.status == 403:
+                             break # Don't retry
             except Exception as e:
                 log.error(f"Network error {url}: {e}")
                 wait_time = (2 ** attempt) + random.uniform(0, 1)
                 await asyncio.sleep(wait_time)
-        
+
         log.error(f"Failed to fetch {url} after {self.retries} attempts.")
         return None
+
+
+# Shared client instance (crawlers, enricher)
+network_client = NetworkClient()
@@ -39,3 +39,12 @@ Follow this schema strictly:
    - "security": Hacks, exploits, scams, rug pulls, regulatory warnings
    - "opinion": Editorials, influencer thoughts, general commentary
 """
+
+# Batch mode (Task 2.3b): nhiều bài trong một request, system prompt chỉ trả một lần
+BATCH_ANALYSIS_PROMPT = """
+**BATCH MODE:**
+The JSON below is an object `{"articles": [...]}`. Each article has `id`, `title`, `content` and `source`.
+Analyze EACH article independently, following all rules above.
+Return a **VALID JSON ARRAY** with exactly one object per article. Each object must contain the article's `id`
+(unchanged) plus every field of the output schema. Do not merge or skip articles.
+"""
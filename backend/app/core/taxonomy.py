@@ -1,4 +1,9 @@
 # Simple taxonomy for tagging
+# Mặc định built-in; có thể override bằng file JSON (settings.TAXONOMY_FILE), tagger tự reload khi file đổi
+import json
+import os
+from typing import Dict, List, NamedTuple
+
 COIN_KEYWORDS = {
     'BTC': ['bitcoin', 'btc', 'satoshi', 'nakamoto'],
     'ETH': ['ethereum', 'eth', 'vitalik', 'erc-20', 'erc20'],
@@ -20,3 +25,44 @@ TOPIC_KEYWORDS = {
     'Security': ['hack', 'exploit', 'scam', 'phishing', 'security', 'audit'],
     'Technology': ['upgrade', 'fork', 'layer2', 'zk-rollup', 'mainnet', 'testnet']
 }
+
+# General crypto terms: không gán coin/topic nhưng đủ để coi tin là relevant
+GENERAL_KEYWORDS = ['crypto', 'blockchain', 'web3', 'wallet', 'exchange', 'token']
+
+
+class Taxonomy(NamedTuple):
+    coins: Dict[str, List[str]]
+    topics: Dict[str, List[str]]
+    general: List[str]
+
+
+DEFAULT_TAXONOMY = Taxonomy(COIN_KEYWORDS, TOPIC_KEYWORDS, GENERAL_KEYWORDS)
+
+
+def load_taxonomy(path: str) -> Taxonomy:
+    """
+    Đọc taxonomy từ file JSON: {"coins": {"BTC": [...]}, "topics": {...}, "general": [...]}
+    Section nào thiếu thì dùng mặc định built-in.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    coins = data.get("coins", COIN_KEYWORDS)
+    topics = data.get("topics", TOPIC_KEYWORDS)
+    general = data.get("general", GENERAL_KEYWORDS)
+    if not isinstance(coins, dict) or not isinstance(topics, dict) or not isinstance(general, list):
+        raise ValueError(f"Invalid taxonomy file: {path}")
+
+    return Taxonomy(
+        coins={str(coin): [str(kw) for kw in keywords] for coin, keywords in coins.items()},
+        topics={str(topic): [str(kw) for kw in keywords] for topic, keywords in topics.items()},
+        general=[str(kw) for kw in general]
+    )
+
+
+def save_taxonomy(taxonomy: Taxonomy, path: str):
+    """Ghi file tạm rồi os.replace -> tagger đang chạy không bao giờ đọc phải file ghi dở"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(taxonomy._asdict(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
@@ -0,0 +1,127 @@
+"""
+CPU worker pool cho parse/extract (feedparser, trafilatura, dateparser...)
+Chạy hàm sync CPU-heavy trong process riêng để event loop không bị đứng khi parse.
+
+- Bounded queue: tối đa max_pending task đang chờ/chạy, caller khác await (backpressure)
+- Chỉ tối đa max_workers task được gửi vào executor cùng lúc: task không phải xếp hàng
+  trong executor, nên timeout chỉ tính thời gian chạy thật
+- Timeout từng task: task treo -> kill các worker process và dựng pool mới
+- Recycling: sau recycle_tasks task thì thay pool mới (giải phóng bộ nhớ rò rỉ của lxml/trafilatura)
+
+Hàm chạy trong pool phải là hàm module-level (pickle được), tham số và kết quả cũng vậy.
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import log
+
+
+class WorkerTimeout(Exception):
+    """Task vượt quá timeout trong CPU worker pool"""
+
+
+def _register_worker(pids):
+    """Initializer của worker process: báo PID về process cha (để kill khi task treo)"""
+    pids.put(os.getpid())
+
+
+class CpuWorkerPool:
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        recycle_tasks: Optional[int] = None
+    ):
+        self.max_workers = max_workers or settings.CPU_POOL_WORKERS or os.cpu_count() or 1
+        self.max_pending = max_pending or settings.CPU_POOL_MAX_PENDING
+        self.task_timeout = task_timeout or settings.CPU_POOL_TASK_TIMEOUT
+        self.recycle_tasks = recycle_tasks or settings.CPU_POOL_RECYCLE_TASKS
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._worker_pids: Optional[multiprocessing.Queue] = None  # PID các worker của executor hiện tại
+        self._submitted = 0  # Số task đã gửi vào executor hiện tại
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Tuple[ProcessPoolExecutor, multiprocessing.Queue]:
+        if self._executor is not None and self._submitted >= self.recycle_tasks:
+            # Pool cũ chạy nốt task đang có rồi tự thoát
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            log.debug("CPU pool recycled")
+        if self._executor is None:
+            # spawn: worker không thừa kế event loop / connection của process cha (và chạy được trên Windows)
+            context = multiprocessing.get_context("spawn")
+            self._worker_pids = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_register_worker,
+                initargs=(self._worker_pids,)
+            )
+            self._submitted = 0
+        return self._executor, self._worker_pids
+
+    def _kill(self, executor: ProcessPoolExecutor, worker_pids: multiprocessing.Queue):
+        """Dừng ngay mọi worker của executor (task treo không huỷ được bằng Future.cancel)"""
+        if executor is self._executor:
+            self._executor = None
+        while True:
+            try:
+                pid = worker_pids.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass  # Worker đã thoát
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        Chạy fn(*args) trong worker process.
+
+        Raises:
+            WorkerTimeout: quá timeout (mặc định settings.CPU_POOL_TASK_TIMEOUT)
+            Exception của fn (được pickle từ worker về)
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._running = asyncio.Semaphore(self.max_workers)
+        timeout = timeout or self.task_timeout
+
+        async with self._slots, self._running:
+            for attempt in range(2):
+                executor, worker_pids = self._get_executor()
+                self._submitted += 1
+                try:
+                    future = executor.submit(fn, *args)
+                    return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+                except asyncio.TimeoutError:
+                    log.warning(f"CPU task {getattr(fn, '__qualname__', fn)} timed out after {timeout}s, restarting pool")
+                    self._kill(executor, worker_pids)
+                    raise WorkerTimeout(f"{getattr(fn, '__qualname__', fn)} exceeded {timeout}s")
+                except BrokenProcessPool:
+                    # Pool bị kill do task khác timeout (hoặc worker crash): chạy lại một lần trên pool mới
+                    if executor is self._executor:
+                        self._executor = None
+                    if attempt:
+                        raise
+
+    async def close(self):
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+
+# Shared pool (crawler process)
+cpu_pool = CpuWorkerPool()
@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
-from app.core.network import NetworkClient
+from typing import List, Dict, Any, Optional
+from app.core.network import network_client
 
 class BaseCrawler(ABC):
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], feed_cache: Optional[Dict[str, Any]] = None):
         self.config = config
-        # Use a shared network client instance per crawler or global if needed.
-        # For now, instance level is fine.
-        self.network = NetworkClient()
+        # Validators from the previous fetch (etag, last_modified, content_hash).
+        # Crawlers that support conditional GET update this after fetch_data().
+        self.feed_cache = dict(feed_cache or {})
+        # Shared network client (pooled session, see app.core.network)
+        self.network = network_client
 
     @abstractmethod
     async def fetch_data(self) -> List[Dict[str, Any]]:
@@ -1,10 +1,14 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.crawlers.base import BaseCrawler
 from app.models.source import SourceType
 
 class CrawlerFactory:
     @staticmethod
-    def get_crawler(source_type: SourceType, config: Dict[str, Any]) -> BaseCrawler:
+    def get_crawler(
+        source_type: SourceType,
+        config: Dict[str, Any],
+        feed_cache: Optional[Dict[str, Any]] = None
+    ) -> BaseCrawler:
         if source_type == SourceType.rss:
             # We will implement RSSCrawler later, but for now we need runtime import to avoid circular dep issues if any,
             # or just import it here. Since RSSCrawler isn't created yet, we'll placeholder it.
@@ -18,7 +22,7 @@ class CrawlerFactory:
             # So I will assume the existence of `app.crawlers.rss.RSSCrawler` which allows me to write the factory code now.
             try:
                 from app.crawlers.rss import RSSCrawler
-                return RSSCrawler(config)
+                return RSSCrawler(config, feed_cache)
             except ImportError:
                  raise NotImplementedError("RSSCrawler not implemented yet.")
         
@@ -1,8 +1,9 @@
-import asyncio
+import hashlib
 import feedparser
 from typing import List, Dict, Any
 from datetime import datetime
 from app.crawlers.base import BaseCrawler
+from app.core.workers import cpu_pool
 from app.services.content_processor import ContentProcessor
 from app.services.normalizer import DateNormalizer
 
@@ -20,50 +21,84 @@ class RSSCrawler(BaseCrawler):
 
         # Use NetworkClient to fetch the RSS content raw string first
         # This allows us to use proxies/User-Agent rotation
-        raw_xml = await self.network.fetch(rss_url)
-        if not raw_xml:
+        # Conditional GET: send validators from the previous fetch
+        response = await self.network.fetch_conditional(
+            rss_url,
+            etag=self.feed_cache.get("etag"),
+            last_modified=self.feed_cache.get("last_modified")
+        )
+        if not response or (response["status"] == 200 and not response["text"]):
             # Fallback to feedparser default or just return empty
             # feedparser can fetch URL directly but less "Stealthy"
             # Let's try to parse the raw_xml string
             log.warning(f"Failed to fetch RSS XML from {rss_url}")
             return []
 
-        # Run feedparser on the string content
-        loop = asyncio.get_event_loop()
-        feed = await loop.run_in_executor(None, feedparser.parse, raw_xml)
-        
-        if not feed.entries:
+        if response["status"] == 304:
+            log.info(f"RSS not modified (304): {rss_url}")
+            return []
+
+        raw_xml = response["text"]
+        content_hash = hashlib.sha256(raw_xml.encode("utf-8", "replace")).hexdigest()
+        unchanged = content_hash == self.feed_cache.get("content_hash")
+        self.feed_cache = {
+            "etag": response["etag"],
+            "last_modified": response["last_modified"],
+            "content_hash": content_hash
+        }
+
+        if unchanged:
+            # Server ignores validators but the body is identical -> skip parsing
+            log.info(f"RSS body unchanged: {rss_url}")
+            return []
+
+        # Parse feed + clean từng entry trong CPU worker pool (không chặn event loop)
+        parsed = await cpu_pool.run(parse_feed, raw_xml)
+        if not parsed["entries"]:
             log.warning(f"No entries found in RSS feed: {rss_url}")
-            if feed.bozo:
-                log.warning(f"Feedparser error: {feed.bozo_exception}")
+            if parsed["bozo"]:
+                log.warning(f"Feedparser error: {parsed['bozo']}")
 
-        results = []
-        for entry in feed.entries:
-            # Task 1.8: Normalize Date
-            raw_date = None
-            if hasattr(entry, "published"): raw_date = entry.published
-            elif hasattr(entry, "updated"): raw_date = entry.updated
-            
-            published_at = DateNormalizer.normalize_date(raw_date)
+        return parsed["items"]
 
-            # Extract content
-            raw_content = entry.get("summary", "")
-            if "content" in entry:
-                raw_content = entry.content[0].value
 
-            # TASK 1.4: CLEAN & FILTER
-            cleaned_content = ContentProcessor.clean_text(raw_content)
-            title = entry.get("title", "No Title")
-            
-            if not ContentProcessor.is_valid_candidate(title, cleaned_content):
-                continue
+def parse_feed(raw_xml: str) -> Dict[str, Any]:
+    """
+    Chạy trong worker process: feedparser + normalize date + clean/filter từng entry.
+    Returns: {"items": [...], "entries": số entry, "bozo": lỗi feedparser hoặc None}
+    """
+    feed = feedparser.parse(raw_xml)
 
-            results.append({
-                "title": title,
-                "url": entry.get("link", ""),
-                "published_at": published_at,
-                "raw_content": cleaned_content
-            })
-            
-        return results
+    results = []
+    for entry in feed.entries:
+        # Task 1.8: Normalize Date
+        raw_date = None
+        if hasattr(entry, "published"): raw_date = entry.published
+        elif hasattr(entry, "updated"): raw_date = entry.updated
+        
+        published_at = DateNormalizer.normalize_date(raw_date)
+
+        # Extract content
+        raw_content = entry.get("summary", "")
+        if "content" in entry:
+            raw_content = entry.content[0].value
 
+        # TASK 1.4: CLEAN & FILTER
+        cleaned_content = ContentProcessor.clean_text(raw_content)
+        title = entry.get("title", "No Title")
+        
+        if not ContentProcessor.is_valid_candidate(title, cleaned_content):
+            continue
+
+        results.append({
+            "title": title,
+            "url": entry.get("link", ""),
+            "published_at": published_at,
+            "raw_content": cleaned_content
+        })
+        
+    return {
+        "items": results,
+        "entries": len(feed.entries),
+        "bozo": str(feed.bozo_exception) if feed.bozo else None
+    }
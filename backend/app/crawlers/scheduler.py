@@ -0,0 +1,121 @@
+"""
+Concurrent crawl scheduler
+Fetch nhiều nguồn song song (global limit + per-host limit + deadline cho từng nguồn)
+và trả kết quả ngay khi từng nguồn fetch xong.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Sequence, AsyncIterator
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.logger import log
+from app.crawlers.factory import CrawlerFactory
+from app.models.source import Source
+
+
+@dataclass
+class CrawlResult:
+    """Kết quả fetch của một Source"""
+    source: Source
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+    # Conditional GET validators sau fetch (None nếu crawler không hỗ trợ)
+    feed_cache: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CrawlScheduler:
+    """
+    Chạy fetch_data() của tất cả nguồn cùng lúc.
+    - max_concurrency: số fetch đồng thời tối đa (toàn cục)
+    - per_host_limit: số fetch đồng thời tối đa trên cùng một host
+    - source_timeout: deadline (giây) cho mỗi nguồn
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        source_timeout: Optional[float] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.CRAWL_MAX_CONCURRENCY
+        self.per_host_limit = per_host_limit or settings.CRAWL_PER_HOST_LIMIT
+        self.source_timeout = source_timeout or settings.CRAWL_SOURCE_TIMEOUT
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def _host_of(source_id: int, config: Dict[str, Any]) -> str:
+        """Host dùng để giới hạn per-host (fallback theo source id nếu không có URL)"""
+        url = config.get("rss_url") or config.get("url") or ""
+        return urlparse(url).netloc.lower() or f"source-{source_id}"
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _crawl_one(
+        self,
+        source: Source,
+        source_type,
+        config: Dict[str, Any],
+        host: str,
+        feed_cache: Dict[str, Any]
+    ) -> CrawlResult:
+        loop = asyncio.get_running_loop()
+
+        async with self._global_limit, self._host_limit(host):
+            started = loop.time()
+            try:
+                crawler = CrawlerFactory.get_crawler(source_type, config, feed_cache)
+                items = await asyncio.wait_for(crawler.fetch_data(), timeout=self.source_timeout)
+                return CrawlResult(
+                    source=source,
+                    items=items,
+                    elapsed=loop.time() - started,
+                    feed_cache=crawler.feed_cache
+                )
+            except asyncio.TimeoutError:
+                error = TimeoutError(f"Fetch exceeded {self.source_timeout}s deadline")
+                return CrawlResult(source=source, error=error, elapsed=loop.time() - started)
+            except Exception as e:
+                return CrawlResult(source=source, error=e, elapsed=loop.time() - started)
+
+    async def stream(self, sources: Sequence[Source]) -> AsyncIterator[CrawlResult]:
+        """
+        Fetch tất cả nguồn song song, yield CrawlResult theo thứ tự hoàn thành
+        (nguồn nhanh được xử lý trước, không phải chờ nguồn chậm).
+        """
+        log.info(
+            f"Crawling {len(sources)} sources "
+            f"(concurrency={self.max_concurrency}, per_host={self.per_host_limit}, "
+            f"timeout={self.source_timeout}s)"
+        )
+        # Đọc thuộc tính ORM ngay bây giờ: task có thể chạy sau khi session đã rollback/expire
+        tasks = []
+        for source in sources:
+            config = source.config or {}
+            host = self._host_of(source.id, config)
+            feed_cache = {
+                "etag": source.feed_etag,
+                "last_modified": source.feed_last_modified,
+                "content_hash": source.feed_content_hash
+            }
+            tasks.append(asyncio.create_task(
+                self._crawl_one(source, source.source_type, config, host, feed_cache)
+            ))
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer dừng sớm -> huỷ các fetch còn lại
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
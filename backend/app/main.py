@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.api import api_router
 from app.core.config import settings
+from app.core.network import close_session
+from app.core.cache import response_cache
 import logging
 
 # Configure logging
@@ -45,6 +47,8 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Coin87 API")
+    await close_session()
+    await response_cache.close()
 
 @app.get("/")
 async def root():
@@ -4,3 +4,6 @@ from app.models.news import News
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionType
 from app.models.news_signal_correlation import NewsSignalCorrelation
+from app.models.story_cluster import StoryCluster
+from app.models.mention_count import MentionCountHourly
+from app.models.rejected_news import RejectedNews
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.models.base import Base
+
+class MentionCountHourly(Base):
+    """
+    Task 5.8: Rollup số lần mention theo giờ cho mỗi tag / coin
+    Ghi incremental khi crawler lưu News, Trend Detection đọc 168 bucket thay vì quét bài viết
+    """
+    __tablename__ = "mention_counts_hourly"
+
+    kind = Column(String(8), primary_key=True)  # "tag" | "coin"
+    key = Column(String, primary_key=True)  # Đã upper()
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # Đầu giờ (UTC) theo published_at
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_mention_counts_hourly_kind_bucket", "kind", "bucket_start"),
+    )
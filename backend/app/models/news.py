@@ -25,10 +25,12 @@ class News(Base):
     title = Column(String, nullable=False)
     url = Column(String, unique=True, index=True, nullable=False)
     raw_content = Column(Text)
+    feed_summary = Column(Text, nullable=True)  # Task 2.3d: content từ RSS lúc crawl (đầu vào pre-classifier), raw_content có thể bị enrich thay
     tags = Column(JSON, default=[])
     topic_category = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
     is_full_content = Column(Boolean, default=False)
+    enrich_attempts = Column(Integer, default=0)  # Task 1.10b: số lần requeue enrich (giới hạn ENRICH_MAX_ATTEMPTS)
     
     # AI Analysis Columns (Task 2.3)
     summary_vi = Column(Text, nullable=True)
@@ -40,6 +42,7 @@ class News(Base):
     risk_level = Column(String, nullable=True)
     action_recommendation = Column(String, nullable=True)
     confidence_score = Column(Float, nullable=True)  # Task 7.2: AI confidence
+    analysis_source = Column(String(16), nullable=True)  # "ai": Gemini phân tích tin này | "cluster": kế thừa từ cluster lead
     
     # Phase 5: Truth Engine Columns
     category_type = Column(Enum(CategoryType), nullable=True)
@@ -52,6 +55,8 @@ class News(Base):
     
     # Task 5.7: Hotness Ranking
     ranking_score = Column(Float, default=0.0, index=True)    
+    base_score = Column(Float, default=0.0)  # Trust * Impact (phần tử số không đổi theo thời gian)
+    vote_count = Column(Integer, default=0)  # Cập nhật khi có vote mới
     # Task 5.10: Editor's Choice / Pinned
     is_pinned = Column(Boolean, default=False)
     pinned_until = Column(DateTime(timezone=True), nullable=True)
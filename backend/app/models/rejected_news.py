@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class RejectedNews(Base):
+    """
+    Task 2.3d: Tin bị loại trước khi lưu vào news (AI trả is_relevant=false, hoặc pre-classifier bỏ qua)
+    Không hiển thị; các dòng reason="ai" là nhãn âm để train pre-classifier.
+    URL đã có ở đây được UrlDeduplicator coi là đã xử lý (không phân tích / lưu lại ở cycle sau)
+    """
+    __tablename__ = "rejected_news"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_id = Column(Integer, ForeignKey("sources.id"))
+    title = Column(String, nullable=False)
+    url = Column(String, unique=True, index=True, nullable=False)
+    raw_content = Column(Text)
+    reason = Column(String(16), nullable=False)  # "ai" | "classifier"
+    relevance_score = Column(Float, nullable=True)  # Xác suất relevant của pre-classifier (nếu có)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -20,4 +20,9 @@ class Source(Base):
     trust_score = Column(Float, default=5.0)
     consecutive_failures = Column(Integer, default=0)
     last_error_log = Column(Text, nullable=True)
+
+    # Conditional GET validators (RSS feed cache)
+    feed_etag = Column(String, nullable=True)
+    feed_last_modified = Column(String, nullable=True)
+    feed_content_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
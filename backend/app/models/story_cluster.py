@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class StoryCluster(Base):
+    """
+    Task 5.6: Signature (centroid) của một Story Cluster
+    Cập nhật incremental khi có thành viên mới, tin mới chỉ so với signature thay vì từng thành viên
+    """
+    __tablename__ = "story_clusters"
+
+    id = Column(String(36), primary_key=True)  # = news.cluster_id
+    token_counts = Column(JSON, default={})  # token -> số thành viên có token đó
+    member_count = Column(Integer, default=0)
+    signature = Column(Text, nullable=True)  # Các token đa số, dùng để so khớp
+    last_member_at = Column(DateTime(timezone=True), index=True)  # published_at mới nhất trong cluster
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,191 @@
+"""
+Task 2.3b: LLM Analysis Cache
+Cùng một bài (press release đăng trên nhiều feed, crawler retry...) chỉ phân tích một lần.
+
+- Key: sha256 của (title, content) đã chuẩn hoá + prompt version + model
+- Local LRU (trong process) trước, Redis dùng chung giữa các lần chạy / process
+- Prompt version = hash của CRYPTO_ANALYST_SYSTEM_PROMPT + BATCH_ANALYSIS_PROMPT:
+  đổi prompt -> key mới, entry cũ bị xoá ở lần dùng Redis đầu tiên (còn lại tự hết TTL)
+- Hit/miss được đếm (stats()) để theo dõi hit rate
+"""
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logger import log
+from app.core.prompts import CRYPTO_ANALYST_SYSTEM_PROMPT, BATCH_ANALYSIS_PROMPT
+
+PROMPT_VERSION = hashlib.sha256(
+    (CRYPTO_ANALYST_SYSTEM_PROMPT + BATCH_ANALYSIS_PROMPT).encode("utf-8")
+).hexdigest()[:12]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class AnalysisCache:
+    REDIS_RETRY_SECONDS = 30  # Redis lỗi -> chỉ dùng local cache trong khoảng này
+    VERSION_KEY = "prompt_version"
+
+    def __init__(self, namespace: str = "llm_analysis"):
+        self.namespace = namespace
+        self.redis_client: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+        self._version_checked = False
+        self._local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        """NFKC + lower + gộp whitespace: khác biệt định dạng giữa các feed không tạo key mới"""
+        text = unicodedata.normalize("NFKC", text or "")
+        return _WHITESPACE.sub(" ", text).strip().lower()
+
+    def key(self, title: str, content: str) -> str:
+        """Key của bài (content nên là bản đã cắt đúng như gửi cho model)"""
+        digest = hashlib.sha256(
+            "\x00".join([
+                self._normalize(title),
+                self._normalize(content),
+                settings.GEMINI_MODEL
+            ]).encode("utf-8")
+        ).hexdigest()
+        return f"{PROMPT_VERSION}:{digest}"
+
+    def _redis(self) -> redis.Redis:
+        if self.redis_client is None:
+            self.redis_client = redis.from_url(
+                settings.REDIS_URL,
+                encoding="utf-8",
+                decode_responses=True
+            )
+        return self.redis_client
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
+    def _redis_failed(self, action: str, error: Exception):
+        log.warning(f"Analysis cache: Redis {action} failed: {error}")
+        self._redis_down_until = time.time() + self.REDIS_RETRY_SECONDS
+
+    def _redis_available(self) -> bool:
+        return settings.LLM_CACHE_ENABLED and time.time() >= self._redis_down_until
+
+    async def _check_version(self):
+        """Prompt đổi so với lần chạy trước -> xoá các entry của version cũ"""
+        if self._version_checked:
+            return
+        client = self._redis()
+        version_key = f"{self.namespace}:{self.VERSION_KEY}"
+        previous = await client.get(version_key)
+        if previous == PROMPT_VERSION:
+            self._version_checked = True
+            return
+
+        deleted = 0
+        batch: List[str] = []
+        async for key in client.scan_iter(match=f"{self.namespace}:*", count=1000):
+            if key != version_key and not key.startswith(f"{self.namespace}:{PROMPT_VERSION}:"):
+                batch.append(key)
+            if len(batch) >= 1000:
+                deleted += await client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += await client.delete(*batch)
+        await client.set(version_key, PROMPT_VERSION)
+        # Chỉ đánh dấu khi đã dọn xong: Redis lỗi giữa chừng -> lần gọi sau kiểm tra lại
+        self._version_checked = True
+        log.info(f"Analysis cache: prompt version {previous} -> {PROMPT_VERSION}, removed {deleted} entries")
+
+    def _remember(self, key: str, analysis: Dict[str, Any]):
+        self._local[key] = analysis
+        self._local.move_to_end(key)
+        while len(self._local) > settings.LLM_CACHE_LOCAL_SIZE:
+            self._local.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        {key: analysis} cho các key đã có (local LRU, còn lại một MGET Redis).
+        Trả bản copy: caller sửa kết quả không làm hỏng cache.
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            return {}
+
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for key in unique:
+            if key in self._local:
+                self._local.move_to_end(key)
+                found[key] = dict(self._local[key])
+                self.local_hits += 1
+            else:
+                missing.append(key)
+
+        if missing and self._redis_available():
+            try:
+                await self._check_version()
+                payloads = await self._redis().mget([f"{self.namespace}:{key}" for key in missing])
+            except Exception as e:
+                self._redis_failed("get", e)
+                payloads = [None] * len(missing)
+
+            for key, payload in zip(missing, payloads):
+                if payload:
+                    analysis = json.loads(payload)
+                    self._remember(key, analysis)
+                    found[key] = dict(analysis)
+                    self.redis_hits += 1
+
+        self.misses += len(unique) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([key])).get(key)
+
+    async def set_many(self, analyses: Dict[str, Dict[str, Any]]):
+        """Lưu kết quả phân tích (local + Redis pipeline, TTL LLM_CACHE_TTL_SECONDS)"""
+        if not settings.LLM_CACHE_ENABLED or not analyses:
+            return
+        for key, analysis in analyses.items():
+            self._remember(key, dict(analysis))
+
+        if not self._redis_available():
+            return
+        try:
+            await self._check_version()
+            async with self._redis().pipeline(transaction=False) as pipe:
+                for key, analysis in analyses.items():
+                    pipe.set(f"{self.namespace}:{key}", json.dumps(analysis), ex=settings.LLM_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed("set", e)
+
+    async def set(self, key: str, analysis: Dict[str, Any]):
+        await self.set_many({key: analysis})
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        hits = self.local_hits + self.redis_hits
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Shared instance (crawler process)
+analysis_cache = AnalysisCache()
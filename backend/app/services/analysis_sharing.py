@@ -0,0 +1,171 @@
+"""
+Task 5.6b: Cluster Analysis Sharing
+Tin cùng sự kiện (cùng story cluster) dùng lại phân tích AI của cluster lead thay vì gọi Gemini lần nữa.
+
+- Tiêu đề tin mới được so với signature của các cluster còn active có lead đã phân tích
+  (cùng cách so khớp với NewsClusteringService), và với các tin vừa phân tích trong lần chạy này
+  (chưa qua job clustering)
+- Delta check (không gọi LLM): tin nhắc tới coin mà lead không có -> có thông tin mới, phân tích riêng
+- Polarity check: từ chỉ hướng khác lead ("surges above" / "plunges below", "approves" / "rejects",
+  có phủ định...) -> sentiment có thể ngược, phân tích riêng. Tiêu đề ngược hướng vẫn có
+  token_set_ratio > 80 nên ngưỡng similarity một mình không đủ
+- Chỉ kế thừa phần đánh giá (sentiment, coins, risk, category...); summary để trống
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import log
+from app.models.news import News
+from app.models.story_cluster import StoryCluster
+from app.services.clustering import NewsClusteringService
+from app.services.similarity import normalize_title, similarity_matrix
+
+# Từ chỉ hướng theo trục: (tăng / tích cực, giảm / tiêu cực)
+DIRECTION_AXES = {
+    "price": (
+        {"surge", "surges", "surged", "soar", "soars", "soared", "rally", "rallies", "rallied",
+         "jump", "jumps", "jumped", "rise", "rises", "rose", "climb", "climbs", "climbed",
+         "gain", "gains", "gained", "spike", "spikes", "rebound", "rebounds", "pump", "pumps",
+         "up", "above", "higher", "bullish", "ath"},
+        {"plunge", "plunges", "plunged", "crash", "crashes", "crashed", "drop", "drops", "dropped",
+         "fall", "falls", "fell", "slide", "slides", "slid", "sink", "sinks", "sank",
+         "tumble", "tumbles", "tumbled", "slump", "slumps", "dip", "dips", "dump", "dumps",
+         "decline", "declines", "declined", "loss", "losses", "down", "below", "lower", "bearish"},
+    ),
+    "decision": (
+        {"approve", "approves", "approved", "approval", "greenlight", "greenlights", "allow", "allows",
+         "allowed", "launch", "launches", "launched", "list", "lists", "listing", "lifts", "wins"},
+        {"reject", "rejects", "rejected", "rejection", "deny", "denies", "denied", "delay", "delays",
+         "delayed", "postpone", "postpones", "postponed", "ban", "bans", "banned", "block", "blocks",
+         "blocked", "delist", "delists", "delisting", "halt", "halts", "halted", "suspend", "suspends",
+         "suspended", "sue", "sues", "sued"},
+    ),
+    "flow": (
+        {"inflow", "inflows", "buy", "buys", "bought", "buying", "accumulate", "accumulates", "accumulating"},
+        {"outflow", "outflows", "sell", "sells", "sold", "selling", "selloff"},
+    ),
+}
+NEGATIONS = {"not", "no", "never", "fail", "fails", "failed", "without"}
+
+DIRECTION_TERMS: Dict[str, Tuple[str, int]] = {}
+for _axis, (_up, _down) in DIRECTION_AXES.items():
+    DIRECTION_TERMS.update({term: (_axis, 1) for term in _up})
+    DIRECTION_TERMS.update({term: (_axis, -1) for term in _down})
+DIRECTION_TERMS.update({term: ("negation", 0) for term in NEGATIONS})
+
+# Cột phân tích được kế thừa từ lead
+SHARED_FIELDS = (
+    "sentiment_score",
+    "sentiment_label",
+    "coins_mentioned",
+    "key_events",
+    "risk_level",
+    "action_recommendation",
+    "category_type",
+)
+
+
+class ClusterAnalysisSharing:
+    RELOAD_SECONDS = 300  # Nạp lại lead từ DB (job clustering chạy mỗi 10 phút)
+    MAX_RECENT = 2000  # Số tin vừa phân tích giữ lại để so khớp
+
+    # (signature, ai_data, coins, từ chỉ hướng trong tiêu đề của lead)
+    _cluster_leads: List[Tuple[str, Dict[str, Any], frozenset, frozenset]] = []
+    _recent: List[Tuple[str, Dict[str, Any], frozenset, frozenset]] = []
+    _loaded_at: Optional[datetime] = None
+    shared = 0
+
+    @staticmethod
+    def _signature(title: str) -> str:
+        # Giống signature của cluster một thành viên
+        return " ".join(sorted(set(normalize_title(title.lower()).split())))
+
+    @staticmethod
+    def _directions(title: str) -> frozenset:
+        """(trục, dấu) của các từ chỉ hướng trong tiêu đề"""
+        return frozenset(
+            DIRECTION_TERMS[token] for token in normalize_title(title.lower()).split() if token in DIRECTION_TERMS
+        )
+
+    @classmethod
+    async def _load(cls, db: AsyncSession):
+        """Lead đã có phân tích của các cluster còn trong time window (1 query)"""
+        now = datetime.now(timezone.utc)
+        if cls._loaded_at and (now - cls._loaded_at).total_seconds() < cls.RELOAD_SECONDS:
+            return
+
+        cutoff = now - timedelta(hours=NewsClusteringService.TIME_WINDOW_HOURS)
+        result = await db.execute(
+            select(StoryCluster.signature, News.title, News.tags, *[getattr(News, field) for field in SHARED_FIELDS])
+            .join(News, and_(News.cluster_id == StoryCluster.id, News.is_cluster_lead == True))
+            .where(
+                and_(
+                    StoryCluster.last_member_at >= cutoff,
+                    StoryCluster.signature.isnot(None),
+                    News.sentiment_label.isnot(None)
+                )
+            )
+        )
+        leads = []
+        for signature, title, tags, *values in result.all():
+            ai_data = dict(zip(SHARED_FIELDS, values))
+            leads.append((signature, ai_data, cls._coins(ai_data, tags), cls._directions(title)))
+        cls._cluster_leads = leads
+        cls._loaded_at = now
+        log.info(f"Analysis sharing: loaded {len(leads)} analyzed cluster leads")
+
+    @staticmethod
+    def _coins(ai_data: Dict[str, Any], tags: Optional[Sequence[str]]) -> frozenset:
+        return frozenset(str(coin).upper() for coin in (ai_data.get("coins_mentioned") or []) + list(tags or []))
+
+    @classmethod
+    def remember(cls, title: str, ai_data: Dict[str, Any], tags: Optional[Sequence[str]] = None):
+        """Tin vừa được phân tích đầy đủ -> tin tương tự sau đó trong lần chạy dùng lại được"""
+        if ai_data.get("sentiment_label") is None:
+            return
+        shared = {field: ai_data.get(field) for field in SHARED_FIELDS}
+        cls._recent.append((cls._signature(title), shared, cls._coins(shared, tags), cls._directions(title)))
+        del cls._recent[:-cls.MAX_RECENT]
+
+    @classmethod
+    async def match(cls, db: AsyncSession, items: List[Tuple[str, Sequence[str]]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Args:
+            items: [(title, coins từ tagger)]
+        Returns:
+            Theo thứ tự đầu vào: ai_data kế thừa từ lead khớp nhất, hoặc None (cần phân tích riêng)
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        if not items:
+            return results
+
+        await cls._load(db)
+        leads = cls._cluster_leads + cls._recent
+        if not leads:
+            return results
+
+        threshold = settings.LLM_SHARE_MIN_SIMILARITY
+        scores = similarity_matrix(
+            [normalize_title(title.lower()) for title, _ in items],
+            [signature for signature, *_ in leads],
+            min_score=threshold
+        )
+        for i, row in enumerate(scores):
+            coins = {coin.upper() for coin in items[i][1]}
+            directions = cls._directions(items[i][0])
+            # Điểm cao nhất trước; bỏ lead thiếu coin mà tin nhắc tới hoặc khác từ chỉ hướng
+            for col in np.argsort(-row.astype(np.int16), kind="stable"):
+                if row[col] < threshold:
+                    break
+                _, ai_data, lead_coins, lead_directions = leads[col]
+                if coins <= lead_coins and directions == lead_directions:
+                    results[i] = dict(ai_data)
+                    break
+
+        cls.shared += sum(result is not None for result in results)
+        return results
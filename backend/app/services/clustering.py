@@ -3,12 +3,15 @@ Task 5.6: News Clustering Service
 Gom nhóm các tin tức giống nhau thành Story Clusters
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, func, and_
 from app.models.news import News
 from app.models.source import Source
+from app.models.story_cluster import StoryCluster
 from app.core.logger import log
+from app.services.similarity import normalize_title, similarity_matrix, title_similarity
 from datetime import datetime, timedelta
-from thefuzz import fuzz
+from typing import Dict, Optional, Tuple
+import numpy as np
 import uuid
 
 class NewsClusteringService:
@@ -19,19 +22,24 @@ class NewsClusteringService:
     
     SIMILARITY_THRESHOLD = 75  # 75% tương đồng
     TIME_WINDOW_HOURS = 6      # Cửa sổ thời gian để gom nhóm
+    SIGNATURE_MAX_TOKENS = 16  # Số token tối đa trong signature của cluster
+    ASSIGN_CHUNK_SIZE = 64     # Số tin chấm điểm chung một lần cdist khi gán cluster
     
     @staticmethod
     async def cluster_recent_news(db: AsyncSession) -> dict:
         """
         Chạy định kỳ để gom nhóm tin mới
         
+        Tin mới chỉ được so với signature của các cluster còn active (bảng story_clusters),
+        không cần nạp lại các tin đã gom nhóm.
+        
         Returns:
             dict với thông tin số cluster tạo ra
         """
         cutoff_time = datetime.now() - timedelta(hours=NewsClusteringService.TIME_WINDOW_HOURS)
         
-        # Lấy tin chưa được gom nhóm trong 6h qua
-        unclustered_query = select(News).where(
+        # Lấy tin chưa được gom nhóm trong 6h qua (chỉ các cột cần thiết)
+        unclustered_query = select(News.id, News.title, News.published_at).where(
             and_(
                 News.cluster_id.is_(None),
                 News.published_at >= cutoff_time
@@ -39,105 +47,208 @@ class NewsClusteringService:
         ).order_by(News.published_at.desc())
         
         result = await db.execute(unclustered_query)
-        unclustered_news = result.scalars().all()
+        unclustered_news = result.all()
         
         if not unclustered_news:
             log.info("No unclustered news to process")
             return {"clusters_created": 0, "news_processed": 0}
         
-        # Lấy tất cả cluster hiện có trong time window
-        existing_clusters_query = select(News).where(
-            and_(
-                News.cluster_id.isnot(None),
-                News.published_at >= cutoff_time
-            )
-        )
+        # Signature của các cluster có thành viên trong time window
+        clusters_query = select(StoryCluster).where(StoryCluster.last_member_at >= cutoff_time)
+        clusters_result = await db.execute(clusters_query)
+        clusters = list(clusters_result.scalars().all())
         
-        existing_result = await db.execute(existing_clusters_query)
-        existing_clustered = existing_result.scalars().all()
+        assignments, new_clusters = NewsClusteringService._assign_clusters(unclustered_news, clusters)
         
-        # Map cluster_id -> list of news
-        clusters = {}
-        for news in existing_clustered:
-            if news.cluster_id not in clusters:
-                clusters[news.cluster_id] = []
-            clusters[news.cluster_id].append(news)
+        db.add_all(new_clusters)
+        new_cluster_ids = {cluster.id for cluster in new_clusters}
+        # Bulk UPDATE theo primary key
+        await db.execute(
+            update(News),
+            [
+                {"id": news_id, "cluster_id": cluster_id, "is_cluster_lead": cluster_id in new_cluster_ids}
+                for news_id, cluster_id in assignments.items()
+            ]
+        )
         
-        new_clusters = 0
-        processed = 0
-        
-        for news in unclustered_news:
-            processed += 1
-            matched_cluster = None
-            
-            # Thử match với các cluster hiện có
-            for cluster_id, cluster_items in clusters.items():
-                for cluster_news in cluster_items:
-                    similarity = fuzz.token_set_ratio(
-                        news.title.lower(),
-                        cluster_news.title.lower()
-                    )
-                    
-                    if similarity >= NewsClusteringService.SIMILARITY_THRESHOLD:
-                        matched_cluster = cluster_id
-                        break
-                
-                if matched_cluster:
-                    break
-            
-            if matched_cluster:
-                # Thêm vào cluster hiện có
-                news.cluster_id = matched_cluster
-                clusters[matched_cluster].append(news)
-                log.info(f"News {news.id} added to cluster {matched_cluster}")
-            else:
-                # Tạo cluster mới
-                new_cluster_id = str(uuid.uuid4())
-                news.cluster_id = new_cluster_id
-                news.is_cluster_lead = True  # Tin đầu tiên làm lead
-                clusters[new_cluster_id] = [news]
-                new_clusters += 1
-                log.info(f"Created new cluster {new_cluster_id} with news {news.id}")
-        
-        # Cập nhật cluster leads dựa trên trust_score
-        await NewsClusteringService._update_cluster_leads(db, clusters)
+        # Cập nhật cluster leads dựa trên trust_score (chỉ các cluster vừa thay đổi)
+        await NewsClusteringService._update_cluster_leads(db, set(assignments.values()))
         
         await db.commit()
         
+        processed = len(unclustered_news)
         log.info(
-            f"Clustering complete: {new_clusters} new clusters, "
+            f"Clustering complete: {len(new_clusters)} new clusters, "
             f"{processed} news processed"
         )
         
         return {
-            "clusters_created": new_clusters,
+            "clusters_created": len(new_clusters),
             "news_processed": processed,
-            "total_clusters": len(clusters)
+            "total_clusters": len(clusters) + len(new_clusters)
         }
     
     @staticmethod
-    async def _update_cluster_leads(db: AsyncSession, clusters: dict):
+    def _title_tokens(title: str) -> set:
+        return set(normalize_title(title.lower()).split())
+    
+    @staticmethod
+    def _signature(token_counts: dict, member_count: int) -> str:
         """
-        Chọn tin có trust_score cao nhất trong mỗi cluster làm lead
+        Centroid dạng tập token: các token xuất hiện ở ít nhất một nửa số thành viên
+        (tối đa SIGNATURE_MAX_TOKENS, ưu tiên token phổ biến). Cluster 1 thành viên
+        -> signature chính là tập token của tiêu đề đó.
         """
-        for cluster_id, cluster_items in clusters.items():
-            # Lấy trust_score của từng nguồn
-            news_with_scores = []
+        ranked = sorted(token_counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        majority = [token for token, count in ranked if count * 2 >= member_count]
+        tokens = (majority or [token for token, _ in ranked])[:NewsClusteringService.SIGNATURE_MAX_TOKENS]
+        # token_set_ratio không phụ thuộc thứ tự token
+        return " ".join(sorted(tokens))
+    
+    @staticmethod
+    def _add_member(cluster: StoryCluster, tokens: set, published_at: Optional[datetime]):
+        """Cập nhật incremental token_counts / signature khi cluster có thêm thành viên"""
+        token_counts = dict(cluster.token_counts or {})  # copy: JSON column không track mutation
+        for token in tokens:
+            token_counts[token] = token_counts.get(token, 0) + 1
+        cluster.token_counts = token_counts
+        cluster.member_count = (cluster.member_count or 0) + 1
+        cluster.signature = NewsClusteringService._signature(token_counts, cluster.member_count)
+        if published_at and (cluster.last_member_at is None or published_at > cluster.last_member_at):
+            cluster.last_member_at = published_at
+    
+    @staticmethod
+    def _assign_clusters(unclustered_news: list, clusters: list) -> Tuple[dict, list]:
+        """
+        Gán cluster cho từng tin (theo thứ tự) bằng cách so tiêu đề với signature của cluster.
+        Chi phí mỗi tin tỷ lệ với số cluster, không phải tổng số tin trong cluster.
+        
+        Args:
+            unclustered_news: [(news_id, title, published_at)]
+            clusters: StoryCluster đang active (được cập nhật tại chỗ)
+        
+        Returns:
+            ({news_id: cluster_id}, [StoryCluster mới tạo])
+        """
+        threshold = NewsClusteringService.SIMILARITY_THRESHOLD
+        chunk_size = NewsClusteringService.ASSIGN_CHUNK_SIZE
+        
+        titles = [normalize_title(title.lower()) for _, title, _ in unclustered_news]
+        pool = list(clusters)  # cluster có sẵn + cluster mới tạo trong lượt này
+        cluster_rank = {cluster.id: rank for rank, cluster in enumerate(pool)}
+        assignments = {}
+        new_clusters = []
+        
+        for start in range(0, len(titles), chunk_size):
+            # Một lần cdist cho cả chunk với signature hiện tại (đã gồm cluster đổi/mới ở các chunk trước)
+            block = similarity_matrix(
+                titles[start:start + chunk_size], [cluster.signature or "" for cluster in pool], min_score=threshold
+            )
+            # Cluster đổi signature (hoặc mới tạo) trong chunk này -> điểm trong block đã cũ, tính lại từng cặp.
+            # Tối đa chunk_size cluster nên chi phí mỗi tin không tăng theo tổng số cluster mới của lượt.
+            changed: Dict[str, StoryCluster] = {}
             
-            for news in cluster_items:
-                source_query = await db.execute(
-                    select(Source).where(Source.id == news.source_id)
+            for offset, row in enumerate(block):
+                i = start + offset
+                news_id, title, published_at = unclustered_news[i]
+                
+                # Điểm cao nhất thắng, hoà thì cluster đứng trước
+                candidates = [
+                    (int(row[col]), pool[col]) for col in np.flatnonzero(row >= threshold)
+                    if pool[col].id not in changed
+                ]
+                fresh = ((title_similarity(titles[i], cluster.signature), cluster) for cluster in changed.values())
+                candidates.extend(candidate for candidate in fresh if candidate[0] >= threshold)
+                
+                matched = max(
+                    candidates,
+                    key=lambda c: (c[0], -cluster_rank[c[1].id]),
+                    default=(None, None)
+                )[1]
+                
+                if matched:
+                    log.info(f"News {news_id} added to cluster {matched.id}")
+                else:
+                    # Tạo cluster mới
+                    matched = StoryCluster(id=str(uuid.uuid4()), token_counts={}, member_count=0)
+                    new_clusters.append(matched)
+                    pool.append(matched)
+                    cluster_rank[matched.id] = len(cluster_rank)
+                    log.info(f"Created new cluster {matched.id} with news {news_id}")
+                
+                NewsClusteringService._add_member(
+                    matched, NewsClusteringService._title_tokens(title), published_at
                 )
-                source = source_query.scalar_one_or_none()
-                trust_score = source.trust_score if source else 0
-                news_with_scores.append((news, trust_score))
-            
-            # Sort theo trust_score giảm dần
-            news_with_scores.sort(key=lambda x: x[1], reverse=True)
-            
-            # Set lead cho tin đầu tiên (highest trust)
-            for i, (news, score) in enumerate(news_with_scores):
-                news.is_cluster_lead = (i == 0)
+                changed[matched.id] = matched
+                assignments[news_id] = matched.id
+        
+        return assignments, new_clusters
+    
+    @staticmethod
+    async def rebuild_signatures(db: AsyncSession, since: datetime) -> int:
+        """
+        Backfill: dựng lại story_clusters từ các tin đã gom nhóm (published_at >= since).
+        
+        Returns:
+            Số cluster đã dựng
+        """
+        result = await db.execute(
+            select(News.cluster_id, News.title, News.published_at).where(
+                and_(
+                    News.cluster_id.isnot(None),
+                    News.published_at >= since
+                )
+            ).order_by(News.published_at)
+        )
+        
+        rebuilt: Dict[str, StoryCluster] = {}
+        for cluster_id, title, published_at in result.all():
+            if cluster_id not in rebuilt:
+                rebuilt[cluster_id] = StoryCluster(id=cluster_id, token_counts={}, member_count=0)
+            NewsClusteringService._add_member(
+                rebuilt[cluster_id], NewsClusteringService._title_tokens(title), published_at
+            )
+        
+        for cluster in rebuilt.values():
+            await db.merge(cluster)
+        await db.commit()
+        
+        log.info(f"Rebuilt {len(rebuilt)} cluster signatures")
+        return len(rebuilt)
+    
+    @staticmethod
+    async def _update_cluster_leads(db: AsyncSession, cluster_ids: set):
+        """
+        Chọn tin có trust_score cao nhất trong mỗi cluster làm lead
+        
+        Một câu UPDATE ... FROM duy nhất: xếp hạng thành viên theo trust_score của nguồn
+        (hoà thì tin có id nhỏ hơn), chỉ ghi các dòng có is_cluster_lead thay đổi.
+        """
+        if not cluster_ids:
+            return
+        
+        rank = func.row_number().over(
+            partition_by=News.cluster_id,
+            order_by=(func.coalesce(Source.trust_score, 0).desc(), News.id)
+        )
+        ranked = (
+            select(News.id.label("news_id"), (rank == 1).label("is_lead"))
+            .outerjoin(Source, Source.id == News.source_id)
+            .where(News.cluster_id.in_(cluster_ids))
+            .subquery()
+        )
+        
+        await db.execute(
+            update(News)
+            .where(
+                and_(
+                    News.id == ranked.c.news_id,
+                    News.is_cluster_lead.is_distinct_from(ranked.c.is_lead)
+                )
+            )
+            .values(is_cluster_lead=ranked.c.is_lead)
+            .execution_options(synchronize_session=False)
+        )
     
     @staticmethod
     async def get_cluster_count(news_id: int, db: AsyncSession) -> int:
@@ -1,6 +1,19 @@
 import re
+from html.entities import html5
 from bs4 import BeautifulSoup
-from typing import List
+from lxml import etree
+from typing import Optional
+
+_WHITESPACE = re.compile(r'\s+')
+_SKIP_TAGS = ("script", "style")
+# Markup mà libxml2 xử lý khác html.parser -> dùng BeautifulSoup để giữ nguyên output:
+# CDATA, NUL, raw-text/RCDATA element (nội dung không được parse thành tag), &#0;
+_NEEDS_FALLBACK = re.compile(
+    r'<!\[CDATA\[|\x00|&#(?:0+|[xX]0+);|<(?:textarea|title|iframe|xmp|plaintext|template|noframes)\b',
+    re.IGNORECASE
+)
+_NAMED_REF = re.compile(r'&([A-Za-z][A-Za-z0-9]*)(;?)')
+
 
 class ContentProcessor:
     BLACKLIST_KEYWORDS = [
@@ -18,18 +31,72 @@ class ContentProcessor:
         if not html_content:
             return ""
         
+        if "<" not in html_content and "&" not in html_content:
+            return _WHITESPACE.sub(' ', html_content).strip()  # Text thuần, không cần parse
+
+        text = ContentProcessor._fast_text(html_content)
+        if text is None:
+            text = ContentProcessor._soup_text(html_content)
+        
+        # Collapse multiple spaces and newlines
+        return _WHITESPACE.sub(' ', text).strip()
+
+    @staticmethod
+    def _fast_text(html_content: str) -> Optional[str]:
+        """
+        Fast path: libxml2 parse + itertext (toàn bộ ở C, không tạo object Python cho từng node).
+        None -> markup cần BeautifulSoup fallback
+        """
+        if _NEEDS_FALLBACK.search(html_content):
+            return None
+        if html_content.rfind("<") > html_content.rfind(">"):
+            return None  # Tag dở dang ở cuối chuỗi: html.parser giữ làm text, libxml2 bỏ
+        if not ContentProcessor._refs_compatible(html_content):
+            return None
+
+        parser = etree.HTMLParser()
+        try:
+            root = etree.fromstring(html_content, parser)
+        except (etree.LxmlError, ValueError):
+            return None
+        if parser.error_log:
+            return None  # Tag lệch / thừa: libxml2 sửa cây khác html.parser -> malformed, dùng BeautifulSoup
+        if root is None:
+            return ""
+
+        # Mỗi text/tail là một text node như soup.get_text(separator=" "); comment bị itertext bỏ qua.
+        # Xoá text của script/style nhưng giữ element để tail không bị nối vào text phía trước
+        for element in root.iter(*_SKIP_TAGS):
+            element.text = None
+        return " ".join(root.itertext())
+
+    @staticmethod
+    def _refs_compatible(html_content: str) -> bool:
+        """
+        Named reference mà libxml2 và html.parser decode giống nhau:
+        có ';' và tên hợp lệ, hoặc không ';' nhưng không có legacy entity nào là tiền tố ("&copyright")
+        """
+        for match in _NAMED_REF.finditer(html_content):
+            name, terminated = match.groups()
+            if terminated:
+                if name + ";" not in html5:
+                    return False
+            elif match.end() == len(html_content):
+                return False  # Entity ở cuối chuỗi
+            elif name not in html5 and any(name[:size] in html5 for size in range(2, len(name))):
+                return False
+        return True
+
+    @staticmethod
+    def _soup_text(html_content: str) -> str:
+        """BeautifulSoup path (chậm hơn, chịu được mọi markup)"""
         soup = BeautifulSoup(html_content, "html.parser")
         
         # Remove script and style elements
         for script in soup(["script", "style"]):
             script.decompose()
             
-        text = soup.get_text(separator=" ")
-        
-        # Collapse multiple spaces and newlines
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        return text
+        return soup.get_text(separator=" ")
 
     @classmethod
     def is_valid_candidate(cls, title: str, content: str) -> bool:
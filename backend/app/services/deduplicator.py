@@ -1,33 +1,154 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from thefuzz import fuzz
+from thefuzz import utils as fuzz_utils
+import heapq
 from app.models.news import News
+from app.models.rejected_news import RejectedNews
 from app.core.logger import log
 
-class DuplicateChecker:
+class TitleIndex:
+    """
+    In-memory inverted index (token -> titles) over recent titles.
+    Lookup chỉ so fuzzy với vài candidate có nhiều token chung nhất,
+    thay vì quét tuyến tính N tiêu đề.
+    """
+    STOPWORDS = frozenset({
+        "the", "and", "for", "with", "from", "into", "over", "after", "amid", "its",
+        "are", "was", "has", "have", "will", "can", "new", "how", "why", "what", "this", "that"
+    })
+
+    def __init__(self, window: timedelta = timedelta(days=1), max_candidates: int = 10,
+                 min_overlap: float = 0.5):
+        self.window = window
+        self.max_candidates = max_candidates
+        self.min_overlap = min_overlap
+        self._entries: Dict[int, Tuple[str, frozenset]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._by_title: Dict[str, List[int]] = defaultdict(list)
+        self._expiry: List[Tuple[float, int]] = []  # heap (published_ts, entry_id)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
     @staticmethod
-    async def is_duplicate(new_title: str, session: AsyncSession, threshold: int = 85) -> bool:
+    def _timestamp(published_at: Optional[datetime]) -> float:
+        if published_at is None:
+            return datetime.now(timezone.utc).timestamp()
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        return published_at.timestamp()
+
+    @classmethod
+    def _tokens(cls, title: str) -> frozenset:
+        # Cùng cách chuẩn hoá với fuzz.token_set_ratio (lowercase, bỏ ký tự đặc biệt, ASCII)
+        processed = fuzz_utils.full_process(title, force_ascii=True)
+        return frozenset(t for t in processed.split() if len(t) > 1 and t not in cls.STOPWORDS)
+
+    def _expire(self):
+        cutoff = datetime.now(timezone.utc).timestamp() - self.window.total_seconds()
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, entry_id = heapq.heappop(self._expiry)
+            self._drop(entry_id)
+
+    def _drop(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        title, tokens = entry
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self._postings[token]
+        ids = self._by_title.get(title)
+        if ids is not None:
+            if entry_id in ids:
+                ids.remove(entry_id)
+            if not ids:
+                del self._by_title[title]
+
+    def add(self, title: str, published_at: Optional[datetime] = None):
+        if not title:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        tokens = self._tokens(title)
+        self._entries[entry_id] = (title, tokens)
+        for token in tokens:
+            self._postings[token].add(entry_id)
+        self._by_title[title].append(entry_id)
+        heapq.heappush(self._expiry, (self._timestamp(published_at), entry_id))
+
+    def remove(self, title: str):
+        for entry_id in list(self._by_title.get(title, [])):
+            self._drop(entry_id)
+
+    def candidates(self, title: str) -> List[str]:
+        """Tiêu đề có tỷ lệ token chung (overlap coefficient) cao nhất, tối đa max_candidates"""
+        self._expire()
+        tokens = self._tokens(title)
+        if not tokens:
+            return []
+
+        shared: Dict[int, int] = defaultdict(int)
+        for token in tokens:
+            for entry_id in self._postings.get(token, ()):
+                shared[entry_id] += 1
+
+        scored = []
+        for entry_id, count in shared.items():
+            entry_title, entry_tokens = self._entries[entry_id]
+            overlap = count / min(len(tokens), len(entry_tokens))
+            if overlap >= self.min_overlap:
+                scored.append((overlap, entry_title))
+
+        return [t for _, t in heapq.nlargest(self.max_candidates, scored, key=lambda x: x[0])]
+
+
+class DuplicateChecker:
+    WINDOW = timedelta(days=1)
+
+    _index: Optional[TitleIndex] = None
+    _lock: Optional[asyncio.Lock] = None  # Nhiều nguồn xử lý song song -> chỉ build index một lần
+
+    @classmethod
+    async def _get_index(cls, session: AsyncSession) -> TitleIndex:
+        """Build index từ tiêu đề 24h qua (1 query), sau đó cập nhật incremental"""
+        if cls._index is None:
+            if cls._lock is None:
+                cls._lock = asyncio.Lock()
+            async with cls._lock:
+                if cls._index is None:
+                    index = TitleIndex(window=cls.WINDOW)
+                    since = datetime.utcnow() - cls.WINDOW
+                    result = await session.execute(
+                        select(News.title, News.published_at).where(News.published_at >= since)
+                    )
+                    for title, published_at in result.all():
+                        index.add(title, published_at)
+                    cls._index = index
+                    log.info(f"Near-duplicate title index built with {len(index)} titles")
+        return cls._index
+
+    @classmethod
+    async def is_duplicate(cls, new_title: str, session: AsyncSession, threshold: int = 85) -> bool:
         """
-        Check if the new_title is similar to any of the last 50 news titles 
-        published in the last 24 hours.
+        Check if the new_title is similar to any news title published in the last 24 hours.
+        Only the few indexed candidates sharing the most tokens are scored with fuzz.
         """
         if not new_title:
             return False
 
-        # 1. Fetch recent news titles (last 24h, limit 50)
-        yesterday = datetime.utcnow() - timedelta(days=1)
-        stmt = (
-            select(News.title)
-            .where(News.published_at >= yesterday)
-            .order_by(desc(News.published_at))
-            .limit(50)
-        )
-        result = await session.execute(stmt)
-        recent_titles = result.scalars().all()
+        index = await cls._get_index(session)
 
-        # 2. Compare using Fuzzy Logic
-        for existing_title in recent_titles:
+        for existing_title in index.candidates(new_title):
             # token_set_ratio is good for partial matches and reordered words
             score = fuzz.token_set_ratio(new_title, existing_title)
             if score > threshold:
@@ -35,3 +156,91 @@ class DuplicateChecker:
                 return True
                 
         return False
+
+    @classmethod
+    def remember(cls, title: str, published_at: Optional[datetime] = None):
+        """Thêm tiêu đề vừa lưu vào index (item sau trong cùng batch sẽ thấy nó)"""
+        if cls._index is not None:
+            cls._index.add(title, published_at)
+
+    @classmethod
+    def forget(cls, titles: Iterable[str]):
+        """Bỏ tiêu đề khỏi index (batch bị rollback)"""
+        if cls._index is not None:
+            for title in titles:
+                cls._index.remove(title)
+
+
+class UrlDeduplicator:
+    """
+    Batch URL dedup cho crawler (URL đã lưu trong news hoặc đã bị loại trong rejected_news).
+    - LRU các URL đã biết (warm-up bằng 1 query nhỏ: chỉ các tin mới nhất, vì crawler là
+      process chạy một lần mỗi cycle dưới pm2)
+    - URL chưa biết được kiểm tra bằng 1 query IN cho cả batch
+    """
+    MAX_SIZE = 100_000
+    WARM_UP_LIMIT = 5_000  # ~ vài ngày tin mới nhất, đủ phủ phần lớn item trong các feed
+
+    _seen: "OrderedDict[str, None]" = OrderedDict()
+    _warmed = False
+    _lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def _remember(cls, urls: Iterable[str]):
+        for url in urls:
+            cls._seen[url] = None
+            cls._seen.move_to_end(url)
+        while len(cls._seen) > cls.MAX_SIZE:
+            cls._seen.popitem(last=False)
+
+    @classmethod
+    async def warm_up(cls, session: AsyncSession):
+        """Nạp URL của WARM_UP_LIMIT tin mới nhất / tin bị loại mới nhất vào LRU (query theo primary key)"""
+        for model in (RejectedNews, News):
+            stmt = select(model.url).order_by(desc(model.id)).limit(cls.WARM_UP_LIMIT)
+            result = await session.execute(stmt)
+            # Cũ nhất vào trước để LRU evict đúng thứ tự
+            cls._remember(reversed(result.scalars().all()))
+        cls._warmed = True
+        log.info(f"URL dedup cache warmed with {len(cls._seen)} URLs")
+
+    @classmethod
+    async def filter_new(cls, items: List[Dict[str, Any]], session: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        Trả về các item có URL chưa tồn tại (giữ nguyên thứ tự, bỏ URL trùng trong batch).
+        URL trả về được đánh dấu "đã thấy" ngay, để cycle sau không phải xử lý lại;
+        gọi forget() nếu batch không được lưu.
+        """
+        if not cls._warmed:
+            if cls._lock is None:
+                cls._lock = asyncio.Lock()
+            async with cls._lock:
+                if not cls._warmed:
+                    await cls.warm_up(session)
+
+        candidates = []
+        batch_urls = set()
+        for item in items:
+            url = item["url"]
+            if url in cls._seen or url in batch_urls:
+                continue
+            batch_urls.add(url)
+            candidates.append(item)
+
+        if not candidates:
+            return []
+
+        # Đánh dấu trước khi chờ query: batch của nguồn khác chạy song song không nhận lại cùng URL
+        cls._remember(batch_urls)
+        result = await session.execute(
+            select(News.url).where(News.url.in_(batch_urls))
+            .union(select(RejectedNews.url).where(RejectedNews.url.in_(batch_urls)))
+        )
+        existing = set(result.scalars().all())
+        return [item for item in candidates if item["url"] not in existing]
+
+    @classmethod
+    def forget(cls, urls: Iterable[str]):
+        """Bỏ URL khỏi LRU (batch bị rollback -> cần xử lý lại)"""
+        for url in urls:
+            cls._seen.pop(url, None)
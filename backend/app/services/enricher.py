@@ -1,38 +1,64 @@
 import trafilatura
+from trafilatura.utils import normalize_unicode
 from app.core.logger import log
+from app.core.network import network_client
+from app.core.workers import cpu_pool, WorkerTimeout
+
+# Metadata trafilatura trả về cùng lượt extract (Document attribute -> key kết quả)
+METADATA_FIELDS = {
+    "title": "title",
+    "author": "author",
+    "date": "published_date",
+    "sitename": "sitename",
+    "description": "description",
+}
 
 class ContentEnricher:
     @staticmethod
-    def enrich_news(url: str, html: str = None) -> dict:
+    def enrich_news(url: str, html: str) -> dict:
         """
-        Extract full text and main image from URL using Trafilatura.
-        Returns: {'full_text': str, 'image_url': str}
+        Extract full text, main image and metadata from downloaded HTML in ONE trafilatura pass
+        (bare_extraction with metadata; text giống hệt trafilatura.extract cùng options).
+        Returns: {'full_text', 'image_url', 'title', 'author', 'published_date', 'sitename', 'description'}
         """
+        if not html:
+            return {}
+
         try:
-            downloaded = html
-            if not downloaded:
-                downloaded = trafilatura.fetch_url(url)
-            
-            if not downloaded:
+            document = trafilatura.bare_extraction(
+                html,
+                url=url,
+                with_metadata=True,
+                include_comments=False,
+                include_tables=False
+            )
+            if document is None:
                 return {}
 
-            # Extract full text
-            full_text = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
-            
-            # Extract Metadata (Image) works better with bare extraction sometimes or separate call
-            # Trafilatura extract() returns string. To get metadata need bare_extraction
-            metadata = trafilatura.bare_extraction(downloaded)
-            image_url = metadata.get('image') if metadata else None
-
-            # Fallback if image not found in metadata
-            if not image_url and metadata and metadata.get('sitename'):
-                 pass # Could look for favicons etc, but let's keep it simple
-
-            return {
-                "full_text": full_text,
-                "image_url": image_url
+            result = {
+                "full_text": normalize_unicode(document.text) if document.text else None,
+                "image_url": document.image
             }
+            for attribute, key in METADATA_FIELDS.items():
+                result[key] = getattr(document, attribute, None)
+            return result
 
         except Exception as e:
             log.warning(f"Enrichment failed for {url}: {e}")
             return {}
+
+    @staticmethod
+    async def enrich_news_async(url: str) -> dict:
+        """
+        Download the page through the shared NetworkClient (async, pooled),
+        then run extraction in the CPU worker pool.
+        """
+        html = await network_client.fetch(url)
+        if not html:
+            return {}
+
+        try:
+            return await cpu_pool.run(ContentEnricher.enrich_news, url, html)
+        except WorkerTimeout:
+            log.warning(f"Enrichment timed out for {url}")
+            return {}
@@ -0,0 +1,264 @@
+"""
+Task 1.10b: Async Enrichment Queue
+Tách bước lấy full article (Task 1.10) khỏi ingestion:
+- Crawler lưu tin ngay (is_full_content=False) rồi submit() vào queue
+- Worker fetch trang (NetworkClient) + extract (CPU worker pool), gom kết quả
+- Tin content ngắn chưa phân tích AI: phân tích sau khi có full text (không gửi / cache bản tóm tắt RSS),
+  gom theo lô qua GeminiClient.analyze_batch rồi ghi cùng UPDATE; AI loại -> xoá tin, lưu rejected_news
+- Ghi DB theo lô: một UPDATE executemany cho mỗi batch_size tin
+
+Queue nằm trong process crawler: close() chờ xử lý hết trước khi process thoát.
+Tin bị bỏ dở (crash giữa chừng, trang lỗi) được requeue_pending() nạp lại ở lần chạy sau,
+tối đa ENRICH_MAX_ATTEMPTS lần; lần cuối vẫn lỗi thì phân tích AI trên content ngắn.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import log
+from app.db.session import AsyncSessionLocal
+from app.models.news import News
+from app.models.source import Source
+from app.services.analysis_sharing import ClusterAnalysisSharing
+from app.services.deduplicator import DuplicateChecker
+from app.services.enricher import ContentEnricher
+from app.services.llm_client import GeminiClient
+from app.services.llm_dispatcher import LLMDispatcher
+from app.services.mention_counter import MentionCounter
+from app.services.preclassifier import PreClassifier
+from app.services.ranking import HotnessRanking
+
+
+class EnrichmentQueue:
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.worker_count = workers or settings.ENRICH_WORKERS
+        self.max_size = max_size or settings.ENRICH_QUEUE_SIZE
+        self.batch_size = batch_size or settings.ENRICH_BATCH_SIZE
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending_updates: List[Dict] = []
+        self._pending_analyses: List[Tuple[Dict, Dict[str, Any]]] = []  # (values, analysis job)
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.enriched = 0
+        self.failed = 0
+
+    @staticmethod
+    def needs_enrichment(content: Optional[str]) -> bool:
+        """Content từ RSS quá ngắn -> cần lấy full article"""
+        return len(content or "") < settings.ENRICH_MIN_CONTENT_LENGTH
+
+    @staticmethod
+    def analysis_job(
+        source: Source,
+        title: str,
+        published_at: Optional[datetime],
+        content: Optional[str],
+        tags: Optional[Sequence[str]],
+        priority: int,
+        relevance: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Thông tin để phân tích AI một tin sau khi enrich (content = bản ngắn, dùng khi enrich thất bại)"""
+        return {
+            "source_id": source.id,
+            "source": source.name,
+            "trust_score": source.trust_score,
+            "title": title,
+            "published_at": published_at,
+            "content": content,
+            "tags": list(tags or []),
+            "priority": priority,
+            "relevance": relevance
+        }
+
+    def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._flush_lock = asyncio.Lock()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def submit(self, news_id: int, url: str, analysis: Optional[Dict[str, Any]] = None, attempt: int = 0):
+        """
+        Đưa tin vào queue (queue đầy -> chờ, backpressure lên crawler).
+        analysis: analysis_job() nếu tin chưa được phân tích AI; attempt: lần requeue thứ mấy
+        """
+        self.start()
+        await self._queue.put((news_id, url, analysis, attempt))
+
+    async def _worker(self):
+        while True:
+            news_id, url, analysis, attempt = await self._queue.get()
+            try:
+                enriched = await ContentEnricher.enrich_news_async(url)
+                values = {"id": news_id}
+                if enriched.get("full_text"):
+                    values["raw_content"] = enriched["full_text"]
+                    values["is_full_content"] = True
+                if enriched.get("image_url"):
+                    values["image_url"] = enriched["image_url"]
+
+                if len(values) > 1:
+                    self.enriched += 1
+                else:
+                    self.failed += 1
+                if analysis is not None and ("raw_content" in values or attempt >= settings.ENRICH_MAX_ATTEMPTS):
+                    content = values.get("raw_content") or analysis["content"]
+                    self._pending_analyses.append(
+                        (values, dict(analysis, url=url, content=content, summary=analysis["content"]))
+                    )
+                elif len(values) > 1:
+                    self._pending_updates.append(values)
+                if len(self._pending_updates) + len(self._pending_analyses) >= self.batch_size:
+                    await self.flush()
+            except Exception as e:
+                self.failed += 1
+                log.warning(f"Enrichment worker failed for {url}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _analyze(
+        self, pending: List[Tuple[Dict, Dict[str, Any]]], batch: List[Dict]
+    ) -> Tuple[Dict[int, Dict[str, Any]], Counter]:
+        """
+        Phân tích AI các tin đã enrich (một lần analyze_batch), gộp cột AI vào batch.
+
+        Returns:
+            ({news_id: tin bị AI loại}, delta mention counter: + coin của tin vừa phân tích,
+            - tag của tin bị loại; tag đã được đếm lúc crawler lưu tin, coin thì chưa)
+        """
+        results = await GeminiClient().analyze_batch([
+            {"title": job["title"], "content": job["content"], "source": job["source"], "priority": job["priority"]}
+            for _, job in pending
+        ])
+        rejected = {}
+        mentions = Counter()
+        for (values, job), analysis in zip(pending, results):
+            if analysis is None:
+                log.warning(f"AI Analysis failed for {job['title']}")
+            elif analysis.get("is_relevant") is False:
+                log.info(f"AI marked as Irrelevant: {job['title']}")
+                DuplicateChecker.forget([job["title"]])
+                rejected[values["id"]] = {
+                    # Nhãn âm cho pre-classifier: bản RSS đã đưa vào classify, không phải full text
+                    "source_id": job["source_id"], "title": job["title"], "url": job["url"], "raw_content": job["summary"],
+                    "reason": "ai", "relevance_score": job["relevance"]
+                }
+                mentions.subtract(MentionCounter.count_mentions([(job["published_at"], job["tags"], None)]))
+                continue
+            else:
+                ai_data = GeminiClient.news_fields(analysis)
+                values.update(ai_data)
+                values["base_score"] = HotnessRanking.calculate_base_score(job["trust_score"], ai_data["sentiment_score"])
+                # Tin mới lưu chưa có vote; điểm ranking theo base_score mới (lúc lưu chỉ có trust)
+                values["ranking_score"] = HotnessRanking.score_from_components(values["base_score"], 0, job["published_at"])
+                ClusterAnalysisSharing.remember(job["title"], ai_data, job["tags"])
+                mentions.update(MentionCounter.count_mentions([(job["published_at"], None, ai_data["coins_mentioned"])]))
+            if len(values) > 1:
+                batch.append(values)
+        return rejected, mentions
+
+    @staticmethod
+    async def _write(db: AsyncSession, batch: List[Dict], rejected: Dict[int, Dict[str, Any]], mentions: Counter):
+        """Ghi một lô (không commit): UPDATE, xoá tin bị AI loại, delta mention counter trong cùng transaction"""
+        # Nhóm theo tập cột để mỗi nhóm là một executemany
+        groups: Dict[tuple, List[Dict]] = {}
+        for values in batch:
+            groups.setdefault(tuple(sorted(values)), []).append(values)
+        for rows in groups.values():
+            await db.execute(update(News), rows)
+        if rejected:
+            # Tin đã lưu trước khi có kết quả AI -> chuyển sang rejected_news
+            await db.execute(delete(News).where(News.id.in_(list(rejected))))
+            await PreClassifier.record_rejected(db, list(rejected.values()))
+        await MentionCounter.adjust(db, mentions)
+
+    async def flush(self):
+        """
+        Ghi các kết quả đang gom bằng một UPDATE executemany (bulk update theo primary key),
+        sau khi phân tích AI các tin đang chờ full text
+        """
+        async with self._flush_lock:
+            if not self._pending_updates and not self._pending_analyses:
+                return
+            batch, self._pending_updates = self._pending_updates, []
+            pending, self._pending_analyses = self._pending_analyses, []
+            try:
+                rejected, mentions = await self._analyze(pending, batch) if pending else ({}, Counter())
+                async with AsyncSessionLocal() as db:
+                    await self._write(db, batch, rejected, mentions)
+                    await db.commit()
+                log.info(f"Enrichment: updated {len(batch)} news, {len(rejected)} rejected by AI")
+            except Exception as e:
+                log.error(f"Enrichment flush failed ({len(batch) + len(pending)} news): {e}")
+
+    async def close(self):
+        """Chờ xử lý hết queue, ghi phần còn lại rồi dừng worker"""
+        if self._queue is None:
+            return
+        await self._queue.join()
+        await self.flush()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+        log.info(f"Enrichment queue closed: {self.enriched} enriched, {self.failed} failed")
+
+    async def requeue_pending(self, db: AsyncSession, minutes: Optional[int] = None) -> int:
+        """
+        Nạp lại các tin gần đây còn content ngắn và chưa enrich (crawler dừng trước khi queue xử lý xong,
+        trang lỗi). Mỗi tin tối đa ENRICH_MAX_ATTEMPTS lần (đếm trong news.enrich_attempts) và chỉ xét
+        tin tạo trong `minutes` phút gần nhất -> trang lỗi vĩnh viễn không bị thử lại mãi.
+        Tin chưa có phân tích AI được phân tích lại sau khi enrich.
+        """
+        since = datetime.now(timezone.utc) - timedelta(minutes=minutes or settings.ENRICH_REQUEUE_MINUTES)
+        attempts = func.coalesce(News.enrich_attempts, 0)
+        result = await db.execute(
+            select(News.id, News.url, News.title, News.published_at, News.raw_content, News.tags,
+                   News.topic_category, News.sentiment_label, attempts, Source)
+            .join(Source, Source.id == News.source_id)
+            .where(
+                and_(
+                    News.created_at >= since,
+                    or_(News.is_full_content == False, News.is_full_content.is_(None)),
+                    func.coalesce(func.length(News.raw_content), 0) < settings.ENRICH_MIN_CONTENT_LENGTH,
+                    attempts < settings.ENRICH_MAX_ATTEMPTS
+                )
+            )
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+
+        await db.execute(
+            update(News)
+            .where(News.id.in_([row[0] for row in rows]))
+            .values(enrich_attempts=attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        for news_id, url, title, published_at, content, tags, topic, sentiment_label, attempt, source in rows:
+            analysis = None
+            if sentiment_label is None:
+                analysis = self.analysis_job(
+                    source, title, published_at, content, tags, LLMDispatcher.priority_for(title, topic)
+                )
+            await self.submit(news_id, url, analysis, attempt + 1)
+        return len(rows)
+
+
+# Shared queue (crawler process)
+enrichment_queue = EnrichmentQueue()
@@ -0,0 +1,86 @@
+"""
+Multi-pattern keyword matcher (word-boundary semantics)
+Tìm tất cả keyword trong một lượt quét văn bản, chi phí không phụ thuộc kích thước từ điển.
+
+Keyword bắt đầu và kết thúc bằng ký tự \\w thì `\\bkw\\b` chỉ khớp được ở một đoạn
+text[start của word-run j : end của word-run j+n-1] (n = số word-run trong keyword).
+Vì vậy chỉ cần tách text thành các word-run (\\w+) một lần, rồi tra hash: từng từ với
+keyword một từ, và span j..j+n-1 (chỉ tại các từ là từ đầu của keyword nhiều từ).
+Chi phí O(số từ), không phụ thuộc số keyword; kết quả giống hệt
+re.search(r'\\b' + re.escape(kw) + r'\\b', text).
+
+Keyword hiếm bắt đầu/kết thúc bằng ký tự khác (vd "$btc") dùng regex riêng (fallback).
+"""
+import re
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+_WORD_RUN = re.compile(r"\w+")
+_WORD_CHAR = re.compile(r"\w")
+
+
+class KeywordMatcher:
+    """
+    Build một lần từ (keyword, label) rồi match nhiều văn bản.
+    Label có thể là bất cứ gì hashable, vd ("coin", "BTC").
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Hashable]]):
+        self._spans: Dict[str, Tuple[Hashable, ...]] = {}
+        self._fallback: List[Tuple[re.Pattern, Hashable]] = []
+        lengths: Set[int] = set()
+
+        spans: Dict[str, List[Hashable]] = {}
+        for keyword, label in entries:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            if _WORD_CHAR.match(keyword[0]) and _WORD_CHAR.match(keyword[-1]):
+                labels = spans.setdefault(keyword, [])
+                if label not in labels:
+                    labels.append(label)
+                lengths.add(len(_WORD_RUN.findall(keyword)))
+            else:
+                self._fallback.append((re.compile(r"\b" + re.escape(keyword) + r"\b"), label))
+
+        self._spans = {keyword: tuple(labels) for keyword, labels in spans.items()}
+        # Keyword 1 word-run: tra theo từng từ. Nhiều word-run: chỉ xét vị trí có từ đầu khớp
+        self._single = {kw: labels for kw, labels in self._spans.items() if len(_WORD_RUN.findall(kw)) == 1}
+        # set & set duyệt tập nhỏ hơn (set & dict duyệt cả dict -> chi phí tăng theo từ điển)
+        self._single_words = frozenset(self._single)
+        self._multi_first = {_WORD_RUN.match(kw).group() for kw in self._spans if kw not in self._single}
+        self._multi_lengths = sorted(n for n in lengths if n > 1)
+        self.size = len(self._spans) + len(self._fallback)
+
+    def match(self, text: str) -> Set[Hashable]:
+        """Tập label có ít nhất một keyword xuất hiện trong text (so khớp trên text.lower())"""
+        found: Set[Hashable] = set()
+        if not text:
+            return found
+
+        text = text.lower()
+        words = set(_WORD_RUN.findall(text))
+
+        for word in words.intersection(self._single_words):
+            found.update(self._single[word])
+
+        if self._multi_lengths and not words.isdisjoint(self._multi_first):
+            runs = [(m.start(), m.end(), m.group()) for m in _WORD_RUN.finditer(text)]
+            n_runs = len(runs)
+            for j, (start, _, word) in enumerate(runs):
+                if word not in self._multi_first:
+                    continue
+                for n in self._multi_lengths:
+                    if j + n > n_runs:
+                        break
+                    labels = self._spans.get(text[start:runs[j + n - 1][1]])
+                    if labels:
+                        found.update(labels)
+
+        for pattern, label in self._fallback:
+            if label not in found and pattern.search(text):
+                found.add(label)
+
+        return found
+
+    def match_many(self, texts: Iterable[str]) -> List[Set[Hashable]]:
+        return [self.match(text) for text in texts]
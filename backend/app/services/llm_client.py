@@ -1,9 +1,26 @@
+import asyncio
 import json
 import google.generativeai as genai
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
 from app.core.logger import log
-from app.core.prompts import CRYPTO_ANALYST_SYSTEM_PROMPT
+from app.core.prompts import CRYPTO_ANALYST_SYSTEM_PROMPT, BATCH_ANALYSIS_PROMPT
+from app.models.news import CategoryType
+from app.services.analysis_cache import analysis_cache
+from app.services.cost_guard import cost_guard
+from app.services.llm_dispatcher import llm_dispatcher, PRIORITY_NORMAL
+
+CONTENT_MAX_CHARS = 10000  # Truncate to avoid context limit if extreme
+CHARS_PER_TOKEN = 4  # Ước lượng thô (giống cost_guard)
+
+# Phase 5: Map category from AI (Task 5.2)
+CATEGORY_MAP = {
+    "market_move": CategoryType.MARKET_MOVE,
+    "project_update": CategoryType.PROJECT_UPDATE,
+    "partnership": CategoryType.PARTNERSHIP,
+    "security": CategoryType.SECURITY,
+    "opinion": CategoryType.OPINION
+}
 
 class GeminiClient:
     _instance = None
@@ -25,53 +42,265 @@ class GeminiClient:
             log.warning("GEMINI_API_KEY not set. AI features disabled.")
             self.model = None
 
-    async def analyze_content(self, title: str, content: str, source: str) -> Optional[Dict[str, Any]]:
-        """
-        Sends content to Gemini and retrieves structured JSON analysis.
-        """
-        if not self.model:
-            return None
+    @staticmethod
+    def news_fields(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Kết quả phân tích -> giá trị các cột AI của News"""
+        return {
+            "analysis_source": "ai",
+            "summary_vi": analysis.get("summary_vi"),
+            "summary_en": analysis.get("summary_en"),
+            "sentiment_score": analysis.get("sentiment_score"),
+            "sentiment_label": analysis.get("sentiment_label"),
+            "coins_mentioned": analysis.get("coins_mentioned", []),
+            "key_events": analysis.get("key_events", []),
+            "risk_level": analysis.get("risk_level"),
+            "action_recommendation": analysis.get("action_recommendation"),
+            "category_type": CATEGORY_MAP.get(
+                analysis.get("category_type") or analysis.get("category", "opinion"),
+                CategoryType.OPINION
+            )
+        }
 
-        # Prepare the input payload
-        user_message = json.dumps({
+    @staticmethod
+    def _payload(title: str, content: str, source: str) -> Dict[str, str]:
+        return {
             "title": title,
-            "content": content[:10000], # Trucate to avoid context limit if extreme
+            "content": (content or "")[:CONTENT_MAX_CHARS],
             "source": source
-        })
+        }
 
+    async def _generate(
+        self,
+        message: str,
+        max_output_tokens: Optional[int] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> Optional[str]:
+        """
+        generate_content (SDK sync) qua llm_dispatcher (concurrency + RPM/TPM + retry 429),
+        có kiểm tra + ghi chi phí qua cost_guard.
+        Returns response text hoặc None nếu lỗi API / hết budget
+        """
         try:
-            # Generate content
-            # Gemini Python SDK is synchronous for now in basic usage, 
-            # but we can wrap it or use the async client if available.
-            # For simplicity in this `async` function, we'll assume standard usage 
-            # and might block slightly. Ideally run in executor.
-            
-            # Using generation_config to force JSON response if supported or just prompt engineering
-            generation_config = genai.types.GenerationConfig(
-               temperature=0.2,
-               response_mime_type="application/json"
-            )
+            can_proceed, current_cost = await cost_guard.check_budget()
+        except Exception as e:
+            log.warning(f"Cost guard unavailable: {e}")
+            can_proceed = True
+        if not can_proceed:
+            log.warning(f"AI monthly budget exceeded (${current_cost:.2f}), skipping analysis")
+            return None
 
-            # To avoid blocking event loop
-            import asyncio
-            loop = asyncio.get_event_loop()
-            
-            response = await loop.run_in_executor(
-                None, 
+        generation_config = genai.types.GenerationConfig(
+           temperature=0.2,
+           response_mime_type="application/json",
+           max_output_tokens=max_output_tokens
+        )
+        # Token ước lượng cho TPM bucket: system prompt + message + output dự trù
+        tokens = (len(CRYPTO_ANALYST_SYSTEM_PROMPT) + len(message)) // CHARS_PER_TOKEN + (
+            max_output_tokens or settings.LLM_BATCH_OUTPUT_TOKENS_PER_ITEM
+        )
+        try:
+            response = await llm_dispatcher.run(
                 lambda: self.model.generate_content(
-                    user_message, 
+                    message,
                     generation_config=generation_config
-                )
+                ),
+                tokens=tokens,
+                priority=priority
             )
-
-            # Parse JSON
-            try:
-                result_json = json.loads(response.text)
-                return result_json
-            except json.JSONDecodeError:
-                log.error(f"Failed to parse JSON from Gemini: {response.text}")
-                return None
-
+            text = response.text
         except Exception as e:
             log.error(f"Gemini API Error: {e}")
             return None
+
+        try:
+            # System prompt được tính vào input của mỗi request
+            cost = await cost_guard.estimate_cost(len(CRYPTO_ANALYST_SYSTEM_PROMPT) + len(message), len(text or ""))
+            await cost_guard.record_cost(cost)
+        except Exception as e:
+            log.warning(f"Failed to record AI cost: {e}")
+        return text
+
+    async def _analyze_payload(self, payload: Dict[str, str], priority: int = PRIORITY_NORMAL) -> Optional[Dict[str, Any]]:
+        """Một request cho một bài (không qua cache)"""
+        text = await self._generate(json.dumps(payload), priority=priority)
+        if text is None:
+            return None
+
+        # Parse JSON
+        try:
+            analysis = json.loads(text)
+        except json.JSONDecodeError:
+            log.error(f"Failed to parse JSON from Gemini: {text}")
+            return None
+        if not isinstance(analysis, dict):
+            log.error(f"Unexpected JSON from Gemini: {text}")
+            return None
+        return analysis
+
+    async def analyze_content(
+        self,
+        title: str,
+        content: str,
+        source: str,
+        priority: int = PRIORITY_NORMAL
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Sends content to Gemini and retrieves structured JSON analysis.
+        Bài đã phân tích (cùng title/content, prompt, model) lấy từ analysis_cache, không gọi API.
+        """
+        if not self.model:
+            return None
+
+        payload = self._payload(title, content, source)
+        key = analysis_cache.key(payload["title"], payload["content"])
+        cached = await analysis_cache.get(key)
+        if cached is not None:
+            return cached
+
+        analysis = await self._analyze_payload(payload, priority)
+        if analysis is not None:
+            await analysis_cache.set(key, analysis)
+        return analysis
+
+    @staticmethod
+    def _estimate_tokens(payload: Dict[str, str]) -> int:
+        return sum(len(value or "") for value in payload.values()) // CHARS_PER_TOKEN + 20
+
+    @staticmethod
+    def _pack(payloads: List[Dict[str, str]]) -> List[List[int]]:
+        """
+        Chia bài thành các batch (theo index) trong giới hạn một request:
+        số bài, input token ước lượng, và output token (mỗi bài ~LLM_BATCH_OUTPUT_TOKENS_PER_ITEM)
+        """
+        max_items = max(1, min(
+            settings.LLM_BATCH_MAX_ITEMS,
+            settings.LLM_MAX_OUTPUT_TOKENS // settings.LLM_BATCH_OUTPUT_TOKENS_PER_ITEM
+        ))
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, payload in enumerate(payloads):
+            tokens = GeminiClient._estimate_tokens(payload)
+            if current and (len(current) >= max_items or current_tokens + tokens > settings.LLM_BATCH_MAX_INPUT_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _parse_batch(text: Optional[str], ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """JSON array -> {id: analysis}; bỏ qua phần tử sai format / id lạ"""
+        if not text:
+            return {}
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            log.error(f"Failed to parse batch JSON from Gemini ({len(ids)} articles)")
+            return {}
+        if isinstance(data, dict):
+            data = data.get("results") or data.get("articles") or []
+        if not isinstance(data, list):
+            return {}
+
+        expected = set(ids)
+        results = {}
+        for analysis in data:
+            if not isinstance(analysis, dict):
+                continue
+            article_id = str(analysis.pop("id", ""))
+            if article_id in expected and article_id not in results:
+                results[article_id] = analysis
+        return results
+
+    async def _analyze_packed(
+        self,
+        payloads: List[Dict[str, str]],
+        priority: int
+    ) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """
+        Một request batch; bài không có trong kết quả (JSON lỗi, thiếu id) -> None.
+        Cả request lỗi (API lỗi, hết retry 429, hết budget) -> None thay cho cả danh sách
+        """
+        ids = [str(position + 1) for position in range(len(payloads))]
+        message = BATCH_ANALYSIS_PROMPT + "\n" + json.dumps({
+            "articles": [dict(payload, id=article_id) for payload, article_id in zip(payloads, ids)]
+        })
+        text = await self._generate(
+            message,
+            max_output_tokens=min(
+                settings.LLM_MAX_OUTPUT_TOKENS,
+                settings.LLM_BATCH_OUTPUT_TOKENS_PER_ITEM * len(payloads)
+            ),
+            priority=priority
+        )
+        if text is None:
+            return None
+        parsed = self._parse_batch(text, ids)
+        if len(parsed) < len(payloads):
+            log.warning(f"Batch analysis returned {len(parsed)}/{len(payloads)} articles, retrying the rest one by one")
+        return [parsed.get(article_id) for article_id in ids]
+
+    async def analyze_batch(self, articles: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Phân tích nhiều bài, mỗi request gói tối đa LLM_BATCH_MAX_ITEMS bài (system prompt trả một lần).
+        Bài đã có trong analysis_cache không gửi lại; bài trùng nội dung trong lô chỉ gửi một lần.
+        Bài không có trong kết quả batch (JSON lỗi, thiếu id...) được gọi lại riêng;
+        request lỗi API / hết budget thì không gọi lại (tránh nhân số request khi đang bị giới hạn).
+        Các request được gửi đồng thời, llm_dispatcher giới hạn theo concurrency / quota;
+        mỗi priority lane được đóng gói riêng để bài ưu tiên không phải chờ bài thường.
+
+        Args:
+            articles: [{"title", "content", "source", "priority" (tuỳ chọn)}]
+        Returns:
+            Kết quả theo đúng thứ tự đầu vào (None nếu phân tích thất bại)
+        """
+        if not self.model:
+            return [None] * len(articles)
+
+        payloads = [self._payload(a["title"], a["content"], a["source"]) for a in articles]
+        priorities = [a.get("priority", PRIORITY_NORMAL) for a in articles]
+        keys = [analysis_cache.key(p["title"], p["content"]) for p in payloads]
+        analyses = await analysis_cache.get_many(keys)
+
+        # Bài cần gọi API: index đầu tiên của mỗi key chưa có trong cache, chia theo priority lane
+        lanes: Dict[int, List[int]] = {}
+        queued = set()
+        for index, key in enumerate(keys):
+            if key not in analyses and key not in queued:
+                queued.add(key)
+                lanes.setdefault(priorities[index], []).append(index)
+
+        batches: List[List[int]] = []
+        for priority in sorted(lanes):
+            todo = lanes[priority]
+            batches.extend([todo[position] for position in packed] for packed in self._pack([payloads[index] for index in todo]))
+
+        async def analyze(batch: List[int]) -> Optional[List[Optional[Dict[str, Any]]]]:
+            if len(batch) == 1:
+                return [await self._analyze_payload(payloads[batch[0]], priorities[batch[0]])]
+            return await self._analyze_packed([payloads[index] for index in batch], priorities[batch[0]])
+
+        fresh: Dict[str, Dict[str, Any]] = {}
+        retry: List[int] = []
+        for batch, results in zip(batches, await asyncio.gather(*[analyze(batch) for batch in batches])):
+            if results is None:
+                continue
+            for index, analysis in zip(batch, results):
+                if analysis is not None:
+                    fresh[keys[index]] = analysis
+                elif len(batch) > 1:
+                    retry.append(index)
+
+        single_results = await asyncio.gather(*[
+            self._analyze_payload(payloads[index], priorities[index]) for index in retry
+        ])
+        for index, analysis in zip(retry, single_results):
+            if analysis is not None:
+                fresh[keys[index]] = analysis
+
+        await analysis_cache.set_many(fresh)
+        analyses.update(fresh)
+        return [dict(analyses[key]) if key in analyses else None for key in keys]
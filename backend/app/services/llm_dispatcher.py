@@ -0,0 +1,195 @@
+"""
+Task 2.3c: LLM Dispatcher
+Mọi request Gemini đi qua một pool worker async có giới hạn theo quota:
+
+- Concurrency: LLM_CONCURRENCY worker, gọi SDK (sync) trên thread pool riêng
+- Token bucket theo phút: LLM_RPM_LIMIT request và LLM_TPM_LIMIT token (ước lượng trước,
+  bù phần chênh lệch theo usage_metadata thật sau khi gọi)
+- 429 / quota: retry với exponential backoff + jitter, tạm dừng mọi worker trong khoảng chờ
+- Priority lanes: tin breaking / biến động giá được phân tích trước
+"""
+import asyncio
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.logger import log
+from app.services.keyword_matcher import KeywordMatcher
+
+PRIORITY_HIGH = 0  # Breaking news, biến động giá
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2  # Pre-classifier nghi ngờ không liên quan
+
+# Tiêu đề có các từ này -> lane ưu tiên
+HIGH_PRIORITY_KEYWORDS = [
+    "breaking", "just in", "urgent", "alert",
+    "surge", "surges", "soar", "soars", "rally", "rallies", "pump",
+    "plunge", "plunges", "crash", "crashes", "dump", "tumble", "tumbles",
+    "liquidation", "liquidations", "all-time high", "ath", "record high",
+    "hack", "hacked", "exploit", "exploited", "halted", "delisting",
+]
+HIGH_PRIORITY_TOPICS = {"Security", "Macro"}
+
+_high_priority = KeywordMatcher((keyword, True) for keyword in HIGH_PRIORITY_KEYWORDS)
+
+
+class TokenBucket:
+    """Bucket dung lượng = hạn mức mỗi phút, nạp lại liên tục. per_minute <= 0 -> không giới hạn"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Chờ tới khi đủ token (FIFO giữa các caller)"""
+        if self.capacity <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def consume(self, amount: float):
+        """Trừ thêm token không chờ (có thể âm): bù khi dùng thật nhiều hơn ước lượng"""
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens -= amount
+
+    def drain(self):
+        """Quota bị từ chối (429) -> coi như đã hết token"""
+        if self.capacity > 0:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class LLMDispatcher:
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None
+    ):
+        self.concurrency = concurrency or settings.LLM_CONCURRENCY
+        self._rpm = TokenBucket(settings.LLM_RPM_LIMIT if rpm is None else rpm)
+        self._tpm = TokenBucket(settings.LLM_TPM_LIMIT if tpm is None else tpm)
+
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sequence = itertools.count()  # FIFO trong cùng priority
+        self._paused_until = 0.0
+        self.requests = 0
+        self.rate_limited = 0
+
+    @staticmethod
+    def priority_for(title: str, topic: Optional[str] = None) -> int:
+        if topic in HIGH_PRIORITY_TOPICS or _high_priority.match(title):
+            return PRIORITY_HIGH
+        return PRIORITY_NORMAL
+
+    def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def run(self, fn: Callable[[], Any], tokens: int = 0, priority: int = PRIORITY_NORMAL) -> Any:
+        """
+        Chạy fn() (sync, gọi API) khi tới lượt và còn quota.
+
+        Args:
+            tokens: số token ước lượng (input + output) của request
+        Raises:
+            Exception của fn (429 chỉ raise khi đã hết LLM_MAX_RETRIES lần thử)
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((priority, next(self._sequence), fn, tokens, future))
+        return await future
+
+    async def _worker(self):
+        while True:
+            _, _, fn, tokens, future = await self._queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                result = await self._call(fn, tokens)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        # google.api_core.exceptions.ResourceExhausted / TooManyRequests (HTTP 429)
+        return (
+            getattr(error, "code", None) == 429
+            or type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+        )
+
+    async def _call(self, fn: Callable[[], Any], tokens: int) -> Any:
+        loop = asyncio.get_running_loop()
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            while time.monotonic() < self._paused_until:
+                await asyncio.sleep(self._paused_until - time.monotonic())
+            await self._rpm.acquire(1)
+            await self._tpm.acquire(tokens)
+
+            try:
+                self.requests += 1
+                result = await loop.run_in_executor(self._executor, fn)
+            except Exception as e:
+                if not self._is_rate_limited(e) or attempt == settings.LLM_MAX_RETRIES:
+                    raise
+                self.rate_limited += 1
+                # Backoff lũy thừa, jitter trong nửa trên khoảng chờ để các worker không retry cùng lúc
+                delay = min(settings.LLM_RETRY_MAX_SECONDS, settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt)
+                delay = random.uniform(delay / 2, delay)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                self._rpm.drain()
+                log.warning(f"Gemini rate limited (attempt {attempt + 1}), retrying in {delay:.1f}s")
+                continue
+
+            usage = getattr(getattr(result, "usage_metadata", None), "total_token_count", None)
+            if usage and usage > tokens:
+                self._tpm.consume(usage - tokens)
+            return result
+
+    async def close(self):
+        if self._queue is None:
+            return
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        self._queue = None
+        self._workers = []
+        self._executor = None
+        log.info(f"LLM dispatcher closed: {self.requests} requests, {self.rate_limited} rate limited")
+
+
+# Shared dispatcher (crawler process)
+llm_dispatcher = LLMDispatcher()
@@ -0,0 +1,215 @@
+"""
+Task 5.8: Hourly Mention Counters
+Rollup số mention theo giờ cho tag/coin (bảng mention_counts_hourly).
+
+- Crawler gọi record() trong cùng transaction với các News vừa lưu (rollback thì counter cũng rollback)
+- Enrichment queue gọi adjust() khi phân tích AI sau (thêm coin) hoặc xoá tin bị AI loại
+- TrendDetectionService đọc window_counts(): 168 bucket/key thay vì quét bài viết 7 ngày
+- rebuild() / check_consistency(): backfill và đối chiếu với bảng news
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, case, and_
+from sqlalchemy.dialects.postgresql import insert
+from app.models.news import News
+from app.models.mention_count import MentionCountHourly
+from app.core.logger import log
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+from collections import Counter
+
+# kind -> cột JSON list trên bảng news
+MENTION_COLUMNS = {
+    "tag": News.tags,
+    "coin": News.coins_mentioned,
+}
+
+BucketKey = Tuple[str, str, datetime]  # (kind, key, bucket_start)
+
+
+class MentionCounter:
+    """
+    Ghi / đọc counter mention theo giờ
+    """
+
+    WINDOW_HOURS = 24  # Cửa sổ "hiện tại" (24 bucket, tính cả giờ đang chạy)
+    HISTORY_DAYS = 7  # Tổng cửa sổ lịch sử (168 bucket)
+    STREAM_BATCH_SIZE = 1000
+
+    @staticmethod
+    def bucket_of(published_at: datetime) -> datetime:
+        """Đầu giờ (UTC) chứa published_at"""
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        return published_at.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _keys(values) -> List[str]:
+        if not values or not isinstance(values, list):
+            return []
+        return [value.upper() for value in values if isinstance(value, str)]
+
+    @staticmethod
+    def count_mentions(rows: Iterable[Tuple[datetime, list, list]]) -> Counter:
+        """
+        Đếm mention theo bucket cho các dòng (published_at, tags, coins_mentioned).
+        Dùng chung cho crawler (record) và backfill/check -> cùng một quy tắc đếm.
+        """
+        counts = Counter()
+        for published_at, tags, coins in rows:
+            if published_at is None:
+                continue
+            bucket = MentionCounter.bucket_of(published_at)
+            for kind, values in (("tag", tags), ("coin", coins)):
+                for key in MentionCounter._keys(values):
+                    counts[(kind, key, bucket)] += 1
+        return counts
+
+    @staticmethod
+    async def _upsert(db: AsyncSession, counts: Counter):
+        if not counts:
+            return
+        table = MentionCountHourly.__table__
+        stmt = insert(table).values([
+            {"kind": kind, "key": key, "bucket_start": bucket, "count": count}
+            # Thứ tự cố định: các transaction crawler chạy song song khoá dòng cùng thứ tự (không deadlock)
+            for (kind, key, bucket), count in sorted(counts.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.kind, table.c.key, table.c.bucket_start],
+            set_={"count": table.c.count + stmt.excluded.count}
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def record(db: AsyncSession, news_items: Iterable[News]):
+        """
+        Cộng counter cho các News vừa thêm (không commit, caller commit cùng News)
+        """
+        counts = MentionCounter.count_mentions(
+            (news.published_at, news.tags, news.coins_mentioned) for news in news_items
+        )
+        await MentionCounter._upsert(db, counts)
+
+    @staticmethod
+    async def adjust(db: AsyncSession, counts: Counter):
+        """
+        Cộng delta (có thể âm) cho tin đã lưu rồi thay đổi tag/coin hoặc bị xoá
+        (không commit, caller commit cùng thay đổi trên bảng news)
+        """
+        await MentionCounter._upsert(db, Counter({bucket_key: count for bucket_key, count in counts.items() if count}))
+
+    @staticmethod
+    def window_bounds(now: datetime) -> Tuple[datetime, datetime]:
+        """(đầu bucket của 24h gần nhất, đầu bucket của 7 ngày)"""
+        current = MentionCounter.bucket_of(now)
+        split = current - timedelta(hours=MentionCounter.WINDOW_HOURS - 1)
+        start = current - timedelta(hours=MentionCounter.HISTORY_DAYS * 24 - 1)
+        return split, start
+
+    @staticmethod
+    async def window_counts(db: AsyncSession, kind: str, now: datetime) -> Tuple[Counter, Counter]:
+        """
+        Một query GROUP BY trên 168 bucket gần nhất.
+
+        Returns:
+            (counts_24h, counts_prev_6d)
+        """
+        split, start = MentionCounter.window_bounds(now)
+        bucket = MentionCountHourly.bucket_start
+        query = select(
+            MentionCountHourly.key,
+            func.sum(case((bucket >= split, MentionCountHourly.count), else_=0)),
+            func.sum(case((bucket < split, MentionCountHourly.count), else_=0))
+        ).where(
+            and_(
+                MentionCountHourly.kind == kind,
+                bucket >= start
+            )
+        ).group_by(MentionCountHourly.key)
+
+        result = await db.execute(query)
+        counts_24h = Counter()
+        counts_prev = Counter()
+        for key, recent, previous in result.all():
+            if recent:
+                counts_24h[key] = int(recent)
+            if previous:
+                counts_prev[key] = int(previous)
+        return counts_24h, counts_prev
+
+    @staticmethod
+    async def _count_raw(db: AsyncSession, since_bucket: datetime) -> Counter:
+        """Đếm lại từ bảng news (stream projection) cho các bucket >= since_bucket"""
+        query = select(
+            News.published_at, News.tags, News.coins_mentioned
+        ).where(
+            News.published_at >= since_bucket
+        ).execution_options(yield_per=MentionCounter.STREAM_BATCH_SIZE)
+
+        counts = Counter()
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            counts.update(MentionCounter.count_mentions(partition))
+        return counts
+
+    @staticmethod
+    async def _stored(db: AsyncSession, since_bucket: datetime) -> Counter:
+        result = await db.execute(
+            select(
+                MentionCountHourly.kind,
+                MentionCountHourly.key,
+                MentionCountHourly.bucket_start,
+                MentionCountHourly.count
+            ).where(MentionCountHourly.bucket_start >= since_bucket)
+        )
+        return Counter({
+            (kind, key, MentionCounter.bucket_of(bucket)): count
+            for kind, key, bucket, count in result.all()
+        })
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, since: datetime) -> int:
+        """
+        Backfill: xoá và dựng lại các bucket >= since từ bảng news
+
+        Returns:
+            Số bucket đã ghi
+        """
+        since_bucket = MentionCounter.bucket_of(since)
+        counts = await MentionCounter._count_raw(db, since_bucket)
+
+        await db.execute(
+            delete(MentionCountHourly).where(MentionCountHourly.bucket_start >= since_bucket)
+        )
+        items = list(counts.items())
+        for start in range(0, len(items), MentionCounter.STREAM_BATCH_SIZE):
+            await MentionCounter._upsert(db, Counter(dict(items[start:start + MentionCounter.STREAM_BATCH_SIZE])))
+        await db.commit()
+
+        log.info(f"Rebuilt {len(counts)} mention buckets since {since_bucket.isoformat()}")
+        return len(counts)
+
+    @staticmethod
+    async def check_consistency(db: AsyncSession, since: datetime) -> List[Dict]:
+        """
+        Đối chiếu counter với bảng news cho các bucket >= since
+
+        Returns:
+            Danh sách bucket lệch: [{"kind", "key", "bucket_start", "stored", "actual"}]
+        """
+        since_bucket = MentionCounter.bucket_of(since)
+        actual = await MentionCounter._count_raw(db, since_bucket)
+        stored = await MentionCounter._stored(db, since_bucket)
+
+        mismatches = []
+        for bucket_key in sorted(set(actual) | set(stored), key=lambda k: (k[2], k[0], k[1])):
+            if actual.get(bucket_key, 0) != stored.get(bucket_key, 0):
+                kind, key, bucket = bucket_key
+                mismatches.append({
+                    "kind": kind,
+                    "key": key,
+                    "bucket_start": bucket.isoformat(),
+                    "stored": stored.get(bucket_key, 0),
+                    "actual": actual.get(bucket_key, 0)
+                })
+        return mismatches
@@ -0,0 +1,211 @@
+"""
+Task 2.3d: Local Pre-classifier
+Mô hình tuyến tính trên hashed n-gram (HashingVectorizer + SGDClassifier), chạy CPU trong process,
+train từ nhãn AI đã lưu (train_preclassifier.py):
+- news: Gemini đánh giá relevant (nhãn dương) + category_type; chỉ tin chính Gemini phân tích
+  (analysis_source="ai"), không tính tin phân tích lỗi hay kế thừa từ cluster lead
+- rejected_news (reason="ai"): AI trả is_relevant=false (nhãn âm)
+Text train giống lúc classify: title + content RSS (news.feed_summary), không phải full text sau enrich.
+
+Chạy trước GeminiClient:
+- Xác suất relevant < PRECLASSIFIER_SKIP_BELOW -> bỏ qua, không gọi LLM
+- < PRECLASSIFIER_DOWNGRADE_BELOW -> lane thấp của llm_dispatcher
+- Dự đoán market_move chắc chắn -> lane ưu tiên
+Không có file model -> không làm gì (mọi tin đi LLM như cũ).
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logger import log
+from app.models.news import News
+from app.models.rejected_news import RejectedNews
+from app.services.llm_dispatcher import PRIORITY_HIGH, PRIORITY_LOW
+
+MODEL_VERSION = 1
+TEXT_MAX_CHARS = 1000  # Chỉ dùng đầu content RSS
+HIGH_PRIORITY_CATEGORIES = {"market_move"}
+
+_vectorizer = HashingVectorizer(
+    n_features=2 ** 20,
+    ngram_range=(1, 2),
+    alternate_sign=False,
+    strip_accents="unicode",
+    norm="l2"
+)
+
+
+class Prediction(NamedTuple):
+    relevance: float  # Xác suất relevant
+    category: Optional[str]
+    category_confidence: float
+
+
+class LabeledItem(NamedTuple):
+    created_at: Optional[datetime]
+    text: str
+    relevant: bool
+    category: Optional[str]
+
+
+class PreClassifier:
+    _model: Optional[Dict[str, Any]] = None
+    _loaded_mtime: Optional[float] = None
+
+    @staticmethod
+    def text(title: str, content: Optional[str]) -> str:
+        return f"{title or ''}\n{(content or '')[:TEXT_MAX_CHARS]}"
+
+    @staticmethod
+    def train(texts: Sequence[str], relevant: Sequence[bool], categories: Sequence[Optional[str]]) -> Dict[str, Any]:
+        """
+        Train relevance (nhị phân) + category (trên các tin relevant có category).
+        Cần có cả nhãn dương và âm; category chỉ train khi có >= 2 lớp.
+        """
+        X = _vectorizer.transform(texts)
+        y = np.asarray(relevant, dtype=bool)
+        if y.all() or not y.any():
+            raise ValueError("Training data needs both relevant and rejected items")
+
+        relevance = SGDClassifier(
+            loss="log_loss", alpha=1e-5, class_weight="balanced", max_iter=50, tol=1e-4, random_state=0
+        ).fit(X, y)
+
+        labeled = [i for i, category in enumerate(categories) if relevant[i] and category]
+        category_model = None
+        if len({categories[i] for i in labeled}) > 1:
+            category_model = SGDClassifier(
+                loss="log_loss", alpha=1e-5, max_iter=50, tol=1e-4, random_state=0
+            ).fit(X[labeled], [categories[i] for i in labeled])
+
+        return {
+            "version": MODEL_VERSION,
+            "relevance": relevance,
+            "category": category_model,
+            "samples": len(texts),
+            "trained_at": datetime.utcnow().isoformat()
+        }
+
+    @staticmethod
+    def predict(model: Dict[str, Any], texts: Sequence[str]) -> List[Prediction]:
+        if not texts:
+            return []
+        X = _vectorizer.transform(texts)
+        relevance_model = model["relevance"]
+        relevant_column = list(relevance_model.classes_).index(True)
+        relevance = relevance_model.predict_proba(X)[:, relevant_column]
+
+        category_model = model.get("category")
+        if category_model is None:
+            return [Prediction(float(p), None, 0.0) for p in relevance]
+        probabilities = category_model.predict_proba(X)
+        best = probabilities.argmax(axis=1)
+        return [
+            Prediction(float(p), str(category_model.classes_[b]), float(probabilities[i, b]))
+            for i, (p, b) in enumerate(zip(relevance, best))
+        ]
+
+    @staticmethod
+    def save(model: Dict[str, Any], path: Optional[str] = None):
+        """Ghi file tạm rồi os.replace: crawler đang chạy không đọc phải file ghi dở"""
+        path = path or settings.PRECLASSIFIER_MODEL_FILE
+        tmp_path = f"{path}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def current_model(cls) -> Optional[Dict[str, Any]]:
+        """Model đã train (nạp lại khi file đổi), None nếu chưa có file / file lỗi"""
+        path = settings.PRECLASSIFIER_MODEL_FILE
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            cls._model, cls._loaded_mtime = None, None
+            return None
+        if mtime != cls._loaded_mtime:
+            cls._loaded_mtime = mtime
+            try:
+                model = joblib.load(path)
+                if model.get("version") != MODEL_VERSION:
+                    raise ValueError(f"unsupported model version {model.get('version')}")
+                cls._model = model
+                log.info(f"Pre-classifier loaded from {path} ({model['samples']} samples, trained {model['trained_at']})")
+            except Exception as e:
+                cls._model = None
+                log.error(f"Failed to load pre-classifier {path}: {e}")
+        return cls._model
+
+    @classmethod
+    def classify(cls, items: Sequence[Tuple[str, Optional[str]]]) -> List[Optional[Prediction]]:
+        """
+        Args:
+            items: [(title, content)]
+        Returns:
+            Prediction theo thứ tự đầu vào (None nếu chưa có model)
+        """
+        model = cls.current_model()
+        if model is None:
+            return [None] * len(items)
+        return cls.predict(model, [cls.text(title, content) for title, content in items])
+
+    @staticmethod
+    def route(prediction: Optional[Prediction], priority: int) -> Optional[int]:
+        """Priority lane cho LLM; None = bỏ qua (chắc chắn không liên quan)"""
+        if prediction is None:
+            return priority
+        if prediction.relevance < settings.PRECLASSIFIER_SKIP_BELOW:
+            return None
+        if prediction.relevance < settings.PRECLASSIFIER_DOWNGRADE_BELOW:
+            return PRIORITY_LOW
+        if (
+            prediction.category in HIGH_PRIORITY_CATEGORIES
+            and prediction.category_confidence >= settings.PRECLASSIFIER_CATEGORY_CONFIDENCE
+        ):
+            return PRIORITY_HIGH
+        return priority
+
+    @staticmethod
+    async def record_rejected(db: AsyncSession, rows: List[Dict[str, Any]]):
+        """
+        Lưu tin bị loại vào rejected_news (không commit, caller commit cùng batch).
+        URL đã có -> bỏ qua: mỗi tin một nhãn dù bị loại lại ở cycle sau
+        """
+        if rows:
+            await db.execute(insert(RejectedNews).values(rows).on_conflict_do_nothing(index_elements=["url"]))
+
+    @staticmethod
+    async def load_labeled(db: AsyncSession, since: Optional[datetime] = None) -> List[LabeledItem]:
+        """
+        Nhãn AI đã lưu: news Gemini đã phân tích (relevant + category) và rejected_news reason="ai" (không relevant).
+        Tin đã enrich trước khi có cột feed_summary không còn bản RSS -> bỏ qua (raw_content là full text)
+        """
+        news_query = select(News.created_at, News.title, News.feed_summary, News.category_type).where(
+            News.analysis_source == "ai",
+            News.sentiment_label.isnot(None),
+            News.feed_summary.isnot(None)
+        )
+        rejected_query = select(RejectedNews.created_at, RejectedNews.title, RejectedNews.raw_content).where(
+            RejectedNews.reason == "ai"
+        )
+        if since is not None:
+            news_query = news_query.where(News.created_at >= since)
+            rejected_query = rejected_query.where(RejectedNews.created_at >= since)
+
+        items = [
+            LabeledItem(created_at, PreClassifier.text(title, content), True, category.value if category else None)
+            for created_at, title, content, category in (await db.execute(news_query)).all()
+        ]
+        items.extend(
+            LabeledItem(created_at, PreClassifier.text(title, content), False, None)
+            for created_at, title, content in (await db.execute(rejected_query)).all()
+        )
+        return items
@@ -3,12 +3,12 @@ Task 5.7: Hotness Ranking Algorithm
 Tính điểm "Hot" cho tin tức (HackerNews/Reddit style)
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, func, and_, true, cast, extract, Numeric, Float
 from app.models.news import News
 from app.models.source import Source
 from app.models.vote import Vote
 from app.core.logger import log
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from typing import Optional
 import math
 
@@ -16,25 +16,29 @@ class HotnessRanking:
     """
     Tính toán và cập nhật ranking score cho tin tức
     Formula: Hot_Score = ((Trust * Impact) + (Votes * 2)) / (Age + 2)^1.5
+    
+    Trust * Impact (news.base_score) và Votes (news.vote_count) được lưu sẵn và cập nhật
+    khi có sự kiện (crawler insert, vote); job định kỳ áp time-decay và thỉnh thoảng
+    tính lại các thành phần (refresh_components).
     """
     
     GRAVITY = 1.5  # Độ "rơi" của tin cũ
     VOTE_MULTIPLIER = 2
     
     @staticmethod
-    def calculate_age_in_hours(published_at: datetime) -> float:
+    def calculate_age_in_hours(published_at: datetime, now: Optional[datetime] = None) -> float:
         """Tính tuổi của tin tức (giờ)"""
         if published_at.tzinfo is None:
             published_at = published_at.replace(tzinfo=timezone.utc)
         
-        now = datetime.now(timezone.utc)
+        now = now or datetime.now(timezone.utc)
         delta = now - published_at
         return max(0.1, delta.total_seconds() / 3600)  # Minimum 0.1h để tránh div/0
     
     @staticmethod
-    async def calculate_hotness(news: News, db: AsyncSession) -> float:
+    async def calculate_hotness(news: News, db: AsyncSession, now: Optional[datetime] = None) -> float:
         """
-        Tính hotness score cho 1 tin
+        Tính hotness score cho 1 tin (bản Python tham chiếu của hotness_query)
         
         Returns:
             float: Ranking score (0-1000+)
@@ -44,36 +48,107 @@ class HotnessRanking:
             select(Source).where(Source.id == news.source_id)
         )
         source = source_query.scalar_one_or_none()
-        trust_score = source.trust_score if source else 5.0
+        trust_score = source.trust_score if source else None
         
-        # 2. Impact Score (0-10) từ AI sentiment
-        # Map sentiment_score (-10 to +10) sang impact (0-10)
-        # Tin có sentiment mạnh (bullish/bearish) = impact cao
-        if news.sentiment_score is not None:
-            impact_score = abs(news.sentiment_score)  # -10 hoặc +10 đều là high impact
-        else:
-            impact_score = 5.0  # Neutral default
-        
-        # 3. Vote Count (weighted by vote power)
+        # 2. Vote Count (weighted by vote power)
         vote_count_query = select(func.count(Vote.id)).where(Vote.news_id == news.id)
         result = await db.execute(vote_count_query)
         vote_count = result.scalar() or 0
         
-        # 4. Age Penalty
-        age_hours = HotnessRanking.calculate_age_in_hours(news.published_at)
+        # 3. Formula
+        base_score = HotnessRanking.calculate_base_score(trust_score, news.sentiment_score)
+        return HotnessRanking.score_from_components(base_score, vote_count, news.published_at, now)
+    
+    @staticmethod
+    def calculate_base_score(trust_score: Optional[float], sentiment_score: Optional[float]) -> float:
+        """
+        Phần không phụ thuộc thời gian và vote: Trust * Impact
+        Lưu vào news.base_score khi insert (crawler), chỉ đổi khi trust/sentiment đổi.
+        """
+        # Trust Score (0-10) từ nguồn
+        if trust_score is None:
+            trust_score = 5.0
         
-        # 5. Formula
-        numerator = (trust_score * impact_score) + (vote_count * HotnessRanking.VOTE_MULTIPLIER)
+        # Impact Score (0-10) từ AI sentiment
+        # Map sentiment_score (-10 to +10) sang impact (0-10)
+        # Tin có sentiment mạnh (bullish/bearish) = impact cao
+        if sentiment_score is not None:
+            impact_score = abs(sentiment_score)  # -10 hoặc +10 đều là high impact
+        else:
+            impact_score = 5.0  # Neutral default
+        
+        return trust_score * impact_score
+    
+    @staticmethod
+    def score_from_components(
+        base_score: float,
+        vote_count: int,
+        published_at: datetime,
+        now: Optional[datetime] = None
+    ) -> float:
+        """Hot_Score từ các thành phần đã lưu + age penalty"""
+        age_hours = HotnessRanking.calculate_age_in_hours(published_at, now)
+        
+        numerator = base_score + (vote_count * HotnessRanking.VOTE_MULTIPLIER)
         denominator = math.pow(age_hours + 2, HotnessRanking.GRAVITY)
         
         hotness = numerator / denominator
         
         return round(hotness, 2)
     
+    @staticmethod
+    def _decayed_score(numerator, now: Optional[datetime] = None):
+        """SQL: numerator / (Age + 2)^1.5, làm tròn 2 chữ số (giống score_from_components)"""
+        reference_time = now if now is not None else func.now()
+        age_hours = func.greatest(
+            extract("epoch", reference_time - News.published_at) / 3600,
+            0.1  # Minimum 0.1h để tránh div/0
+        )
+        denominator = func.power(age_hours + 2, HotnessRanking.GRAVITY)
+        return cast(func.round(cast(numerator / denominator, Numeric), 2), Float)
+    
+    @staticmethod
+    def hotness_query(cutoff_time: Optional[datetime], now: Optional[datetime] = None):
+        """
+        SELECT (news_id, base_score, vote_count, score) cho mọi tin published_at >= cutoff_time
+        (None = toàn bộ bảng). Cùng công thức với calculate_hotness, tính hoàn toàn trong Postgres
+        (LEFT JOIN sources + vote count đã GROUP BY).
+        """
+        in_window = News.published_at >= cutoff_time if cutoff_time is not None else true()
+        vote_counts = (
+            select(Vote.news_id, func.count(Vote.id).label("vote_count"))
+            .join(News, News.id == Vote.news_id)
+            .where(in_window)
+            .group_by(Vote.news_id)
+            .subquery()
+        )
+        
+        trust_score = func.coalesce(Source.trust_score, 5.0)
+        impact_score = func.coalesce(func.abs(News.sentiment_score), 5.0)
+        vote_count = func.coalesce(vote_counts.c.vote_count, 0)
+        
+        numerator = (trust_score * impact_score) + (vote_count * HotnessRanking.VOTE_MULTIPLIER)
+        score = HotnessRanking._decayed_score(numerator, now)
+        
+        return (
+            select(
+                News.id.label("news_id"),
+                (trust_score * impact_score).label("base_score"),
+                vote_count.label("vote_count"),
+                score.label("score")
+            )
+            .outerjoin(Source, Source.id == News.source_id)
+            .outerjoin(vote_counts, vote_counts.c.news_id == News.id)
+            .where(in_window)
+        )
+    
     @staticmethod
     async def update_all_scores(db: AsyncSession, time_window_hours: int = 72) -> int:
         """
-        Cập nhật ranking score cho tất cả tin gần đây
+        Sweep time-decay định kỳ: ranking_score = (base_score + vote_count * 2) / (Age + 2)^1.5
+        
+        Chỉ đọc các thành phần đã lưu trên chính bảng news (không join sources/votes),
+        vote mới đã được cập nhật ngay bởi apply_vote.
         
         Args:
             time_window_hours: Chỉ update tin trong X giờ qua
@@ -81,29 +156,70 @@ class HotnessRanking:
         Returns:
             Số tin đã update
         """
-        from datetime import timedelta
-        
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
         
-        # Lấy tin trong 72h qua
-        query = select(News).where(News.published_at >= cutoff_time)
-        result = await db.execute(query)
-        news_items = result.scalars().all()
+        numerator = News.base_score + (News.vote_count * HotnessRanking.VOTE_MULTIPLIER)
+        result = await db.execute(
+            update(News)
+            .where(News.published_at >= cutoff_time)
+            .values(ranking_score=HotnessRanking._decayed_score(numerator))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
         
-        updated_count = 0
+        updated_count = result.rowcount
+        log.info(f"Updated ranking scores for {updated_count} news items")
+        return updated_count
+    
+    @staticmethod
+    async def refresh_components(db: AsyncSession, time_window_hours: Optional[int] = 72) -> int:
+        """
+        Tính lại base_score / vote_count / ranking_score từ sources + votes (một câu UPDATE ... FROM).
+        Dùng cho backfill và định kỳ trong background_ranking.py (trust_score / sentiment thay đổi).
         
-        for news in news_items:
-            try:
-                new_score = await HotnessRanking.calculate_hotness(news, db)
-                news.ranking_score = new_score
-                updated_count += 1
-            except Exception as e:
-                log.error(f"Failed to calculate hotness for news {news.id}: {e}")
+        Args:
+            time_window_hours: None = toàn bộ bảng news
         
+        Returns:
+            Số tin đã update
+        """
+        cutoff_time = None
+        if time_window_hours is not None:
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
+        
+        scores = HotnessRanking.hotness_query(cutoff_time).subquery()
+        result = await db.execute(
+            update(News)
+            .where(News.id == scores.c.news_id)
+            .values(
+                base_score=scores.c.base_score,
+                vote_count=scores.c.vote_count,
+                ranking_score=scores.c.score
+            )
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
         
-        log.info(f"Updated ranking scores for {updated_count} news items")
-        return updated_count
+        log.info(f"Refreshed ranking components for {result.rowcount} news items")
+        return result.rowcount
+    
+    @staticmethod
+    async def apply_vote(db: AsyncSession, news_id: int):
+        """
+        Vote mới: tăng vote_count và tính lại ranking_score của riêng tin đó ngay lập tức.
+        Chạy trong transaction của request vote (caller commit).
+        """
+        vote_count = News.vote_count + 1
+        numerator = News.base_score + (vote_count * HotnessRanking.VOTE_MULTIPLIER)
+        await db.execute(
+            update(News)
+            .where(News.id == news_id)
+            .values(
+                vote_count=vote_count,
+                ranking_score=HotnessRanking._decayed_score(numerator)
+            )
+            .execution_options(synchronize_session=False)
+        )
     
     @staticmethod
     async def get_trending_news(
@@ -112,13 +228,8 @@ class HotnessRanking:
         offset: int = 0
     ) -> list[News]:
         """
-        Lấy tin trending (sort by ranking_score DESC)
+        Lấy tin trending (cluster leads, theo Hot_Score hiện tại từ ranking index)
         """
-        query = select(News).where(
-            News.is_cluster_lead == True  # Chỉ lấy cluster leads
-        ).order_by(
-            News.ranking_score.desc()
-        ).limit(limit).offset(offset)
-        
-        result = await db.execute(query)
-        return result.scalars().all()
+        from app.services.ranking_index import get_trending_page  # ranking_index import module này
+        
+        return await get_trending_page(db, select(News), offset, limit, leads_only=True)
@@ -0,0 +1,259 @@
+"""
+Task 5.7: In-memory Trending Index
+Giữ phần tĩnh của Hot_Score (base_score + vote_count * 2) của các tin trong time window
+trong bộ nhớ của mỗi API worker, áp time-decay tại thời điểm đọc.
+
+Decay (Age + 2)^1.5 không bảo toàn thứ tự (hai tin khác tuổi có thể đổi chỗ theo thời gian),
+nên không có static key nào sort một lần là xong. Thay vào đó toàn bộ điểm được tính lại
+bằng numpy (vài trăm micro giây cho vài chục nghìn tin) và thứ tự được giữ trong một
+snapshot ORDER_RESOLUTION giây -> đọc trang chỉ là cắt mảng, phân trang ổn định trong snapshot.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, desc, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.core.logger import log
+from app.db.session import AsyncSessionLocal
+from app.models.news import News
+from app.services.ranking import HotnessRanking
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RankingIndex:
+    """
+    Snapshot các tin published_at >= now - window (reload định kỳ từ DB, cập nhật tại chỗ khi có vote).
+    Mỗi process một instance (ranking_index bên dưới).
+    """
+
+    def __init__(
+        self,
+        window_hours: int = settings.RANKING_INDEX_WINDOW_HOURS,
+        refresh_seconds: int = settings.RANKING_INDEX_REFRESH_SECONDS,
+        order_resolution: int = settings.RANKING_ORDER_RESOLUTION_SECONDS
+    ):
+        self.window_hours = window_hours
+        self.refresh_seconds = refresh_seconds
+        self.order_resolution = order_resolution
+
+        self._ids = np.empty(0, dtype=np.int64)
+        self._published = np.empty(0, dtype=np.float64)
+        self._numerator = np.empty(0, dtype=np.float64)  # base_score + vote_count * 2
+        self._is_lead = np.empty(0, dtype=bool)
+        self._pinned_until = np.empty(0, dtype=np.float64)  # -inf: không pin, +inf: pin vô thời hạn
+        self._position: Dict[int, int] = {}
+
+        self.cutoff: Optional[datetime] = None  # Tin cũ hơn cutoff không có trong index
+        self._loaded_at = 0.0
+        self._orders: Dict[Tuple[bool, bool], Tuple[float, np.ndarray]] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.cutoff is not None
+
+    async def load(self, db: AsyncSession):
+        """Nạp lại index bằng một query projection (không đọc raw_content...)"""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.window_hours)
+        result = await db.execute(
+            select(
+                News.id,
+                News.published_at,
+                func.coalesce(News.base_score, 0.0)
+                + func.coalesce(News.vote_count, 0) * HotnessRanking.VOTE_MULTIPLIER,
+                News.is_cluster_lead,
+                News.is_pinned,
+                News.pinned_until
+            ).where(News.published_at >= cutoff)
+        )
+        rows = result.all()
+
+        self._ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self._published = np.fromiter((_epoch(row[1]) for row in rows), dtype=np.float64, count=len(rows))
+        self._numerator = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        self._is_lead = np.fromiter((bool(row[3]) for row in rows), dtype=bool, count=len(rows))
+        self._pinned_until = np.fromiter(
+            (self._pinned_epoch(row[4], row[5]) for row in rows), dtype=np.float64, count=len(rows)
+        )
+        self._position = {news_id: i for i, news_id in enumerate(self._ids.tolist())}
+
+        self.cutoff = cutoff
+        self._loaded_at = time.monotonic()
+        self._orders.clear()
+        log.debug(f"Ranking index loaded: {len(rows)} news")
+
+    @staticmethod
+    def _pinned_epoch(is_pinned: Optional[bool], pinned_until: Optional[datetime]) -> float:
+        # Giống điều kiện của /news: NULL is_pinned không thuộc danh sách thường
+        if is_pinned is False:
+            return -np.inf
+        if is_pinned and pinned_until is not None:
+            return _epoch(pinned_until)
+        return np.inf
+
+    async def _reload(self):
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+
+    async def ensure_fresh(self):
+        """
+        Lần đầu: chờ nạp. Sau đó: index cũ hơn refresh_seconds -> reload nền,
+        request hiện tại vẫn đọc snapshot đang có.
+        """
+        if not self.loaded:
+            async with self._lock:
+                if not self.loaded:
+                    async with AsyncSessionLocal() as db:
+                        await self.load(db)
+            return
+
+        stale = time.monotonic() - self._loaded_at >= self.refresh_seconds
+        if stale and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._safe_reload())
+
+    async def _safe_reload(self):
+        try:
+            await self._reload()
+        except Exception as e:
+            log.error(f"Ranking index reload failed: {e}")
+
+    def record_vote(self, news_id: int):
+        """Vote vừa commit trên worker này: cập nhật điểm ngay, không chờ reload"""
+        position = self._position.get(news_id)
+        if position is None:
+            return
+        self._numerator[position] += HotnessRanking.VOTE_MULTIPLIER
+        self._orders.clear()
+
+    def drop(self, news_ids):
+        """Bỏ các tin không còn trong DB (bị xoá sau lần load) khỏi snapshot, không chờ reload"""
+        keep = ~np.isin(self._ids, np.fromiter(news_ids, dtype=np.int64))
+        if keep.all():
+            return
+        self._ids = self._ids[keep]
+        self._published = self._published[keep]
+        self._numerator = self._numerator[keep]
+        self._is_lead = self._is_lead[keep]
+        self._pinned_until = self._pinned_until[keep]
+        self._position = {news_id: i for i, news_id in enumerate(self._ids.tolist())}
+        self._orders.clear()
+
+    def scores(self, positions: Optional[np.ndarray] = None, now: Optional[float] = None) -> np.ndarray:
+        """Hot_Score hiện tại (cùng công thức score_from_components) của các vị trí cho trước / toàn bộ index"""
+        now = time.time() if now is None else now
+        published = self._published if positions is None else self._published[positions]
+        numerator = self._numerator if positions is None else self._numerator[positions]
+        age_hours = np.maximum((now - published) / 3600, 0.1)
+        return numerator / np.power(age_hours + 2, HotnessRanking.GRAVITY)
+
+    def _order(self, leads_only: bool, exclude_pinned: bool) -> np.ndarray:
+        """Vị trí các tin theo điểm giảm dần (hoà: id mới hơn trước), cache theo snapshot"""
+        now = time.time()
+        key = (leads_only, exclude_pinned)
+        cached = self._orders.get(key)
+        if cached and now - cached[0] < self.order_resolution:
+            return cached[1]
+
+        mask = np.ones(len(self._ids), dtype=bool)
+        if leads_only:
+            mask &= self._is_lead
+        if exclude_pinned:
+            mask &= self._pinned_until <= now
+        candidates = np.flatnonzero(mask)
+        scores = self.scores(candidates, now)
+        order = candidates[np.lexsort((-self._ids[candidates], -scores))]
+
+        self._orders[key] = (now, order)
+        return order
+
+    def page(
+        self,
+        offset: int,
+        limit: int,
+        leads_only: bool = False,
+        exclude_pinned: bool = False
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Returns:
+            ([(news_id, current_score)] của trang, tổng số tin khớp trong index)
+        """
+        order = self._order(leads_only, exclude_pinned)
+        positions = order[offset:offset + limit]
+        scores = self.scores(positions)
+        entries = [
+            (int(news_id), round(float(score), 2))
+            for news_id, score in zip(self._ids[positions], scores)
+        ]
+        return entries, len(order)
+
+
+async def get_trending_page(
+    db: AsyncSession,
+    base_query,
+    offset: int,
+    limit: int,
+    leads_only: bool = False,
+    exclude_pinned: bool = False
+) -> List[News]:
+    """
+    Trang trending: phần trong time window lấy thứ tự từ ranking_index (điểm decay hiện tại),
+    phần vượt quá window (tin cũ) lấy từ DB theo ranking_score như trước.
+
+    base_query: select(News) với options/điều kiện của endpoint (không order_by, offset, limit)
+    """
+    await ranking_index.ensure_fresh()
+
+    while True:
+        entries, total = ranking_index.page(offset, limit, leads_only, exclude_pinned)
+        news_items: List[News] = []
+        current_scores: Dict[int, float] = dict(entries)
+        if not entries:
+            break
+        result = await db.execute(base_query.where(News.id.in_(list(current_scores))))
+        by_id = {news.id: news for news in result.scalars().all()}
+        missing = [news_id for news_id in current_scores if news_id not in by_id]
+        if not missing:
+            news_items = [by_id[news_id] for news_id, _ in entries]
+            break
+        # Tin đã bị xoá khỏi DB sau lần load: bỏ khỏi index rồi lấy lại trang,
+        # để total (và offset phần tin cũ bên dưới) khớp với số tin thực sự trả về
+        ranking_index.drop(missing)
+
+    remaining = limit - len(news_items)
+    if remaining > 0:
+        older_query = base_query.where(
+            or_(News.published_at < ranking_index.cutoff, News.published_at.is_(None))
+        )
+        if leads_only:
+            older_query = older_query.where(News.is_cluster_lead == True)
+        result = await db.execute(
+            older_query.order_by(desc(News.ranking_score))
+            .offset(max(offset - total, 0))
+            .limit(remaining)
+        )
+        news_items.extend(result.scalars().all())
+
+    # Điểm hiện tại chỉ để trả về: set như giá trị đã load (không đánh dấu dirty),
+    # flush / commit sau đó trong session không ghi điểm decay xuống DB
+    for news in news_items:
+        if news.id in current_scores:
+            set_committed_value(news, "ranking_score", current_scores[news.id])
+
+    return news_items
+
+
+# Shared index (mỗi API worker một bản)
+ranking_index = RankingIndex()
@@ -0,0 +1,70 @@
+"""
+Batch title similarity engine
+Tính ma trận token_set_ratio cho nhiều tiêu đề trong một lần gọi (rapidfuzz.process.cdist,
+chạy bằng C và đa luồng) thay vì gọi fuzz.token_set_ratio từng cặp trong Python.
+
+Điểm số giống hệt thefuzz.fuzz.token_set_ratio: cùng bước chuẩn hoá (full_process,
+force_ascii=True) và cùng cách làm tròn (round-half-even về số nguyên).
+"""
+from typing import Sequence, Optional
+
+import numpy as np
+from rapidfuzz import fuzz as rf_fuzz, process
+from thefuzz import utils as fuzz_utils
+
+# Số dòng (query) tính trong một lần cdist, giới hạn bộ nhớ ma trận tạm
+CHUNK_SIZE = 512
+
+
+def normalize_title(title: str) -> str:
+    """Chuẩn hoá giống thefuzz (lowercase, bỏ ký tự đặc biệt, chỉ giữ ASCII)"""
+    return fuzz_utils.full_process(title or "", force_ascii=True)
+
+
+def similarity_matrix(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    workers: int = -1,
+    min_score: Optional[int] = None
+) -> np.ndarray:
+    """
+    Ma trận điểm token_set_ratio (0-100, uint8) giữa queries x choices.
+    Input phải đã qua normalize_title().
+    min_score: chỉ cần biết điểm >= min_score -> rapidfuzz bỏ qua sớm các cặp không đạt
+    (điểm < min_score trả về 0).
+    """
+    if not queries or not choices:
+        return np.zeros((len(queries), len(choices)), dtype=np.uint8)
+
+    scores = process.cdist(
+        queries,
+        choices,
+        scorer=rf_fuzz.token_set_ratio,
+        processor=None,
+        dtype=np.float64,
+        workers=workers,
+        # -0.5: điểm làm tròn lên min_score vẫn được giữ lại
+        score_cutoff=None if min_score is None else max(min_score - 0.5, 0)
+    )
+    return np.rint(scores).astype(np.uint8)
+
+
+def title_similarity(query: str, choice: str) -> int:
+    """Điểm token_set_ratio của một cặp (cùng cách làm tròn với similarity_matrix)"""
+    return int(np.rint(rf_fuzz.token_set_ratio(query, choice, processor=None)))
+
+
+def iter_similarity_rows(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = -1,
+    min_score: Optional[int] = None
+):
+    """Yield (row_index, scores_row) theo từng chunk để không giữ toàn bộ ma trận N x M"""
+    for start in range(0, len(queries), chunk_size):
+        block = similarity_matrix(
+            queries[start:start + chunk_size], choices, workers=workers, min_score=min_score
+        )
+        for offset, row in enumerate(block):
+            yield start + offset, row
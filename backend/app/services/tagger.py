@@ -1,60 +1,117 @@
-import re
-from typing import List, Tuple
-from app.core.taxonomy import COIN_KEYWORDS, TOPIC_KEYWORDS
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import log
+from app.core.taxonomy import DEFAULT_TAXONOMY, Taxonomy, load_taxonomy
+from app.services.keyword_matcher import KeywordMatcher
+
+
+class TagResult(NamedTuple):
+    coins: List[str]
+    topic: Optional[str]
+    is_relevant: bool
+
+
+class CompiledTaxonomy(NamedTuple):
+    """Taxonomy + matcher đã build; được thay nguyên khối khi reload"""
+    matcher: KeywordMatcher
+    coin_rank: Dict[str, int]
+    topic_rank: Dict[str, int]
+    mtime: Optional[float]
+
+
+def compile_taxonomy(taxonomy: Taxonomy, mtime: Optional[float] = None) -> CompiledTaxonomy:
+    entries = []
+    for coin, keywords in taxonomy.coins.items():
+        entries.extend((kw, ("coin", coin)) for kw in keywords)
+    for topic, keywords in taxonomy.topics.items():
+        entries.extend((kw, ("topic", topic)) for kw in keywords)
+    entries.extend((kw, ("general", kw)) for kw in taxonomy.general)
+    return CompiledTaxonomy(
+        matcher=KeywordMatcher(entries),
+        coin_rank={coin: i for i, coin in enumerate(taxonomy.coins)},
+        topic_rank={topic: i for i, topic in enumerate(taxonomy.topics)},
+        mtime=mtime
+    )
+
 
 class KeywordTagger:
+    # Build một lần khi import; reload_taxonomy() thay cả khối (atomic swap) khi file taxonomy đổi
+    _compiled = compile_taxonomy(DEFAULT_TAXONOMY)
+    _checked_at = 0.0
+    _seen_mtime: Optional[float] = None  # mtime đã thử nạp (kể cả lỗi) -> file hỏng không bị parse lại mỗi chu kỳ
+
+    @staticmethod
+    def reload_taxonomy(force: bool = False) -> bool:
+        """
+        Đọc lại settings.TAXONOMY_FILE nếu mtime thay đổi (hoặc force).
+        File lỗi -> giữ taxonomy đang dùng. Returns True nếu đã swap.
+        """
+        KeywordTagger._checked_at = time.monotonic()
+        path = settings.TAXONOMY_FILE
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False  # Không có file: giữ taxonomy hiện tại (mặc định built-in)
+        
+        if not force and mtime == KeywordTagger._seen_mtime:
+            return False
+        
+        KeywordTagger._seen_mtime = mtime
+        try:
+            taxonomy = load_taxonomy(path)
+            compiled = compile_taxonomy(taxonomy, mtime)
+        except Exception as e:
+            log.error(f"Taxonomy reload failed ({path}): {e}")
+            return False
+        
+        KeywordTagger._compiled = compiled
+        log.info(f"Taxonomy loaded from {path}: {len(taxonomy.coins)} coins, {compiled.matcher.size} keywords")
+        return True
+
+    @staticmethod
+    def _current() -> CompiledTaxonomy:
+        if time.monotonic() - KeywordTagger._checked_at >= settings.TAXONOMY_RELOAD_SECONDS:
+            KeywordTagger.reload_taxonomy()
+        return KeywordTagger._compiled
+
+    @staticmethod
+    def tag(text: str) -> TagResult:
+        """
+        Một lượt quét duy nhất: coins, primary topic và relevance.
+        Word-boundary giống re.search(r'\\b' + kw + r'\\b') (vd 'sol' không khớp 'absolute').
+        """
+        compiled = KeywordTagger._current()
+        found = compiled.matcher.match(text)
+        if not found:
+            return TagResult([], None, False)
+
+        # Giữ thứ tự taxonomy -> kết quả ổn định giữa các lần chạy
+        coins = sorted((label for kind, label in found if kind == "coin"), key=compiled.coin_rank.__getitem__)
+        topics = [label for kind, label in found if kind == "topic"]
+        topic = min(topics, key=compiled.topic_rank.__getitem__) if topics else None
+        return TagResult(coins, topic, True)
+
+    @staticmethod
+    def tag_many(texts: Iterable[str]) -> List[TagResult]:
+        """Batch API cho nhiều văn bản (matcher dùng chung)"""
+        return [KeywordTagger.tag(text) for text in texts]
+
     @staticmethod
     def extract_tags(text: str) -> Tuple[List[str], str]:
         """
         Scans text (title + content) against the taxonomy.
         Returns:
             - List of found coins (e.g., ['BTC', 'ETH'])
-            - Primary Topic Category (e.g., 'DeFi') - currently returns the first matched or None
+            - Primary Topic Category (e.g., 'DeFi') - first matched topic in taxonomy order, or None
         """
-        if not text:
-            return [], None
-        
-        text_lower = text.lower()
-        found_coins = set()
-        found_topics = set()
-        
-        # Check Coins
-        for coin, keywords in COIN_KEYWORDS.items():
-            for kw in keywords:
-                # Use regex boundry to avoid partial match (e.g. 'sol' in 'absolute')
-                # Simple check first for speed, then regex if strictly needed. 
-                # For now, simple containment or word boundry regex.
-                if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                    found_coins.add(coin)
-                    break 
-        
-        # Check Topics
-        for topic, keywords in TOPIC_KEYWORDS.items():
-            for kw in keywords:
-                if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                    found_topics.add(topic)
-                    break
-        
-        # Determine primary topic (primitive logic: just take the first one found)
-        primary_topic = list(found_topics)[0] if found_topics else None
-        
-        return list(found_coins), primary_topic
+        result = KeywordTagger.tag(text)
+        return result.coins, result.topic
 
     @staticmethod
     def is_relevant(text: str) -> bool:
         """
-        Returns True if ANY crypto-related keyword (Coin or Topic) is found.
-        Also checks against a general 'crypto' whitelist if needed.
-        """
-        coins, topic = KeywordTagger.extract_tags(text)
-        if coins or topic:
-            return True
-            
-        # Optional: Add general crypto terms if no specific coin/topic found
-        general_terms = ['crypto', 'blockchain', 'web3', 'wallet', 'exchange', 'token']
-        text_lower = text.lower()
-        for term in general_terms:
-             if re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                 return True
-                 
-        return False
+        Returns True if ANY crypto-related keyword (Coin, Topic or general term) is found.
+        """
+        return KeywordTagger.tag(text).is_relevant
@@ -5,10 +5,11 @@ Phát hiện chủ đề đang hot (Narrative Detection)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 from app.models.news import News
+from app.services.mention_counter import MentionCounter, MENTION_COLUMNS
 from app.core.logger import log
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List
-from collections import Counter
+from collections import defaultdict
 
 class TrendDetectionService:
     """
@@ -16,6 +17,57 @@ class TrendDetectionService:
     """
     
     VELOCITY_THRESHOLD = 2.0  # 200% increase = trending
+    SAMPLE_SIZE = 3  # Số tin mẫu cho mỗi tag/coin
+    STREAM_BATCH_SIZE = 1000  # Số dòng mỗi lần fetch từ server-side cursor
+    
+    @staticmethod
+    async def _collect_samples(
+        db: AsyncSession,
+        column,
+        keys: set,
+        now: datetime,
+        with_published_at: bool
+    ) -> Dict[str, List[Dict]]:
+        """
+        Sample news (mới nhất trước) cho các tag/coin đang trending.
+        Stream projection 24h qua và dừng ngay khi mọi key đã đủ SAMPLE_SIZE tin.
+        """
+        samples = defaultdict(list)
+        if not keys:
+            return samples
+        
+        day_ago = now - timedelta(hours=24)
+        query = select(
+            News.id, News.title, News.sentiment_label, News.published_at, column
+        ).where(
+            News.published_at >= day_ago
+        ).order_by(News.published_at.desc()).execution_options(
+            yield_per=TrendDetectionService.STREAM_BATCH_SIZE
+        )
+        
+        pending = set(keys)
+        result = await db.stream(query)
+        async for news_id, title, sentiment_label, published_at, values in result:
+            if not values or not isinstance(values, list):
+                continue
+            for key in dict.fromkeys(value.upper() for value in values if isinstance(value, str)):
+                if key not in pending:
+                    continue
+                sample = {
+                    "id": news_id,
+                    "title": title,
+                    "sentiment_label": sentiment_label
+                }
+                if with_published_at:
+                    sample["published_at"] = published_at.isoformat()
+                samples[key].append(sample)
+                if len(samples[key]) >= TrendDetectionService.SAMPLE_SIZE:
+                    pending.discard(key)
+            if not pending:
+                break
+        
+        await result.close()
+        return samples
     
     @staticmethod
     async def detect_trending_narratives(db: AsyncSession) -> List[Dict]:
@@ -26,39 +78,8 @@ class TrendDetectionService:
             List[Dict]: [{"tag": "AI", "velocity": 3.5, "count_24h": 15, "sample_news": [...]}]
         """
         now = datetime.now(timezone.utc)
-        day_ago = now - timedelta(hours=24)
-        week_ago = now - timedelta(days=7)
-        
-        # Lấy tin 24h qua
-        query_24h = select(News).where(News.published_at >= day_ago)
-        result_24h = await db.execute(query_24h)
-        news_24h = result_24h.scalars().all()
-        
-        # Lấy tin 7 ngày qua
-        query_7d = select(News).where(
-            and_(
-                News.published_at >= week_ago,
-                News.published_at < day_ago
-            )
-        )
-        result_7d = await db.execute(query_7d)
-        news_7d = result_7d.scalars().all()
-        
-        # Count tags trong 24h
-        tags_24h = Counter()
-        for news in news_24h:
-            if news.tags:
-                tags_list = news.tags if isinstance(news.tags, list) else []
-                for tag in tags_list:
-                    tags_24h[tag.upper()] += 1
-        
-        # Count tags trong 7d (để tính avg daily)
-        tags_7d = Counter()
-        for news in news_7d:
-            if news.tags:
-                tags_list = news.tags if isinstance(news.tags, list) else []
-                for tag in tags_list:
-                    tags_7d[tag.upper()] += 1
+        # Đếm từ rollup theo giờ (mention_counts_hourly), không quét bảng news
+        tags_24h, tags_7d = await MentionCounter.window_counts(db, "tag", now)
         
         # Calculate velocity
         trending_tags = []
@@ -77,26 +98,20 @@ class TrendDetectionService:
                 velocity = (count_24h - avg_daily_7d) / avg_daily_7d
             
             if velocity >= TrendDetectionService.VELOCITY_THRESHOLD or avg_daily_7d == 0:
-                # Lấy sample news
-                sample_news = [
-                    {
-                        "id": n.id,
-                        "title": n.title,
-                        "sentiment_label": n.sentiment_label,
-                        "published_at": n.published_at.isoformat()
-                    }
-                    for n in news_24h
-                    if n.tags and tag in [t.upper() for t in (n.tags if isinstance(n.tags, list) else [])]
-                ][:3]  # Top 3 samples
-                
                 trending_tags.append({
                     "tag": tag,
                     "velocity": round(velocity, 2) if velocity != float('inf') else 999.0,
                     "count_24h": count_24h,
                     "avg_daily_7d": round(avg_daily_7d, 1),
-                    "sample_news": sample_news
+                    "sample_news": []
                 })
         
+        samples = await TrendDetectionService._collect_samples(
+            db, MENTION_COLUMNS["tag"], {item["tag"] for item in trending_tags}, now, with_published_at=True
+        )
+        for item in trending_tags:
+            item["sample_news"] = samples[item["tag"]]
+        
         # Sort by velocity DESC
         trending_tags.sort(key=lambda x: x["velocity"], reverse=True)
         
@@ -110,38 +125,7 @@ class TrendDetectionService:
         Phát hiện coins đang được mention nhiều (tương tự tags)
         """
         now = datetime.now(timezone.utc)
-        day_ago = now - timedelta(hours=24)
-        week_ago = now - timedelta(days=7)
-        
-        # Lấy tin 24h qua
-        query_24h = select(News).where(News.published_at >= day_ago)
-        result_24h = await db.execute(query_24h)
-        news_24h = result_24h.scalars().all()
-        
-        # Lấy tin 7 ngày qua
-        query_7d = select(News).where(
-            and_(
-                News.published_at >= week_ago,
-                News.published_at < day_ago
-            )
-        )
-        result_7d = await db.execute(query_7d)
-        news_7d = result_7d.scalars().all()
-        
-        # Count coins
-        coins_24h = Counter()
-        for news in news_24h:
-            if news.coins_mentioned:
-                coins_list = news.coins_mentioned if isinstance(news.coins_mentioned, list) else []
-                for coin in coins_list:
-                    coins_24h[coin.upper()] += 1
-        
-        coins_7d = Counter()
-        for news in news_7d:
-            if news.coins_mentioned:
-                coins_list = news.coins_mentioned if isinstance(news.coins_mentioned, list) else []
-                for coin in coins_list:
-                    coins_7d[coin.upper()] += 1
+        coins_24h, coins_7d = await MentionCounter.window_counts(db, "coin", now)
         
         # Calculate velocity
         trending_coins = []
@@ -158,25 +142,20 @@ class TrendDetectionService:
                 velocity = (count_24h - avg_daily_7d) / avg_daily_7d
             
             if velocity >= TrendDetectionService.VELOCITY_THRESHOLD or avg_daily_7d == 0:
-                # Sample news
-                sample_news = [
-                    {
-                        "id": n.id,
-                        "title": n.title,
-                        "sentiment_label": n.sentiment_label
-                    }
-                    for n in news_24h
-                    if n.coins_mentioned and coin in [c.upper() for c in (n.coins_mentioned if isinstance(n.coins_mentioned, list) else [])]
-                ][:3]
-                
                 trending_coins.append({
                     "coin": coin,
                     "velocity": round(velocity, 2) if velocity != 999.0 else 999.0,
                     "count_24h": count_24h,
                     "avg_daily_7d": round(avg_daily_7d, 1),
-                    "sample_news": sample_news
+                    "sample_news": []
                 })
         
+        samples = await TrendDetectionService._collect_samples(
+            db, MENTION_COLUMNS["coin"], {item["coin"] for item in trending_coins}, now, with_published_at=False
+        )
+        for item in trending_coins:
+            item["sample_news"] = samples[item["coin"]]
+        
         trending_coins.sort(key=lambda x: x["velocity"], reverse=True)
         
         log.info(f"Detected {len(trending_coins)} trending coins")
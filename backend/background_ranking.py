@@ -1,21 +1,48 @@
 """
 Background job: Update ranking scores
-Chạy mỗi 10 phút
+Chạy mỗi 10 phút. Chỉ áp time-decay lên base_score/vote_count đã lưu
+(vote mới và tin mới đã được tính điểm ngay khi ghi).
+Mỗi RANKING_COMPONENTS_REFRESH_MINUTES tính lại các thành phần từ sources + votes
+(trust_score / sentiment thay đổi, tin được ghi bởi đường khác ngoài crawler).
 """
 import asyncio
+import redis.asyncio as redis
 from app.db.session import AsyncSessionLocal
 from app.services.ranking import HotnessRanking
+from app.core.config import settings
 from app.core.logger import log
 
+TIME_WINDOW_HOURS = 72
+REFRESH_LOCK_KEY = "ranking:components_refreshed"
+
+async def components_due() -> bool:
+    """
+    Job được pm2 chạy lại liên tục: đánh dấu lần refresh trong Redis (SET NX + TTL),
+    chỉ một lần chạy trong mỗi chu kỳ được refresh. Redis lỗi -> refresh luôn.
+    """
+    client = redis.from_url(settings.REDIS_URL, encoding="utf-8", decode_responses=True)
+    try:
+        return bool(await client.set(
+            REFRESH_LOCK_KEY, "1", nx=True, ex=settings.RANKING_COMPONENTS_REFRESH_MINUTES * 60
+        ))
+    except Exception as e:
+        log.warning(f"Ranking refresh lock unavailable ({e}), refreshing components")
+        return True
+    finally:
+        await client.close()
+
 async def update_ranking_scores():
     """
-    Cập nhật ranking score cho tin trong 72h qua
+    Cập nhật ranking score (time-decay) cho tin trong 72h qua
     """
     async with AsyncSessionLocal() as db:
         log.info("Starting ranking score update job...")
         
         try:
-            count = await HotnessRanking.update_all_scores(db, time_window_hours=72)
+            if await components_due():
+                count = await HotnessRanking.refresh_components(db, time_window_hours=TIME_WINDOW_HOURS)
+            else:
+                count = await HotnessRanking.update_all_scores(db, time_window_hours=TIME_WINDOW_HOURS)
             log.info(f"Ranking update complete: {count} news items updated")
         except Exception as e:
             log.error(f"Ranking update failed: {e}")
@@ -8,6 +8,7 @@ from app.db.session import AsyncSessionLocal
 from app.models.news import News, VerificationStatus
 from app.services.truth_engine.orchestrator import TruthEngine
 from app.core.logger import log
+from app.core.network import close_session
 from datetime import datetime, timedelta
 
 async def verify_pending_news():
@@ -42,5 +43,11 @@ async def verify_pending_news():
         
         log.info("Background verification complete")
 
+async def run():
+    try:
+        await verify_pending_news()
+    finally:
+        await close_session()
+
 if __name__ == "__main__":
-    asyncio.run(verify_pending_news())
+    asyncio.run(run())
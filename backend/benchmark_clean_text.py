@@ -0,0 +1,70 @@
+"""
+Benchmark: ContentProcessor.clean_text (lxml streaming path) vs BeautifulSoup html.parser
+Corpus: fixtures/rss_summaries.json lặp lại cho đủ --size văn bản (thứ tự xáo trộn).
+Fixture cố tình nhiều markup lỗi; --well-formed chỉ dùng các fixture đi fast path (giống feed thực tế).
+
+Usage: python benchmark_clean_text.py [--size 20000] [--repeat 3] [--well-formed]
+"""
+import argparse
+import json
+import random
+import re
+import time
+import warnings
+
+from bs4 import XMLParsedAsHTMLWarning
+
+from app.services.content_processor import ContentProcessor
+
+FIXTURE_PATH = "fixtures/rss_summaries.json"
+
+
+def legacy_clean(html_content: str) -> str:
+    """Cách cũ: luôn dựng cây BeautifulSoup"""
+    if not html_content:
+        return ""
+    return re.sub(r'\s+', ' ', ContentProcessor._soup_text(html_content)).strip()
+
+
+def load_corpus(size: int, well_formed: bool, seed: int = 87) -> list:
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    if well_formed:
+        fixtures = [html_content for html_content in fixtures if html_content and ContentProcessor._fast_text(html_content) is not None]
+    rng = random.Random(seed)
+    return [rng.choice(fixtures) for _ in range(size)]
+
+
+def timed(label: str, fn, corpus: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html_content in corpus:
+            fn(html_content)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<14} {best:8.3f}s  ({len(corpus) / best:10.0f} docs/s)")
+    return best
+
+
+def main(size: int, repeat: int, well_formed: bool):
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+    corpus = load_corpus(size, well_formed)
+    chars = sum(len(html_content) for html_content in corpus)
+    print(f"corpus: {len(corpus)} docs, {chars / len(corpus):.0f} chars avg")
+
+    legacy_time = timed("beautifulsoup", legacy_clean, corpus, repeat)
+    fast_time = timed("clean_text", ContentProcessor.clean_text, corpus, repeat)
+    print(f"speedup: {legacy_time / fast_time:.1f}x")
+
+    fallbacks = sum(1 for html_content in corpus if html_content and ContentProcessor._fast_text(html_content) is None)
+    mismatches = sum(1 for html_content in corpus if legacy_clean(html_content) != ContentProcessor.clean_text(html_content))
+    print(f"fallback rate: {fallbacks / len(corpus):.1%}, results identical: {mismatches == 0} ({mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--well-formed", action="store_true", help="Bỏ các fixture cần BeautifulSoup fallback")
+    args = parser.parse_args()
+    main(args.size, args.repeat, args.well_formed)
@@ -0,0 +1,147 @@
+"""
+Benchmark: clustering theo signature của cluster vs vòng fuzz.token_set_ratio từng cặp
+Sinh cửa sổ tiêu đề giả lập, chạy cả 2 cách và đo mức độ trùng khớp kết quả gán cluster.
+
+Usage: python benchmark_clustering.py [--window 10000] [--unclustered 2000] [--skip-legacy] [--distinct]
+
+--distinct: trường hợp xấu nhất cho _assign_clusters - tin mới không lặp lại sự kiện có sẵn,
+gần như tin nào cũng tạo cluster mới (số cluster đổi trong lượt tăng theo số tin).
+"""
+import argparse
+import random
+import time
+import uuid
+from types import SimpleNamespace
+
+from thefuzz import fuzz
+
+from app.models import trading_signals, vote  # noqa: F401  (đăng ký đủ mapper cho ORM)
+from app.models.story_cluster import StoryCluster
+from app.services.clustering import NewsClusteringService
+
+COINS = ["Bitcoin", "Ethereum", "Solana", "XRP", "Cardano", "Dogecoin", "BNB", "Polygon"]
+FILLER = ["analysts say", "report", "as traders react", "amid market jitters", "sources", "update"]
+
+
+def make_title(rng: random.Random, vocab: list) -> str:
+    """Coin + vài từ ngẫu nhiên; ~1/4 tiêu đề là biến thể của một sự kiện đã có"""
+    title = f"{rng.choice(COINS)} {' '.join(rng.sample(vocab, rng.randint(5, 9)))}"
+    if rng.random() < 0.5:
+        title = f"{title} {rng.choice(FILLER)}"
+    return title
+
+
+def make_window(window: int, unclustered: int, seed: int = 87, repeat_ratio: float = 0.25):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(5000)]
+    news_id = 0
+    clusters = {}
+    for _ in range(window - unclustered):
+        news_id += 1
+        cluster_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        clusters[cluster_id] = [SimpleNamespace(id=news_id, title=make_title(rng, vocab), cluster_id=cluster_id)]
+    existing_titles = [items[0].title for items in clusters.values()]
+    pending = []
+    for _ in range(unclustered):
+        news_id += 1
+        if existing_titles and rng.random() < repeat_ratio:
+            title = f"{rng.choice(existing_titles)} {rng.choice(FILLER)}"
+        else:
+            title = make_title(rng, vocab)
+        pending.append(SimpleNamespace(id=news_id, title=title, cluster_id=None, is_cluster_lead=False))
+    return clusters, pending
+
+
+def legacy_assign(unclustered_news, clusters) -> int:
+    """Thuật toán cũ: so từng tin với từng thành viên của từng cluster"""
+    new_clusters = 0
+    for news in unclustered_news:
+        matched_cluster = None
+        for cluster_id, cluster_items in clusters.items():
+            for cluster_news in cluster_items:
+                similarity = fuzz.token_set_ratio(news.title.lower(), cluster_news.title.lower())
+                if similarity >= NewsClusteringService.SIMILARITY_THRESHOLD:
+                    matched_cluster = cluster_id
+                    break
+            if matched_cluster:
+                break
+        if matched_cluster:
+            news.cluster_id = matched_cluster
+            clusters[matched_cluster].append(news)
+        else:
+            new_cluster_id = str(uuid.uuid4())
+            news.cluster_id = new_cluster_id
+            news.is_cluster_lead = True
+            clusters[new_cluster_id] = [news]
+            new_clusters += 1
+    return new_clusters
+
+
+def to_signatures(clusters, pending):
+    """Đầu vào cho NewsClusteringService: StoryCluster (signature) + (id, title, published_at)"""
+    story_clusters = []
+    for cluster_id, items in clusters.items():
+        cluster = StoryCluster(id=cluster_id, token_counts={}, member_count=0)
+        for news in items:
+            NewsClusteringService._add_member(cluster, NewsClusteringService._title_tokens(news.title), None)
+        story_clusters.append(cluster)
+    return story_clusters, [(news.id, news.title, None) for news in pending]
+
+
+def partition(clusters) -> set:
+    """Phân hoạch theo news id (không phụ thuộc uuid ngẫu nhiên của cluster mới)"""
+    return {frozenset(news.id for news in items) for items in clusters.values()}
+
+
+def pending_partition(assignments: dict, pending_ids: set) -> set:
+    groups = {}
+    for news_id, cluster_id in assignments.items():
+        groups.setdefault(cluster_id, set()).add(news_id)
+    return {frozenset(ids & pending_ids) for ids in groups.values()}
+
+
+def main(window: int, unclustered: int, skip_legacy: bool, distinct: bool):
+    from app.core.logger import logger
+    logger.remove()  # bỏ log từng tin để đo chính xác
+
+    repeat_ratio = 0.0 if distinct else 0.25
+    clusters, pending = make_window(window, unclustered, repeat_ratio=repeat_ratio)
+    story_clusters, items = to_signatures(clusters, pending)
+    started = time.perf_counter()
+    assignments, created = NewsClusteringService._assign_clusters(items, story_clusters)
+    batch_time = time.perf_counter() - started
+    print(f"signature: {batch_time:8.2f}s  ({len(created)} new clusters, window={window}, unclustered={unclustered})")
+
+    if skip_legacy:
+        return
+
+    legacy_clusters, legacy_pending = make_window(window, unclustered, repeat_ratio=repeat_ratio)
+    started = time.perf_counter()
+    legacy_created = legacy_assign(legacy_pending, legacy_clusters)
+    legacy_time = time.perf_counter() - started
+    print(f"legacy:    {legacy_time:8.2f}s  ({legacy_created} new clusters)")
+    print(f"speedup: {legacy_time / batch_time:.1f}x")
+
+    # Quyết định của từng tin: cluster có sẵn nào, hay cluster mới tạo trong lượt này
+    def decision(cluster_id):
+        return cluster_id if cluster_id in clusters else "new"
+
+    pending_ids = {news.id for news in pending}
+    legacy_groups = {frozenset(ids & pending_ids) for ids in partition(legacy_clusters)} - {frozenset()}
+    agree = sum(
+        1 for news in legacy_pending
+        if decision(assignments[news.id]) == decision(news.cluster_id)
+    )
+    identical = pending_partition(assignments, pending_ids) == legacy_groups
+    print(f"same decision as legacy: {agree}/{len(legacy_pending)}  (partition identical: {identical})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--window", type=int, default=10000)
+    parser.add_argument("--unclustered", type=int, default=2000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--distinct", action="store_true")
+    args = parser.parse_args()
+    main(args.window, args.unclustered, args.skip_legacy, args.distinct)
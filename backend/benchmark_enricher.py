@@ -0,0 +1,95 @@
+"""
+Benchmark: ContentEnricher.enrich_news (một lượt bare_extraction) vs extract() + bare_extraction()
+Corpus: trang bài viết giả lập (nav, sidebar, article, footer, og:image) hoặc các file .html trong --html-dir.
+Kiểm tra full text và ảnh giống nhau giữa hai cách.
+
+Usage: python benchmark_enricher.py [--pages 200] [--html-dir DIR] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import time
+
+import trafilatura
+
+from app.services.enricher import ContentEnricher
+
+WORDS = ("bitcoin ethereum market traders liquidity exchange etf inflows analysts price support "
+         "resistance rally volume network upgrade validators fees stablecoin regulators").split()
+
+
+def make_page(rng: random.Random, i: int) -> str:
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 25))).capitalize() + "."
+
+    paragraphs = "".join(f"<p>{' '.join(sentence() for _ in range(rng.randint(3, 6)))}</p>" for _ in range(rng.randint(6, 20)))
+    links = "".join(f'<li><a href="/news/{rng.randint(1, 9999)}">{sentence()}</a></li>' for _ in range(15))
+    return f"""<!DOCTYPE html><html><head><title>Story {i} | Example News</title>
+<meta property="og:title" content="Story {i}"><meta property="og:image" content="https://cdn.example.com/{i}.jpg">
+<meta name="author" content="Reporter {i % 7}"><meta property="article:published_time" content="2025-01-{i % 28 + 1:02d}T10:00:00Z">
+<script>window.dataLayer=[];</script><style>body{{margin:0}}</style></head><body>
+<header><nav><ul>{links}</ul></nav></header>
+<main><article><h1>Story {i}</h1>{paragraphs}</article>
+<aside><h3>Related</h3><ul>{links}</ul></aside></main>
+<footer><p>© Example News. All rights reserved.</p></footer></body></html>"""
+
+
+def load_pages(pages: int, html_dir: str) -> list:
+    if html_dir:
+        names = sorted(name for name in os.listdir(html_dir) if name.endswith(".html"))
+        result = []
+        for name in names[:pages]:
+            with open(os.path.join(html_dir, name), encoding="utf-8", errors="replace") as f:
+                result.append((f"https://example.com/{name}", f.read()))
+        return result
+    rng = random.Random(87)
+    return [(f"https://example.com/news/{i}", make_page(rng, i)) for i in range(pages)]
+
+
+def legacy_enrich(url: str, html: str) -> dict:
+    """Cách cũ: parse 2 lần (extract cho text, bare_extraction cho ảnh)"""
+    full_text = trafilatura.extract(html, url=url, include_comments=False, include_tables=False)
+    metadata = trafilatura.bare_extraction(html, url=url, with_metadata=True)
+    return {"full_text": full_text, "image_url": metadata.image if metadata else None}
+
+
+def timed(label: str, fn, pages: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for url, html in pages:
+            fn(url, html)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<8} {best:8.3f}s  ({len(pages) / best:8.1f} pages/s)")
+    return best
+
+
+def main(pages: int, html_dir: str, repeat: int):
+    from app.core.logger import logger
+    logger.remove()
+
+    corpus = load_pages(pages, html_dir)
+    if not corpus:
+        print("❌ Không có trang nào")
+        return
+    print(f"corpus: {len(corpus)} pages, {sum(len(html) for _, html in corpus) / len(corpus):.0f} chars avg")
+
+    legacy_time = timed("legacy", legacy_enrich, corpus, repeat)
+    single_time = timed("single", ContentEnricher.enrich_news, corpus, repeat)
+    print(f"speedup: {legacy_time / single_time:.2f}x")
+
+    mismatches = 0
+    for url, html in corpus:
+        old, new = legacy_enrich(url, html), ContentEnricher.enrich_news(url, html)
+        if old["full_text"] != new.get("full_text") or old["image_url"] != new.get("image_url"):
+            mismatches += 1
+    print(f"text + image identical: {mismatches == 0} ({mismatches} mismatches)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--html-dir", default=None, help="Thư mục chứa trang .html đã tải")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.pages, args.html_dir, args.repeat)
@@ -0,0 +1,70 @@
+"""
+Benchmark: pooled NetworkClient vs new ClientSession per request
+Chạy stub HTTP server local, đo requests/second cho cả 2 cách.
+
+Usage: python benchmark_network.py [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from app.core.network import NetworkClient, close_session
+
+BODY = "<rss><channel><item><title>stub</title></item></channel></rss>" * 20
+
+
+async def start_stub_server() -> tuple[web.AppRunner, str]:
+    async def handler(request):
+        return web.Response(text=BODY, content_type="application/rss+xml")
+
+    app = web.Application()
+    app.router.add_get("/feed", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/feed"
+
+
+async def fetch_new_session(url: str) -> str:
+    """Cách cũ: mỗi request mở một ClientSession mới (không keep-alive)"""
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15)) as session:
+        async with session.get(url) as response:
+            return await response.text()
+
+
+async def run(label: str, fetch, url: str, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await fetch(url)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[one() for _ in range(total)])
+    elapsed = time.perf_counter() - started
+    ok = sum(1 for r in results if r)
+    print(f"{label:<24} {ok}/{total} ok  {elapsed:6.2f}s  {total / elapsed:8.1f} req/s")
+
+
+async def main(total: int, concurrency: int):
+    runner, url = await start_stub_server()
+    try:
+        await run("new session / request", fetch_new_session, url, total, concurrency)
+        client = NetworkClient()
+        await run("pooled NetworkClient", client.fetch, url, total, concurrency)
+    finally:
+        await close_session()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
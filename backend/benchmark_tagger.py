@@ -0,0 +1,135 @@
+"""
+Benchmark: KeywordTagger (một matcher build sẵn) vs vòng re.search từng keyword
+Corpus: title + raw_content của các tin đã lưu (hoặc --synthetic N khi không có DB).
+Kiểm tra cả hai cách cho cùng tập coin/topic/relevance trên từng văn bản.
+--scale N: thêm N coin giả (ticker + tên) vào taxonomy để đo chi phí matcher khi từ điển lớn.
+
+Usage: python benchmark_tagger.py [--limit 5000] [--synthetic 0] [--repeat 3] [--scale 10000]
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+
+from sqlalchemy import select
+
+from app.core.taxonomy import COIN_KEYWORDS, TOPIC_KEYWORDS, GENERAL_KEYWORDS, DEFAULT_TAXONOMY, Taxonomy
+from app.services.tagger import KeywordTagger, compile_taxonomy
+
+
+def legacy_tag(text: str):
+    """Cách cũ: extract_tags + is_relevant, mỗi keyword một re.search"""
+    text_lower = text.lower()
+    coins = set()
+    topics = set()
+    for coin, keywords in COIN_KEYWORDS.items():
+        for kw in keywords:
+            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
+                coins.add(coin)
+                break
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        for kw in keywords:
+            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
+                topics.add(topic)
+                break
+    relevant = bool(coins or topics)
+    if not relevant:
+        # is_relevant() gọi lại extract_tags rồi mới thử general terms
+        for coin, keywords in COIN_KEYWORDS.items():
+            for kw in keywords:
+                re.search(r'\b' + re.escape(kw) + r'\b', text_lower)
+        for topic, keywords in TOPIC_KEYWORDS.items():
+            for kw in keywords:
+                re.search(r'\b' + re.escape(kw) + r'\b', text_lower)
+        relevant = any(re.search(r'\b' + re.escape(term) + r'\b', text_lower) for term in GENERAL_KEYWORDS)
+    return coins, topics, relevant
+
+
+def matcher_tag(text: str):
+    found = KeywordTagger._compiled.matcher.match(text)
+    coins = {label for kind, label in found if kind == "coin"}
+    topics = {label for kind, label in found if kind == "topic"}
+    return coins, topics, bool(found)
+
+
+async def load_corpus(limit: int) -> list:
+    from app.db.session import AsyncSessionLocal
+    from app.models.news import News
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(News.title, News.raw_content).order_by(News.id.desc()).limit(limit)
+        )
+        return [f"{title} {raw_content or ''}" for title, raw_content in result.all()]
+
+
+def synthetic_corpus(size: int, seed: int = 87) -> list:
+    rng = random.Random(seed)
+    keywords = [kw for group in (COIN_KEYWORDS, TOPIC_KEYWORDS) for kws in group.values() for kw in kws]
+    keywords += GENERAL_KEYWORDS
+    filler = ("the market said on monday that absolute solutions dotted across exchanges, "
+              "e.g. ethereal tokens, sec-filings and secure wallets remain in focus").split()
+    corpus = []
+    for _ in range(size):
+        words = [rng.choice(filler) for _ in range(rng.randint(80, 400))]
+        for _ in range(rng.randint(0, 6)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords).upper() if rng.random() < 0.3 else rng.choice(keywords))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def scaled_taxonomy(extra_coins: int, seed: int = 87) -> Taxonomy:
+    """Taxonomy mặc định + extra_coins coin giả, mỗi coin một ticker và một tên hai từ"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    coins = dict(DEFAULT_TAXONOMY.coins)
+    while len(coins) < len(DEFAULT_TAXONOMY.coins) + extra_coins:
+        ticker = "".join(rng.choices(letters, k=rng.randint(3, 5)))
+        name = "".join(rng.choices(letters, k=rng.randint(5, 9)))
+        coins.setdefault(ticker.upper(), [ticker, f"{name} coin"])
+    return Taxonomy(coins, DEFAULT_TAXONOMY.topics, DEFAULT_TAXONOMY.general)
+
+
+def timed(label: str, fn, corpus: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<10} {best:8.3f}s  ({len(corpus) / best:10.0f} texts/s)")
+    return best
+
+
+def main(limit: int, synthetic: int, repeat: int, scale: int):
+    corpus = synthetic_corpus(synthetic) if synthetic else asyncio.run(load_corpus(limit))
+    if not corpus:
+        print("❌ Corpus rỗng")
+        return
+    chars = sum(len(text) for text in corpus)
+    print(f"corpus: {len(corpus)} texts, {chars / len(corpus):.0f} chars avg, {KeywordTagger._compiled.matcher.size} keywords")
+
+    legacy_time = timed("legacy", legacy_tag, corpus, repeat)
+    matcher_time = timed("matcher", KeywordTagger.tag, corpus, repeat)
+    print(f"speedup: {legacy_time / matcher_time:.1f}x")
+
+    mismatches = sum(1 for text in corpus if legacy_tag(text) != matcher_tag(text))
+    print(f"results identical: {mismatches == 0} ({mismatches} mismatches)")
+
+    if scale:
+        # Chi phí match gần như không đổi theo kích thước từ điển
+        scaled = compile_taxonomy(scaled_taxonomy(scale))
+        print(f"scaled taxonomy: {scaled.matcher.size} keywords")
+        scaled_time = timed("scaled", scaled.matcher.match, corpus, repeat)
+        print(f"scaled / default matcher: {scaled_time / matcher_time:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=5000, help="Số tin lấy từ DB")
+    parser.add_argument("--synthetic", type=int, default=0, help="Dùng N văn bản giả lập thay vì DB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=0, help="Đo thêm matcher với N coin giả")
+    args = parser.parse_args()
+    main(args.limit, args.synthetic, args.repeat, args.scale)
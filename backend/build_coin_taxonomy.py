@@ -0,0 +1,88 @@
+"""
+Build taxonomy file (settings.TAXONOMY_FILE) với coin universe từ CoinGecko /coins/markets
+Giữ nguyên coin/alias built-in, thêm top N coin theo market cap (tên + ticker).
+Tagger của các process đang chạy tự nạp lại khi file đổi (không cần redeploy).
+
+Usage: python build_coin_taxonomy.py [--top 2000] [--output taxonomy.json]
+"""
+import argparse
+import asyncio
+import re
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.network import get_session, close_session
+from app.core.taxonomy import DEFAULT_TAXONOMY, Taxonomy, save_taxonomy
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+PAGE_SIZE = 250
+TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# Ticker / tên trùng từ tiếng Anh thông dụng -> match nhầm rất nhiều, bỏ qua
+AMBIGUOUS_TERMS = {
+    "the", "one", "near", "ton", "gas", "sun", "pay", "key", "max", "win", "hot", "ape", "fun", "ant",
+    "bit", "cat", "dog", "just", "high", "safe", "edge", "mask", "ray", "hero", "meme", "real",
+    "open", "live", "time", "well", "bone", "dash", "gold", "band", "core", "flow", "sand", "rose",
+    "link", "ocean", "wave", "atom", "beam", "cake", "frax", "trust", "degen", "moon", "star",
+    "good", "next", "life", "book", "game", "magic", "blur", "jet", "ark", "act", "fet", "chr",
+    "usd", "eur", "new", "now", "all", "any", "for", "can", "get", "big", "top", "web", "app",
+}
+MIN_TERM_LENGTH = 3
+
+
+def _usable(term: str) -> bool:
+    term = term.strip().lower()
+    return len(term) >= MIN_TERM_LENGTH and term not in AMBIGUOUS_TERMS and bool(re.search(r"[a-z]", term))
+
+
+async def fetch_markets(top: int) -> list:
+    """Top coin theo market cap (mỗi trang 250)"""
+    session = await get_session()
+    coins = []
+    page = 1
+    while len(coins) < top:
+        async with session.get(
+            COINGECKO_MARKETS_URL,
+            params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": PAGE_SIZE, "page": page},
+            timeout=TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            batch = await response.json()
+        if not batch:
+            break
+        coins.extend(batch)
+        page += 1
+        await asyncio.sleep(2)  # Free tier rate limit
+    return coins[:top]
+
+
+def build_taxonomy(markets: list) -> Taxonomy:
+    coins = {coin: list(keywords) for coin, keywords in DEFAULT_TAXONOMY.coins.items()}
+    for market in markets:
+        symbol = (market.get("symbol") or "").upper()
+        if not symbol or symbol in coins:
+            continue  # Ticker trùng: giữ coin market cap cao hơn (đến trước)
+        keywords = [term.lower() for term in (market.get("name"), symbol) if term and _usable(term)]
+        if keywords:
+            coins[symbol] = list(dict.fromkeys(keywords))
+    return Taxonomy(coins, DEFAULT_TAXONOMY.topics, DEFAULT_TAXONOMY.general)
+
+
+async def main(top: int, output: str):
+    try:
+        markets = await fetch_markets(top)
+    finally:
+        await close_session()
+    taxonomy = build_taxonomy(markets)
+    save_taxonomy(taxonomy, output)
+    keywords = sum(len(kws) for kws in taxonomy.coins.values())
+    print(f"✅ {len(taxonomy.coins)} coins ({keywords} keywords) -> {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=2000, help="Số coin theo market cap")
+    parser.add_argument("--output", default=settings.TAXONOMY_FILE)
+    args = parser.parse_args()
+    asyncio.run(main(args.top, args.output))
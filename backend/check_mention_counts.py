@@ -0,0 +1,33 @@
+"""
+Consistency check: mention_counts_hourly vs đếm lại từ bảng news
+Usage: python check_mention_counts.py [--days 7] [--repair]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.db.session import AsyncSessionLocal
+from app.services.mention_counter import MentionCounter
+
+async def check_mention_counts(days: int, repair: bool):
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    async with AsyncSessionLocal() as db:
+        mismatches = await MentionCounter.check_consistency(db, since)
+        
+        if not mismatches:
+            print(f"✅ Counters khớp bảng news ({days} ngày)")
+            return
+        
+        print(f"❌ {len(mismatches)} bucket lệch:")
+        for item in mismatches[:50]:
+            print(f"   {item['bucket_start']} {item['kind']}:{item['key']} stored={item['stored']} actual={item['actual']}")
+        
+        if repair:
+            buckets = await MentionCounter.rebuild(db, since)
+            print(f"🔧 Rebuilt {buckets} buckets")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repair", action="store_true", help="Dựng lại các bucket từ bảng news nếu lệch")
+    args = parser.parse_args()
+    asyncio.run(check_mention_counts(args.days, args.repair))
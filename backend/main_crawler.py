@@ -3,13 +3,228 @@ from sqlalchemy import select
 from app.db.session import AsyncSessionLocal
 from app.models.source import Source
 from app.models.news import News
-from app.crawlers.factory import CrawlerFactory
-from app.services.deduplicator import DuplicateChecker
+from app.crawlers.scheduler import CrawlScheduler
+from app.services.deduplicator import DuplicateChecker, UrlDeduplicator
 from app.services.tagger import KeywordTagger
-from app.services.enricher import ContentEnricher
+from app.services.enrichment_queue import EnrichmentQueue, enrichment_queue
 from app.services.llm_client import GeminiClient
-from app.models.news import VerificationStatus, CategoryType
+from app.services.analysis_cache import analysis_cache
+from app.services.analysis_sharing import ClusterAnalysisSharing
+from app.services.llm_dispatcher import LLMDispatcher, llm_dispatcher
+from app.services.preclassifier import PreClassifier
+from app.services.cost_guard import cost_guard
+from app.services.ranking import HotnessRanking
+from app.services.mention_counter import MentionCounter
+from app.models.news import VerificationStatus
+from app.core.config import settings
 from app.core.logger import log
+from app.core.network import close_session
+from app.core.workers import cpu_pool
+
+async def process_source(db, source: Source, items: list, llm_client: GeminiClient, remembered: list) -> int:
+    """
+    Dedup -> Tag -> AI -> Save cho các item đã fetch của một nguồn, rồi đưa tin content ngắn vào enrichment queue.
+    remembered: nhận các tiêu đề đã thêm vào DuplicateChecker (caller forget khi batch lỗi).
+    Returns số item mới đã lưu.
+    """
+    # 4. Check Duplicates (by URL): LRU + one IN query for the whole batch
+    items = await UrlDeduplicator.filter_new(items, db)
+
+    candidates = []
+    for item in items:
+        # 5. Fuzzy Check
+        if await DuplicateChecker.is_duplicate(item["title"], db):
+            continue
+        
+        # 6. Tagger & Noise Filter (Task 1.6): một lượt quét cho cả relevance + tags
+        full_text = f"{item['title']} {item['raw_content']}"
+        tagging = KeywordTagger.tag(full_text)
+        if not tagging.is_relevant:
+            # log.info(f"Skipped irrelevent: {item['title']}")
+            continue
+
+        # Nhớ ngay để bản sao trong cùng lô không được phân tích lần nữa
+        DuplicateChecker.remember(item["title"], item["published_at"])
+        remembered.append(item["title"])
+        candidates.append((item, tagging))
+
+    # 7. Enricher (Task 1.10): content ngắn được lưu ngay rồi enrich nền (enrichment_queue)
+
+    # 8a. Tin cùng sự kiện với cluster lead đã phân tích -> kế thừa phân tích (Task 5.6b)
+    shared = [None] * len(candidates)
+    if settings.LLM_SHARE_CLUSTER_ANALYSIS:
+        shared = await ClusterAnalysisSharing.match(
+            db, [(item["title"], tagging.coins) for item, tagging in candidates]
+        )
+
+    # 8b. Pre-classifier cục bộ (Task 2.3d): tin chắc chắn không liên quan -> không gọi LLM,
+    #     nghi ngờ -> lane thấp, market_move -> lane ưu tiên
+    unshared = [index for index, inherited in enumerate(shared) if inherited is None]
+    predictions = dict(zip(unshared, PreClassifier.classify(
+        [(candidates[index][0]["title"], candidates[index][0]["raw_content"]) for index in unshared]
+    )))
+    priorities = {}
+    rejected = []  # Dòng rejected_news (nhãn âm + URL không xử lý lại ở cycle sau)
+    for index in unshared:
+        item, tagging = candidates[index]
+        priority = PreClassifier.route(predictions[index], LLMDispatcher.priority_for(item["title"], tagging.topic))
+        if priority is not None:
+            priorities[index] = priority
+            continue
+        log.info(f"Pre-classifier skipped ({predictions[index].relevance:.3f}): {item['title']}")
+        rejected.append({
+            "source_id": source.id, "title": item["title"], "url": item["url"], "raw_content": item["raw_content"],
+            "reason": "classifier", "relevance_score": predictions[index].relevance
+        })
+        DuplicateChecker.forget([item["title"]])
+
+    # 8c. AI Analysis (Task 2.3): nhiều bài mỗi request (batch), bài lỗi được gọi lại riêng.
+    #     Request chạy song song qua llm_dispatcher (quota RPM/TPM), tin breaking được ưu tiên.
+    #     Tin content ngắn (chỉ có tóm tắt RSS) được phân tích sau khi enrichment_queue lấy được full text
+    pending = [index for index in priorities if not EnrichmentQueue.needs_enrichment(candidates[index][0]["raw_content"])]
+    if priorities:
+        log.info(
+            f"Analyzing {len(pending)} items with AI ({len(candidates) - len(unshared)} shared from clusters, "
+            f"{len(unshared) - len(priorities)} skipped by pre-classifier, "
+            f"{len(priorities) - len(pending)} deferred until enriched)..."
+        )
+    analyses = [None] * len(candidates)
+    results = await llm_client.analyze_batch([
+        {
+            "title": candidates[index][0]["title"],
+            "content": candidates[index][0]["raw_content"],
+            "source": source.name,
+            "priority": priorities[index]
+        }
+        for index in pending
+    ])
+    for index, analysis in zip(pending, results):
+        analyses[index] = analysis
+
+    saved = []
+    to_enrich = []  # (news, analysis job nếu chờ full text mới phân tích)
+    for index, ((item, tagging), inherited, analysis) in enumerate(zip(candidates, shared, analyses)):
+        if inherited is None and index not in priorities:
+            continue  # Pre-classifier đã loại
+        tags, topic = tagging.coins, tagging.topic
+        final_content = item["raw_content"]
+        ai_data = {}
+        analysis_job = None
+
+        if inherited:
+            ai_data = dict(inherited, analysis_source="cluster")
+        elif EnrichmentQueue.needs_enrichment(final_content):
+            prediction = predictions.get(index)
+            analysis_job = EnrichmentQueue.analysis_job(
+                source, item["title"], item["published_at"], final_content, tags, priorities[index],
+                prediction.relevance if prediction else None
+            )
+        elif analysis:
+            if analysis.get("is_relevant") is False:
+                log.info(f"AI marked as Irrelevant: {item['title']}")
+                DuplicateChecker.forget([item["title"]])
+                # Nhãn âm cho pre-classifier
+                prediction = predictions.get(index)
+                rejected.append({
+                    "source_id": source.id, "title": item["title"], "url": item["url"], "raw_content": item["raw_content"],
+                    "reason": "ai", "relevance_score": prediction.relevance if prediction else None
+                })
+                continue # Skip saving if AI says irrelevant
+
+            # Phase 5: category từ AI (Task 5.2) được map trong news_fields
+            ai_data = GeminiClient.news_fields(analysis)
+            ClusterAnalysisSharing.remember(item["title"], ai_data, tags)
+        else:
+            verification_status=VerificationStatus.PENDING,  # Phase 5
+            log.warning(f"AI Analysis failed for {item['title']}")
+        
+        # 9. Save to DB (ranking components tính sẵn, job ranking chỉ còn áp time-decay)
+        base_score = HotnessRanking.calculate_base_score(source.trust_score, ai_data.get("sentiment_score"))
+        news = News(
+            source_id=source.id,
+            title=item["title"],
+            url=item["url"],
+            raw_content=final_content,
+            feed_summary=final_content,
+            published_at=item["published_at"],
+            tags=tags, # Still keep rule-based tags as backup
+            topic_category=topic,
+            image_url=None,
+            is_full_content=False,
+            base_score=base_score,
+            vote_count=0,
+            ranking_score=HotnessRanking.score_from_components(base_score, 0, item["published_at"]),
+            **ai_data
+        )
+        db.add(news)
+        saved.append(news)
+        if EnrichmentQueue.needs_enrichment(final_content):
+            to_enrich.append((news, analysis_job))
+    
+    # Hourly tag/coin counters cho Trend Detection (cùng transaction với News)
+    await MentionCounter.record(db, saved)
+    await PreClassifier.record_rejected(db, rejected)
+    await db.commit()
+
+    # Full article fetch/extract chạy nền, không tính vào thời gian ingest
+    for news, analysis_job in to_enrich:
+        await enrichment_queue.submit(news.id, news.url, analysis_job)
+    return len(saved)
+
+async def record_failure(db, source: Source, error: Exception):
+    """Task 1.9: Circuit Breaker"""
+    source.consecutive_failures += 1
+    source.last_error_log = str(error)
+    if source.consecutive_failures >= 5:
+        source.is_active = False
+        log.error(f"Source {source.name} disabled due to too many failures.")
+    db.add(source)
+    await db.commit()
+
+async def process_crawl(crawl, llm_client: GeminiClient, slots: asyncio.Semaphore):
+    """
+    Xử lý kết quả fetch của một nguồn trong DB session riêng: nhiều nguồn chạy song song
+    (tối đa CRAWL_PROCESS_CONCURRENCY) nên llm_dispatcher thấy backlog của mọi nguồn cùng lúc.
+    """
+    async with slots, AsyncSessionLocal() as db:
+        source = await db.get(Source, crawl.source.id)
+        log.info(f"Processing Source: {source.name} ({source.source_type})")
+
+        if not crawl.ok:
+            log.error(f"Error processing {source.name}: {crawl.error}")
+            await record_failure(db, source, crawl.error)
+            return
+
+        remembered = []
+        try:
+            log.info(f"Fetched {len(crawl.items)} items from {source.name} in {crawl.elapsed:.2f}s")
+            
+            # Reset failure count on success (Task 1.9)
+            if source.consecutive_failures > 0:
+                source.consecutive_failures = 0
+                db.add(source)
+                await db.commit()
+
+            # Feed validators are committed together with the items (rolled back on failure,
+            # so an unsaved batch is re-fetched next cycle instead of being skipped as unchanged)
+            if crawl.feed_cache:
+                source.feed_etag = crawl.feed_cache.get("etag")
+                source.feed_last_modified = crawl.feed_cache.get("last_modified")
+                source.feed_content_hash = crawl.feed_cache.get("content_hash")
+                db.add(source)
+
+            new_count = await process_source(db, source, crawl.items, llm_client, remembered)
+            log.info(f"Saved {new_count} new items from {source.name}.")
+
+        except Exception as e:
+            log.error(f"Error processing {source.name}: {e}")
+            await db.rollback()
+            UrlDeduplicator.forget(item["url"] for item in crawl.items)
+            # Chỉ tiêu đề của batch này (không xoá tiêu đề đã nạp từ DB)
+            DuplicateChecker.forget(remembered)
+            # rollback expire source -> nạp lại trước khi ghi failure
+            await db.refresh(source)
+            await record_failure(db, source, e)
 
 async def main():
     log.info("Starting Main Crawler...")
@@ -26,128 +241,34 @@ async def main():
             log.warning("No active sources found.")
             return
 
-        for source in sources:
-            log.info(f"Processing Source: {source.name} ({source.source_type})")
-            
-            try:
-                # 2. Instantiate Crawler
-                crawler = CrawlerFactory.get_crawler(source.source_type, source.config)
-                
-                # 3. Fetch Data
-                items = await crawler.fetch_data()
-                log.info(f"Fetched {len(items)} items from {source.name}")
-                
-                # Reset failure count on success (Task 1.9)
-                if source.consecutive_failures > 0:
-                    source.consecutive_failures = 0
-                    db.add(source)
-                    await db.commit()
-
-                new_count = 0
-                for item in items:
-                    # 4. Check Duplicates (by URL)
-                    existing = await db.execute(select(News).where(News.url == item["url"]))
-                    if existing.scalars().first():
-                        continue 
-
-                    # 5. Fuzzy Check
-                    if await DuplicateChecker.is_duplicate(item["title"], db):
-                        continue
-                    
-                    # 6. Tagger & Noise Filter (Task 1.6)
-                    full_text = f"{item['title']} {item['raw_content']}"
-                    if not KeywordTagger.is_relevant(full_text):
-                        # log.info(f"Skipped irrelevent: {item['title']}")
-                        continue
-                    
-                    tags, topic = KeywordTagger.extract_tags(full_text)
-
-                    # 7. Enricher (Task 1.10)
-                    # Use full text extraction if content is short
-                    final_content = item["raw_content"]
-                    image_url = None
-                    is_full = False
-
-                    if len(final_content) < 500:
-                        # log.info(f"Enriching short content: {item['title']}")
-                        enriched = ContentEnricher.enrich_news(item["url"])
-                        if enriched.get("full_text"):
-                            final_content = enriched["full_text"]
-                            is_full = True
-                        if enriched.get("image_url"):
-                            image_url = enriched["image_url"]
-
-                    # 8. AI Analysis (Task 2.3)
-                    ai_data = {}
-                    # Only analyze if we have content and it passes basic relevance
-                    # We can use the 'tags' from Task 1.6 as a pre-filter if needed, 
-                    # but let's let AI decide "is_relevant" too as per prompt.
-                    # However, to save cost/latency, we might skip if it's very short and not enriched.
-                    
-                    log.info(f"Analyzing with AI: {item['title']}...")
-                    analysis = await llm_client.analyze_content(item["title"], final_content, source.name)
-                    
-                    if analysis:
-                        if analysis.get("is_relevant") is False:
-                            log.info(f"AI marked as Irrelevant: {item['title']}")
-                            continue # Skip saving if AI says irrelevant
-
-                        ai_data = {
-                            "summary_vi": analysis.get("summary_vi"),
-                            "summary_en": analysis.get("summary_en"),
-                            "sentiment_score": analysis.get("sentiment_score"),
-                            "sentiment_label": analysis.get("sentiment_label"),
-                            "coins_mentioned": analysis.get("coins_mentioned", []),
-                            "key_events": analysis.get("key_events", []),
-                            "risk_level": analysis.get("risk_level"),
-                            "action_recommendation": analysis.get("action_recommendation")
-                        }
-                        
-                        # Phase 5: Map category from AI (Task 5.2)
-                        category_map = {
-                            "market_move": CategoryType.MARKET_MOVE,
-                            "project_update": CategoryType.PROJECT_UPDATE,
-                            "partnership": CategoryType.PARTNERSHIP,
-                            "security": CategoryType.SECURITY,
-                            "opinion": CategoryType.OPINION
-                        }
-                        ai_data["category_type"] = category_map.get(
-                            analysis.get("category", "opinion"),
-                            CategoryType.OPINION
-                        )
-                    else:
-                        verification_status=VerificationStatus.PENDING,  # Phase 5
-                        log.warning(f"AI Analysis failed for {item['title']}")
-                    
-                    # 9. Save to DB
-                    news = News(
-                        source_id=source.id,
-                        title=item["title"],
-                        url=item["url"],
-                        raw_content=final_content,
-                        published_at=item["published_at"],
-                        tags=tags, # Still keep rule-based tags as backup
-                        topic_category=topic,
-                        image_url=image_url,
-                        is_full_content=is_full,
-                        **ai_data
-                    )
-                    db.add(news)
-                    new_count += 1
-                
-                await db.commit()
-                log.info(f"Saved {new_count} new items.")
-
-            except Exception as e:
-                log.error(f"Error processing {source.name}: {e}")
-                # Task 1.9: Circuit Breaker
-                source.consecutive_failures += 1
-                source.last_error_log = str(e)
-                if source.consecutive_failures >= 5:
-                    source.is_active = False
-                    log.error(f"Source {source.name} disabled due to too many failures.")
-                db.add(source)
-                await db.commit()
+        # Tin lần chạy trước chưa kịp enrich
+        requeued = await enrichment_queue.requeue_pending(db)
+        if requeued:
+            log.info(f"Requeued {requeued} news for enrichment")
+
+    # 2-3. Fetch all sources concurrently; each result is processed as soon as it arrives,
+    #      several sources at a time (their LLM batches share the dispatcher queue)
+    scheduler = CrawlScheduler()
+    slots = asyncio.Semaphore(settings.CRAWL_PROCESS_CONCURRENCY)
+    tasks = []
+    async for crawl in scheduler.stream(sources):
+        tasks.append(asyncio.create_task(process_crawl(crawl, llm_client, slots)))
+
+    for outcome in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            log.error(f"Processing task failed: {outcome}")
+
+async def run():
+    try:
+        await main()
+        await enrichment_queue.close()
+        log.info(f"AI analysis cache: {analysis_cache.stats()}, shared from clusters: {ClusterAnalysisSharing.shared}")
+    finally:
+        await close_session()
+        await cpu_pool.close()
+        await analysis_cache.close()
+        await llm_dispatcher.close()
+        await cost_guard.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
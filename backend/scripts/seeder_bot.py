@@ -7,6 +7,7 @@ from app.db.session import AsyncSessionLocal
 from app.models.news import News
 from app.models.user import User
 from app.models.vote import Vote, VoteOrigin
+from app.services.ranking import HotnessRanking
 
 # Configuration
 BOT_NAMES = [
@@ -135,6 +136,7 @@ class SeederBot:
                         origin=VoteOrigin.SYSTEM_BOT  # CRITICAL: Mark as bot
                     )
                     db.add(vote)
+                    await HotnessRanking.apply_vote(db, news.id)
                     votes_added += 1
                     
                     # Random delay simulation
@@ -0,0 +1,62 @@
+"""
+Test ClusterAnalysisSharing.match (không cần DB: chỉ so với các tin vừa phân tích qua remember())
+- Tiêu đề gần giống lead, cùng hướng, coin nằm trong coin của lead -> kế thừa
+- Từ chỉ hướng ngược lead (hoặc có phủ định) -> không kế thừa
+- Nhắc tới coin lead không có -> không kế thừa
+"""
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from app.services.analysis_sharing import ClusterAnalysisSharing
+
+LEAD_TITLE = "Bitcoin surges above $70,000 as ETF inflows hit record"
+LEAD_ANALYSIS = {"sentiment_label": "Bullish", "sentiment_score": 0.8, "coins_mentioned": ["BTC"]}
+
+
+def match(items):
+    state = (ClusterAnalysisSharing._cluster_leads, ClusterAnalysisSharing._recent, ClusterAnalysisSharing._loaded_at)
+    # Đã "nạp" lead (rỗng) -> match không truy vấn DB
+    ClusterAnalysisSharing._cluster_leads = []
+    ClusterAnalysisSharing._recent = []
+    ClusterAnalysisSharing._loaded_at = datetime.now(timezone.utc)
+    try:
+        ClusterAnalysisSharing.remember(LEAD_TITLE, LEAD_ANALYSIS, ["BTC"])
+        return asyncio.run(ClusterAnalysisSharing.match(None, items))
+    finally:
+        (
+            ClusterAnalysisSharing._cluster_leads,
+            ClusterAnalysisSharing._recent,
+            ClusterAnalysisSharing._loaded_at
+        ) = state
+
+
+def test_same_story_inherits():
+    [result] = match([("Bitcoin surges above $70,000 as ETF inflows hit a record", ["BTC"])])
+    assert result is not None and result["sentiment_label"] == "Bullish"
+
+
+def test_opposite_direction_rejected():
+    results = match([
+        ("Bitcoin plunges below $70,000 as ETF outflows hit record", ["BTC"]),
+        ("Bitcoin fails to surge above $70,000 as ETF inflows hit record", ["BTC"]),
+    ])
+    assert results == [None, None]
+
+
+def test_extra_coin_rejected():
+    # Cùng tiêu đề, tagger thấy thêm ETH (vd. từ content) -> có thông tin lead không có
+    [result] = match([(LEAD_TITLE, ["BTC", "ETH"])])
+    assert result is None
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_same_story_inherits, test_opposite_direction_rejected, test_extra_coin_rejected):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
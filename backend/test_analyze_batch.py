@@ -0,0 +1,91 @@
+"""
+Test GeminiClient.analyze_batch (không gọi Gemini, không dùng cache): _generate được thay bằng model giả
+- Kết quả đúng thứ tự đầu vào, bài trùng nội dung chỉ gửi một lần
+- Bài thiếu trong kết quả batch được gọi lại riêng, chỉ bài đó
+- Request batch lỗi API -> None cho cả batch, không gọi lại từng bài
+"""
+import asyncio
+import json
+import sys
+
+from app.core.config import settings
+from app.core.prompts import BATCH_ANALYSIS_PROMPT
+from app.services.llm_client import GeminiClient
+
+
+class FakeModel:
+    """Thay GeminiClient._generate: trả analysis {"summary_en": title}, ghi lại các request"""
+
+    def __init__(self, drop=(), fail=()):
+        self.drop = set(drop)  # title bị thiếu trong kết quả batch
+        self.fail = set(fail)  # batch chứa title này -> lỗi API (None)
+        self.batches = []
+        self.singles = []
+
+    async def generate(self, message, max_output_tokens=None, priority=None):
+        if message.startswith(BATCH_ANALYSIS_PROMPT):
+            articles = json.loads(message[len(BATCH_ANALYSIS_PROMPT):])["articles"]
+            self.batches.append([article["title"] for article in articles])
+            if any(article["title"] in self.fail for article in articles):
+                return None
+            return json.dumps([
+                {"id": article["id"], "summary_en": article["title"]}
+                for article in reversed(articles)  # model không giữ thứ tự -> ghép theo id
+                if article["title"] not in self.drop
+            ])
+        payload = json.loads(message)
+        self.singles.append(payload["title"])
+        return json.dumps({"summary_en": payload["title"]})
+
+
+def run_batch(fake: FakeModel, titles):
+    client = GeminiClient()
+    model, cache_enabled = client.model, settings.LLM_CACHE_ENABLED
+    client.model = object()
+    client._generate = fake.generate
+    settings.LLM_CACHE_ENABLED = False
+    try:
+        return asyncio.run(client.analyze_batch([
+            {"title": title, "content": f"content of {title}", "source": "test"} for title in titles
+        ]))
+    finally:
+        client.model = model
+        del client._generate
+        settings.LLM_CACHE_ENABLED = cache_enabled
+
+
+def test_order_and_dedup():
+    titles = ["a", "b", "a", "c"]
+    fake = FakeModel()
+    results = run_batch(fake, titles)
+    assert [result["summary_en"] for result in results] == titles
+    assert results[0] is not results[2]  # bản copy: sửa một kết quả không ảnh hưởng bài trùng
+    assert sorted(title for batch in fake.batches for title in batch) == ["a", "b", "c"]
+    assert fake.singles == []
+
+
+def test_retry_missing_only():
+    fake = FakeModel(drop={"b"})
+    results = run_batch(fake, ["a", "b", "c"])
+    assert [result["summary_en"] for result in results] == ["a", "b", "c"]
+    assert fake.singles == ["b"]
+
+
+def test_no_retry_on_api_failure():
+    fake = FakeModel(fail={"b"})
+    results = run_batch(fake, ["a", "b", "c"])
+    assert results == [None, None, None]
+    assert len(fake.batches) == 1
+    assert fake.singles == []
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_order_and_dedup, test_retry_missing_only, test_no_retry_on_api_failure):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
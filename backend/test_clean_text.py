@@ -0,0 +1,49 @@
+"""Test ContentProcessor.clean_text: lxml fast path cho cùng output với BeautifulSoup trên fixture corpus"""
+import json
+import re
+import sys
+import warnings
+
+from bs4 import XMLParsedAsHTMLWarning
+
+from app.services.content_processor import ContentProcessor
+
+FIXTURE_PATH = "fixtures/rss_summaries.json"
+
+
+def reference_clean(html_content: str) -> str:
+    """Output contract: đường BeautifulSoup (cách làm trước đây)"""
+    if not html_content:
+        return ""
+    return re.sub(r'\s+', ' ', ContentProcessor._soup_text(html_content)).strip()
+
+
+def test():
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    print(f"=== clean_text parity ({len(corpus)} fixtures) ===\n")
+    failures = 0
+    fallbacks = 0
+    for i, html_content in enumerate(corpus):
+        if html_content and ContentProcessor._fast_text(html_content) is None:
+            fallbacks += 1
+        expected = reference_clean(html_content)
+        actual = ContentProcessor.clean_text(html_content)
+        if actual != expected:
+            failures += 1
+            print(f"❌ #{i}: {html_content[:60]!r}")
+            print(f"   expected: {expected!r}")
+            print(f"   actual:   {actual!r}")
+
+    print(f"BeautifulSoup fallback: {fallbacks}/{len(corpus)}")
+    if failures:
+        print(f"❌ {failures} mismatches")
+        return False
+    print("✅ All fixtures identical")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if test() else 1)
@@ -0,0 +1,100 @@
+"""
+Test: mention counter vẫn khớp bảng news sau khi enrichment queue phân tích AI các tin content ngắn
+(MentionCounter.check_consistency). Tin lưu trước (đếm tag, chưa có coin), sau đó một tin được AI
+thêm coin, một tin bị AI loại (xoá). Ghi vào DB trong một transaction rồi rollback.
+"""
+import asyncio
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.db.session import AsyncSessionLocal
+from app.models.news import News
+from app.models.source import Source
+from app.services.enrichment_queue import EnrichmentQueue
+from app.services.llm_client import GeminiClient
+from app.services.llm_dispatcher import PRIORITY_NORMAL
+from app.services.mention_counter import MentionCounter
+
+
+async def fake_analyze_batch(self, items):
+    """Tin đầu: liên quan, có coin; tin sau: AI loại"""
+    marker = items[0]["title"].split()[-1]
+    return [
+        {
+            "is_relevant": True, "sentiment_score": 0.5, "sentiment_label": "Bullish",
+            "coins_mentioned": [f"COIN{marker}"], "category": "market_move"
+        },
+        {"is_relevant": False},
+    ]
+
+
+async def check_enrichment_mentions() -> bool:
+    marker = uuid.uuid4().hex[:8].upper()
+    tag = f"TAG{marker}"
+    published_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+
+    async with AsyncSessionLocal() as db:
+        source = (await db.execute(select(Source).limit(1))).scalar_one_or_none()
+        if source is None:
+            print("❌ Cần ít nhất một source trong DB")
+            return False
+
+        saved = [
+            News(
+                source_id=source.id, title=f"Test enrichment mentions {i} {marker}",
+                url=f"https://example.com/{marker}/{i}", raw_content="short", published_at=published_at,
+                tags=[tag], is_full_content=False
+            )
+            for i in range(2)
+        ]
+        original = GeminiClient.analyze_batch
+        GeminiClient.analyze_batch = fake_analyze_batch
+        try:
+            # Crawler: lưu tin + đếm tag (phân tích AI để sau khi enrich)
+            db.add_all(saved)
+            await db.flush()
+            await MentionCounter.record(db, saved)
+
+            pending = [
+                (
+                    {"id": news.id, "raw_content": "full text " * 200, "is_full_content": True},
+                    dict(
+                        EnrichmentQueue.analysis_job(source, news.title, published_at, "short", [tag], PRIORITY_NORMAL),
+                        url=news.url, content="full text " * 200, summary="short"
+                    )
+                )
+                for news in saved
+            ]
+            batch = []
+            rejected, mentions = await EnrichmentQueue()._analyze(pending, batch)
+            await EnrichmentQueue._write(db, batch, rejected, mentions)
+            await db.flush()
+
+            mismatches = [
+                row for row in await MentionCounter.check_consistency(db, published_at)
+                if row["key"] in (tag, f"COIN{marker}")
+            ]
+        finally:
+            GeminiClient.analyze_batch = original
+            await db.rollback()
+
+    if list(rejected) != [saved[1].id]:
+        print(f"❌ Rejected: {list(rejected)}")
+        return False
+    for row in mismatches:
+        print(f"❌ {row}")
+    if mismatches:
+        return False
+    print("✅ Mention counter khớp bảng news sau phân tích AI / xoá tin bị loại")
+    return True
+
+
+def test_enrichment_mentions():
+    assert asyncio.run(check_enrichment_mentions())
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(check_enrichment_mentions()) else 1)
@@ -0,0 +1,46 @@
+"""
+Test script: SQL hotness (HotnessRanking.hotness_query) vs công thức Python calculate_hotness
+Chỉ đọc, không ghi DB. Cùng một mốc `now` cho cả 2 cách.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from app.db.session import AsyncSessionLocal
+from app.models.news import News
+from app.services.ranking import HotnessRanking
+
+TOLERANCE = 0.01  # Khác biệt làm tròn (Postgres round numeric vs Python round float)
+
+
+async def test_hotness_sql(time_window_hours: int = 72):
+    now = datetime.now(timezone.utc)
+    cutoff_time = now - timedelta(hours=time_window_hours)
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(HotnessRanking.hotness_query(cutoff_time, now))
+        sql_scores = {row.news_id: row.score for row in result}
+        
+        news_result = await db.execute(select(News).where(News.published_at >= cutoff_time))
+        news_items = news_result.scalars().all()
+        
+        if not news_items:
+            print("❌ Không có tin nào trong time window")
+            return
+        
+        mismatches = 0
+        for news in news_items:
+            expected = await HotnessRanking.calculate_hotness(news, db, now)
+            actual = sql_scores.get(news.id)
+            if actual is None or abs(actual - expected) > TOLERANCE:
+                mismatches += 1
+                print(f"❌ News #{news.id}: python={expected} sql={actual}")
+        
+        print(f"\n📊 Checked {len(news_items)} news, SQL rows: {len(sql_scores)}")
+        if mismatches == 0 and len(sql_scores) == len(news_items):
+            print("✅ SQL hotness khớp công thức Python")
+        else:
+            print(f"❌ {mismatches} mismatches")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_hotness_sql())
@@ -0,0 +1,82 @@
+"""
+Test KeywordMatcher: cùng kết quả với cách tagger cũ (mỗi keyword một re.search(r'\\b' + kw + r'\\b'))
+trên fixture corpus (RSS summaries) và các ca biên về word boundary.
+"""
+import json
+import re
+import sys
+
+from app.core.taxonomy import DEFAULT_TAXONOMY
+from app.services.keyword_matcher import KeywordMatcher
+
+FIXTURE_PATH = "fixtures/rss_summaries.json"
+
+# Keyword thêm cho các ca biên: nhiều từ, có dấu câu, không bắt đầu/kết thúc bằng \w (fallback regex)
+EXTRA_ENTRIES = [
+    ("$btc", ("coin", "BTC")),
+    ("s&p 500", ("general", "s&p 500")),
+    ("layer 2", ("topic", "Layer2")),
+    ("layer-2", ("topic", "Layer2")),
+    ("u.s.", ("general", "u.s.")),
+]
+
+EDGE_CASES = [
+    "",
+    "absolute solutions",  # 'sol' nằm trong từ khác
+    "SOL rallies; sol-usd at highs",
+    "Ethereum's layer 2 and layer-2s, LAYER  2 spacing",
+    "$BTC and $btc2 vs BTC$",
+    "S&P 500 futures, s&p 5000",
+    "U.S. regulators and u.s.a",
+    "bitcoin\nethereum\tsolana",
+    "Bitcoin ETF: spot-bitcoin, bitcoins, #bitcoin, bitcoin_cash",
+    "Đồng Bitcoin tăng giá, ví điện tử và DeFi",
+]
+
+
+def taxonomy_entries():
+    entries = []
+    for coin, keywords in DEFAULT_TAXONOMY.coins.items():
+        entries.extend((kw, ("coin", coin)) for kw in keywords)
+    for topic, keywords in DEFAULT_TAXONOMY.topics.items():
+        entries.extend((kw, ("topic", topic)) for kw in keywords)
+    entries.extend((kw, ("general", kw)) for kw in DEFAULT_TAXONOMY.general)
+    return entries + EXTRA_ENTRIES
+
+
+def reference_match(entries, text: str) -> set:
+    """Output contract: vòng re.search của tagger cũ"""
+    text_lower = (text or "").lower()
+    return {
+        label for keyword, label in entries
+        if re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text_lower)
+    }
+
+
+def corpus():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        summaries = json.load(f)
+    return EDGE_CASES + [summary or "" for summary in summaries]
+
+
+def test_parity():
+    entries = taxonomy_entries()
+    matcher = KeywordMatcher(entries)
+    mismatches = [text for text in corpus() if matcher.match(text) != reference_match(entries, text)]
+    for text in mismatches[:5]:
+        print(f"❌ {text[:80]!r}")
+        print(f"   expected: {sorted(reference_match(entries, text))}")
+        print(f"   actual:   {sorted(matcher.match(text))}")
+    assert not mismatches
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_parity,):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,145 @@
+"""
+Test LLMDispatcher (không gọi Gemini: fn giả lập chạy trên thread pool của dispatcher)
+- Priority lanes: request HIGH chạy trước NORMAL / LOW, FIFO trong cùng lane
+- 429 (ResourceExhausted): retry với backoff rồi thành công; hết LLM_MAX_RETRIES thì raise
+- Lỗi khác (kể cả message có "429") không retry
+"""
+import asyncio
+import sys
+import threading
+
+from app.core.config import settings
+from app.services.llm_dispatcher import LLMDispatcher, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+
+
+class ResourceExhausted(Exception):
+    """Cùng tên với google.api_core.exceptions.ResourceExhausted (HTTP 429)"""
+
+
+def with_retry_settings(max_retries: int):
+    saved = (settings.LLM_MAX_RETRIES, settings.LLM_RETRY_BASE_SECONDS, settings.LLM_RETRY_MAX_SECONDS)
+    settings.LLM_MAX_RETRIES, settings.LLM_RETRY_BASE_SECONDS, settings.LLM_RETRY_MAX_SECONDS = max_retries, 0.01, 0.05
+    return saved
+
+
+def restore_retry_settings(saved):
+    settings.LLM_MAX_RETRIES, settings.LLM_RETRY_BASE_SECONDS, settings.LLM_RETRY_MAX_SECONDS = saved
+
+
+def test_priority_order():
+    async def scenario():
+        dispatcher = LLMDispatcher(concurrency=1, rpm=0, tpm=0)
+        started, release = threading.Event(), threading.Event()
+        order = []
+
+        def blocker():
+            started.set()
+            release.wait(5)
+
+        def job(name):
+            return lambda: order.append(name)
+
+        try:
+            blocking = asyncio.create_task(dispatcher.run(blocker))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            # Worker duy nhất đang bận -> các request dưới đây xếp hàng theo priority
+            queued = [
+                asyncio.create_task(dispatcher.run(job(name), priority=priority))
+                for name, priority in [
+                    ("low", PRIORITY_LOW), ("normal-1", PRIORITY_NORMAL),
+                    ("high", PRIORITY_HIGH), ("normal-2", PRIORITY_NORMAL)
+                ]
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(blocking, *queued)
+        finally:
+            await dispatcher.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["high", "normal-1", "normal-2", "low"]
+
+
+def test_rate_limit_backoff():
+    async def scenario():
+        dispatcher = LLMDispatcher(concurrency=1, rpm=0, tpm=0)
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) <= 2:
+                raise ResourceExhausted("quota exceeded")
+            return "ok"
+
+        try:
+            result = await dispatcher.run(flaky)
+        finally:
+            await dispatcher.close()
+        return result, len(calls), dispatcher.rate_limited
+
+    saved = with_retry_settings(3)
+    try:
+        assert asyncio.run(scenario()) == ("ok", 3, 2)
+    finally:
+        restore_retry_settings(saved)
+
+
+def test_rate_limit_gives_up():
+    async def scenario():
+        dispatcher = LLMDispatcher(concurrency=1, rpm=0, tpm=0)
+        calls = []
+
+        def always_limited():
+            calls.append(1)
+            raise ResourceExhausted("quota exceeded")
+
+        try:
+            await dispatcher.run(always_limited)
+        except ResourceExhausted:
+            return len(calls)
+        finally:
+            await dispatcher.close()
+        return None
+
+    saved = with_retry_settings(2)
+    try:
+        assert asyncio.run(scenario()) == 3  # lần đầu + LLM_MAX_RETRIES lần retry
+    finally:
+        restore_retry_settings(saved)
+
+
+def test_other_errors_not_retried():
+    async def scenario():
+        dispatcher = LLMDispatcher(concurrency=1, rpm=0, tpm=0)
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("invalid argument: 429 tokens in prompt")
+
+        try:
+            await dispatcher.run(broken)
+        except ValueError:
+            return len(calls), dispatcher.rate_limited
+        finally:
+            await dispatcher.close()
+        return None
+
+    saved = with_retry_settings(3)
+    try:
+        assert asyncio.run(scenario()) == (1, 0)
+    finally:
+        restore_retry_settings(saved)
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_priority_order, test_rate_limit_backoff, test_rate_limit_gives_up, test_other_errors_not_retried):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
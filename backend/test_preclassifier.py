@@ -0,0 +1,70 @@
+"""
+Test PreClassifier.route (ngưỡng trong settings) + train/predict trên dữ liệu nhỏ
+"""
+import sys
+
+from app.core.config import settings
+from app.services.llm_dispatcher import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+from app.services.preclassifier import PreClassifier, Prediction
+
+
+def test_route_thresholds():
+    skip, downgrade = settings.PRECLASSIFIER_SKIP_BELOW, settings.PRECLASSIFIER_DOWNGRADE_BELOW
+    confident = settings.PRECLASSIFIER_CATEGORY_CONFIDENCE
+
+    # Chưa có model -> giữ nguyên priority
+    assert PreClassifier.route(None, PRIORITY_NORMAL) == PRIORITY_NORMAL
+    # Dưới ngưỡng skip -> không gọi LLM (kể cả tin từ khoá ưu tiên)
+    assert PreClassifier.route(Prediction(skip / 2, "market_move", 1.0), PRIORITY_HIGH) is None
+    # Từ ngưỡng skip tới dưới ngưỡng downgrade -> lane thấp
+    assert PreClassifier.route(Prediction(skip, None, 0.0), PRIORITY_NORMAL) == PRIORITY_LOW
+    assert PreClassifier.route(Prediction((skip + downgrade) / 2, None, 0.0), PRIORITY_HIGH) == PRIORITY_LOW
+    # Relevant: market_move chắc chắn -> lane ưu tiên, còn lại giữ nguyên
+    assert PreClassifier.route(Prediction(downgrade, "market_move", confident), PRIORITY_NORMAL) == PRIORITY_HIGH
+    assert PreClassifier.route(Prediction(0.9, "market_move", confident - 0.01), PRIORITY_NORMAL) == PRIORITY_NORMAL
+    assert PreClassifier.route(Prediction(0.9, "opinion", 1.0), PRIORITY_NORMAL) == PRIORITY_NORMAL
+    assert PreClassifier.route(Prediction(0.9, None, 0.0), PRIORITY_HIGH) == PRIORITY_HIGH
+
+
+def test_train_predict():
+    relevant = [
+        ("Bitcoin price jumps after ETF approval", "market_move"),
+        ("Ethereum falls as traders take profit", "market_move"),
+        ("Solana price rallies on record volume", "market_move"),
+        ("Uniswap ships v4 hooks upgrade to mainnet", "project_update"),
+        ("Polygon releases new zkEVM upgrade", "project_update"),
+        ("Cardano node upgrade ships new features", "project_update"),
+    ]
+    rejected = [
+        "Celebrity chef opens new restaurant downtown",
+        "Local football team wins weekend match",
+        "Ten tips for a better night of sleep",
+    ]
+    texts = [PreClassifier.text(title, "") for title, _ in relevant] + [PreClassifier.text(title, "") for title in rejected]
+    labels = [True] * len(relevant) + [False] * len(rejected)
+    categories = [category for _, category in relevant] + [None] * len(rejected)
+
+    model = PreClassifier.train(texts, labels, categories)
+    predictions = PreClassifier.predict(model, texts)
+    assert all(p.relevance > 0.5 for p in predictions[:len(relevant)])
+    assert all(p.relevance < 0.5 for p in predictions[len(relevant):])
+    assert [p.category for p in predictions[:len(relevant)]] == categories[:len(relevant)]
+
+    try:
+        PreClassifier.train(texts[:len(relevant)], labels[:len(relevant)], categories[:len(relevant)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("train() phải báo lỗi khi chỉ có một loại nhãn")
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_route_thresholds, test_train_predict):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,61 @@
+"""
+Test TitleIndex / DuplicateChecker (không cần DB: index được dựng sẵn thay cho _get_index)
+- candidates(): chỉ trả tiêu đề có đủ token chung, tiêu đề hết window bị loại
+- remove() / DuplicateChecker.forget(): bỏ mọi bản của tiêu đề, tin sau không còn bị coi là trùng
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.services.deduplicator import DuplicateChecker, TitleIndex
+
+TITLE = "Bitcoin ETF sees record inflows as BTC tops $70,000"
+SIMILAR = "Bitcoin ETF sees record inflows as BTC tops $70K"
+UNRELATED = "Solana validators ship client upgrade"
+
+
+def test_candidates():
+    now = datetime.now(timezone.utc)
+    index = TitleIndex(window=timedelta(hours=24))
+    index.add(TITLE, now)
+    index.add(UNRELATED, now)
+    index.add("Ethereum staking ETF sees record inflows as ETH tops $4,000", now - timedelta(hours=30))
+    assert index.candidates(SIMILAR) == [TITLE]
+    assert len(index) == 2  # tiêu đề quá window bị expire khi lookup
+
+
+def test_remove():
+    index = TitleIndex()
+    index.add(TITLE)
+    index.add(TITLE)
+    index.add(UNRELATED)
+    index.remove(TITLE)
+    assert index.candidates(SIMILAR) == []
+    assert len(index) == 1
+    assert index.candidates(UNRELATED) == [UNRELATED]
+
+
+def test_duplicate_checker_forget():
+    saved = DuplicateChecker._index
+    DuplicateChecker._index = TitleIndex(window=DuplicateChecker.WINDOW)
+    try:
+        DuplicateChecker.remember(TITLE, datetime.now(timezone.utc))
+        assert asyncio.run(DuplicateChecker.is_duplicate(SIMILAR, None))
+        assert not asyncio.run(DuplicateChecker.is_duplicate(UNRELATED, None))
+        # Batch bị rollback / AI loại -> tiêu đề không còn chặn tin sau
+        DuplicateChecker.forget([TITLE])
+        assert not asyncio.run(DuplicateChecker.is_duplicate(SIMILAR, None))
+    finally:
+        DuplicateChecker._index = saved
+
+
+if __name__ == "__main__":
+    failed = 0
+    for test in (test_candidates, test_remove, test_duplicate_checker_forget):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError:
+            failed += 1
+            print(f"❌ {test.__name__}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,126 @@
+"""
+Train pre-classifier (Task 2.3d) từ nhãn AI đã lưu + đánh giá offline
+
+- Evaluation: chia theo thời gian (tin cũ để train, --test-fraction tin mới nhất để test), báo cáo
+  precision/recall relevance, category, và % LLM call tiết kiệm được theo từng ngưỡng skip
+- Sau đó train trên toàn bộ dữ liệu rồi lưu vào settings.PRECLASSIFIER_MODEL_FILE (trừ --eval-only)
+- --current: đánh giá model đang dùng trên các nhãn mới hơn thời điểm train của nó.
+  Lưu ý: tin model đang dùng đã skip không được Gemini gán nhãn nên không có trong tập này
+  -> chỉ thấy được phần bị giữ lại, recall "relevant" bị đánh giá cao hơn thực tế
+  (relevant bị skip nhầm không bao giờ xuất hiện). Số liệu time-split (mặc định) không bị lệch này
+- Nhãn dương chỉ gồm tin Gemini phân tích trực tiếp (news.analysis_source="ai", cần add_analysis_source_column.py)
+- Text = title + content RSS như lúc crawler classify (news.feed_summary, cần add_feed_summary_column.py),
+  không phải full text sau enrich; tin đã enrich trước khi có cột này bị bỏ qua
+
+Usage: python train_preclassifier.py [--days 90] [--test-fraction 0.2] [--eval-only] [--current]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import numpy as np
+from sklearn.metrics import classification_report, precision_recall_fscore_support
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.preclassifier import PreClassifier, LabeledItem
+
+SKIP_THRESHOLDS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.3]
+
+
+def _sort_key(item: LabeledItem):
+    created_at = item.created_at or datetime.min.replace(tzinfo=timezone.utc)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at
+
+
+def evaluate(model: dict, test: List[LabeledItem]):
+    predictions = PreClassifier.predict(model, [item.text for item in test])
+    relevance = np.array([p.relevance for p in predictions])
+    actual = np.array([item.relevant for item in test])
+    n_relevant, n_rejected = int(actual.sum()), int((~actual).sum())
+    print(f"\nTest set: {len(test)} items ({n_relevant} relevant, {n_rejected} rejected by AI)")
+
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        actual, relevance >= 0.5, labels=[True, False], zero_division=0
+    )
+    print("\nRelevance @0.5        precision  recall   f1")
+    print(f"  relevant             {precision[0]:9.3f} {recall[0]:7.3f} {f1[0]:6.3f}")
+    print(f"  not relevant         {precision[1]:9.3f} {recall[1]:7.3f} {f1[1]:6.3f}")
+
+    print("\nSkip threshold  LLM calls saved  skip precision  rejected caught  relevant lost")
+    for threshold in sorted(set(SKIP_THRESHOLDS + [settings.PRECLASSIFIER_SKIP_BELOW])):
+        skipped = relevance < threshold
+        caught = int((skipped & ~actual).sum())
+        lost = int((skipped & actual).sum())
+        marker = "*" if threshold == settings.PRECLASSIFIER_SKIP_BELOW else " "
+        print(
+            f"  {threshold:<5.2f}{marker}        {skipped.mean():14.1%}  "
+            f"{(caught / skipped.sum() if skipped.any() else 0):14.3f}  "
+            f"{(caught / n_rejected if n_rejected else 0):15.1%}  "
+            f"{lost:5d} ({(lost / n_relevant if n_relevant else 0):.1%})"
+        )
+    downgraded = (relevance >= settings.PRECLASSIFIER_SKIP_BELOW) & (relevance < settings.PRECLASSIFIER_DOWNGRADE_BELOW)
+    print(f"  (*) configured; low lane (< {settings.PRECLASSIFIER_DOWNGRADE_BELOW}): {downgraded.mean():.1%} of items")
+
+    labeled = [i for i, item in enumerate(test) if item.relevant and item.category]
+    if model.get("category") is None or not labeled:
+        print("\nCategory: no category model / labels")
+        return
+    expected = [test[i].category for i in labeled]
+    predicted = [predictions[i].category for i in labeled]
+    print("\nCategory (relevant items)")
+    print(classification_report(expected, predicted, zero_division=0))
+    confident = [i for i in labeled if predictions[i].category_confidence >= settings.PRECLASSIFIER_CATEGORY_CONFIDENCE]
+    if confident:
+        correct = sum(predictions[i].category == test[i].category for i in confident)
+        print(
+            f"Confident (>= {settings.PRECLASSIFIER_CATEGORY_CONFIDENCE}): "
+            f"{len(confident) / len(labeled):.1%} of items, accuracy {correct / len(confident):.3f}"
+        )
+
+
+async def main(days: int, test_fraction: float, eval_only: bool, current: bool):
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    async with AsyncSessionLocal() as db:
+        items = sorted(await PreClassifier.load_labeled(db, since), key=_sort_key)
+    n_rejected = sum(not item.relevant for item in items)
+    print(f"Loaded {len(items)} labeled items ({len(items) - n_rejected} relevant, {n_rejected} rejected) from last {days} days")
+    print("Text: title + RSS summary as seen by the crawler (news enriched before feed_summary existed are excluded)")
+
+    if current:
+        model = PreClassifier.current_model()
+        if model is None:
+            print(f"No model at {settings.PRECLASSIFIER_MODEL_FILE}")
+            return
+        trained_at = datetime.fromisoformat(model["trained_at"]).replace(tzinfo=timezone.utc)
+        print("Note: items skipped by this model were never labeled, relevant recall below is biased upward")
+        evaluate(model, [item for item in items if _sort_key(item) > trained_at])
+        return
+
+    split = int(len(items) * (1 - test_fraction))
+    train, test = items[:split], items[split:]
+    model = PreClassifier.train(
+        [item.text for item in train], [item.relevant for item in train], [item.category for item in train]
+    )
+    evaluate(model, test)
+
+    if eval_only:
+        return
+    model = PreClassifier.train(
+        [item.text for item in items], [item.relevant for item in items], [item.category for item in items]
+    )
+    PreClassifier.save(model)
+    print(f"\n✅ Model trained on {len(items)} items saved to {settings.PRECLASSIFIER_MODEL_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=90, help="Dùng nhãn trong N ngày gần nhất")
+    parser.add_argument("--test-fraction", type=float, default=0.2, help="Phần dữ liệu mới nhất để đánh giá")
+    parser.add_argument("--eval-only", action="store_true", help="Chỉ đánh giá, không lưu model")
+    parser.add_argument("--current", action="store_true", help="Đánh giá model đang dùng trên nhãn mới hơn nó")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.test_fraction, args.eval_only, args.current))